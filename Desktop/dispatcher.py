@@ -0,0 +1,58 @@
+import threading
+import tkinter as tk
+from collections import OrderedDict
+
+class UIDispatcher:
+    """
+    The one way for worker threads to touch Tk. post() only appends to a locked
+    queue and, if no drain is planned yet, wakes the Tk loop with a queued virtual
+    event (the one Tk call that is safe from any thread). The loop then drains
+    the queue every FRAME_MS until it is empty and goes back to sleep, so an idle
+    app has no timer running. Posts sharing a key are coalesced: the entry keeps
+    its place in the queue but only the latest call is run in that frame.
+    """
+    FRAME_MS = 16
+    EVENT = "<<UIDispatch>>"
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        self._pending = OrderedDict()   # key -> (fn, args, kwargs)
+        self._stopped = False
+        root.bind(self.EVENT, lambda e: self._drain(), add="+")
+        # Posts made before mainloop starts (e.g. from workers during startup) wait for this first drain:
+        # waking the loop from another thread fails until it runs
+        self._armed = True              # a drain is planned (or running)
+        self._job = root.after(0, self._drain)
+
+    def post(self, fn, *args, key=None, **kwargs):
+        """Runs fn(*args, **kwargs) on the Tk loop. With a key, replaces any not-yet-run post with that key."""
+        with self._lock:
+            if self._stopped: return
+            self._pending[object() if key is None else key] = (fn, args, kwargs)
+            # 🟢 FIX: only the first post after a quiet spell wakes the loop; no idle polling
+            if self._armed: return
+            self._armed = True
+        try: self.root.event_generate(self.EVENT, when="tail")
+        except (tk.TclError, RuntimeError):
+            # 🟢 FIX: not woken (window destroyed, or no mainloop yet), so let the next post try again
+            with self._lock: self._armed = False
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            self._pending.clear()
+        if self._job: self.root.after_cancel(self._job)
+        self._job = None
+
+    def _drain(self):
+        self._job = None
+        with self._lock:
+            batch, self._pending = self._pending, OrderedDict()
+        for fn, args, kwargs in batch.values():
+            try: fn(*args, **kwargs)
+            except Exception as e: print(f"UI Error: {e}")
+        with self._lock:
+            # More arrived meanwhile: pace them to the next frame, else sleep until post() wakes us
+            self._armed = bool(self._pending) and not self._stopped
+            if self._armed: self._job = self.root.after(self.FRAME_MS, self._drain)
@@ -69,6 +69,11 @@ from view_tasks import TaskManager
 from view_ui import MainUI
 from updater import AppUpdater
 from core.task_manager import TaskManager
+from core.analytics import FocusStats
+from core.search import TaskSearch
+from core.sync import SyncService
+from dispatcher import UIDispatcher
+from core import executor
 
 ctk.set_appearance_mode("Dark")
 ctk.set_default_color_theme("dark-blue")
@@ -87,10 +92,19 @@ class FocusApp(ctk.CTk):
             logging.error(f"Icon error: {e}")
 
         self.username = "Guest"
+        self.dispatcher = UIDispatcher(self)
         self.updater = AppUpdater(self.on_update_found)
         self.updater.check_for_updates()
         self.task_manager = TaskManager(self)
+        self.stats = FocusStats()
+        # Loads the saved index (or rebuilds a stale one) off the Tk thread
+        self.search = TaskSearch()
+        executor.submit("tasks", self.search.attach, self.task_manager)
+        # Task sync with other devices, only when FOCUS_SYNC_PORT / FOCUS_SYNC_URL is set
+        self.sync = SyncService(self.task_manager).start() if config.SYNC_PORT or config.SYNC_URL else None
         
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
         # Load User Logic
         if self.load_user_safe():
             logging.info(f"User loaded successfully: {self.username}")
@@ -128,7 +142,7 @@ class FocusApp(ctk.CTk):
     def on_update_found(self, found, version_str):
         if found:
             self.new_version_str = version_str
-            self.after(0, self.show_update_banner)
+            self.dispatcher.post(self.show_update_banner)
 
     def show_update_banner(self):
         self.update_frame = ctk.CTkFrame(self, fg_color="#10b981", height=40, corner_radius=0)
@@ -145,7 +159,8 @@ class FocusApp(ctk.CTk):
 
     def update_progress(self, percent):
         if percent == -1: return
-        self.after(0, lambda: self.progress_bar.set(percent))
+        # One download chunk per call: only the latest percentage matters per frame
+        self.dispatcher.post(self.progress_bar.set, percent, key="update_progress")
 
     # --- LOGIN ---
     def show_login(self):
@@ -172,6 +187,15 @@ class FocusApp(ctk.CTk):
             logging.critical(f"LOGIN CRASH: {e}")
             msgbox.showerror("Login Crash", f"Error: {e}")
 
+    def on_close(self):
+        # Queued background work is dropped; running work gets a moment to finish (e.g. an upload)
+        self.dispatcher.stop()
+        executor.shutdown(timeout=3)
+        self.search.close()
+        if self.sync: self.sync.stop()
+        self.task_manager.close()
+        self.destroy()
+
     def launch_main_ui(self):
         self.ui = MainUI(self, self, self.username, self.task_manager)
         self.ui.pack(fill="both", expand=True)
@@ -4,10 +4,10 @@ import sys
 import platform
 import subprocess
 import time
-import threading
 import logging
 from packaging import version
 import config
+from core import executor
 
 # --- DEBUG SETUP ---
 # Log to a file next to the executable
@@ -31,7 +31,7 @@ class AppUpdater:
         logging.info(f"Updater initialized. OS: {self.os_type}")
 
     def check_for_updates(self):
-        threading.Thread(target=self._worker_check, daemon=True).start()
+        executor.submit("updater", self._worker_check, key="check")
 
     def _worker_check(self):
         try:
@@ -57,7 +57,8 @@ class AppUpdater:
             logging.error(f"Check Failed: {e}")
 
     def perform_update(self, progress_callback=None):
-        threading.Thread(target=self._worker_update, args=(progress_callback,), daemon=True).start()
+        # Keyed, so clicking UPDATE NOW twice doesn't start a second download
+        executor.submit("updater", self._worker_update, progress_callback, key="download")
 
     def _worker_update(self, progress_callback):
         try:
@@ -1,107 +1,255 @@
 import customtkinter as ctk
-import requests
 import threading
-import config
+from core import executor
+from core.api_client import EventStream
+from core.leaderboard import format_minutes, entries_from_event, Ranking
+from core.leaderboard_db import LeaderboardMirror, MirrorRanking
+from core.leaderboard_service import LeaderboardService
 
 BG_COLOR = "#0f172a"
 CARD_COLOR = "#1e293b"
 ACCENT_COLOR = "#6366f1"
 TEXT_SEC = "#94a3b8"
+PAGE_SIZE = 20
+WINDOWS = {"ALL TIME": None, "MONTH": "month", "WEEK": "week", "TODAY": "day"}
 
 class LeaderboardPage(ctk.CTkFrame):
     def __init__(self, parent, controller):
         super().__init__(parent, fg_color="transparent")
         self.controller = controller
+        self.mirror = LeaderboardMirror()
+        self.service = LeaderboardService(self.mirror)
+        self.service.subscribe(self.present)
+        self.version = 0          # service version currently on screen
+        self.window = None        # None = all time, else "day" | "week" | "month"
+        self.presented = None     # all-time totals published when the current ranking was built
+        self.loading_label = None
+        self.ranking = None
+        self.my_rank = None
+        self.stream = None
+        self.empty_label = None
+        self.live_lock = threading.Lock()
+        self.live_changes = {}   # totals from the stream not yet shown (latest per user)
+        self.stats_seeded = False
         self.setup_ui()
+        # 🟢 FIX: backfill stats from a mirror filled by an earlier run; never download just for this
+        executor.submit("leaderboard", self.seed_stats)
 
     def setup_ui(self):
         self.header = ctk.CTkLabel(self, text="GLOBAL RANKINGS", font=("Roboto Medium", 14), text_color=TEXT_SEC)
-        self.header.pack(pady=(40, 20))
+        self.header.pack(pady=(40, 5))
+
+        status_row = ctk.CTkFrame(self, fg_color="transparent")
+        status_row.pack(pady=(0, 15))
+        self.my_rank_label = ctk.CTkLabel(status_row, text="", font=("Roboto", 12), text_color=ACCENT_COLOR)
+        self.my_rank_label.pack(side="left", padx=15)
+        self.live_switch = ctk.CTkSwitch(
+            status_row, text="LIVE", command=self.toggle_live, font=("Roboto Medium", 11),
+            text_color=TEXT_SEC, progress_color="#10b981"
+        )
+        self.live_switch.pack(side="left", padx=15)
+        self.window_picker = ctk.CTkSegmentedButton(
+            status_row, values=list(WINDOWS), command=self.set_window, font=("Roboto Medium", 11),
+            selected_color=ACCENT_COLOR, selected_hover_color="#4f46e5"
+        )
+        self.window_picker.set("ALL TIME")
+        self.window_picker.pack(side="left", padx=15)
 
         self.lb_scroll = ctk.CTkScrollableFrame(self, fg_color="transparent")
         self.lb_scroll.pack(fill="both", expand=True, padx=60, pady=20)
+        self.more_btn = None
+        self.rows = []
 
     def refresh(self):
+        # In live mode the stream keeps the ranking current, so no refetch is needed
+        if self.stream and self.ranking: return
+        cached = self.service.cached()
+        if cached and cached[0] != self.version:
+            # Paint what we have right away; the revalidation below replaces it if it changed
+            executor.submit("ui", self.present, *cached, key="leaderboard-present")
+        elif not cached and not self.rows and not self.loading_label:
+            self.loading_label = ctk.CTkLabel(self.lb_scroll, text="Fetching Data...", font=("Roboto", 14), text_color=TEXT_SEC)
+            self.loading_label.pack(pady=50)
+        future = self.service.refresh()   # no-op while fresh; joins the download already running
+        # The user opened the page: once its download lands, the mirror can seed the stats
+        if future and not self.stats_seeded:
+            future.add_done_callback(lambda _: executor.submit("leaderboard", self.seed_stats))
+
+    def seed_stats(self):
+        # Worker thread: a first run on this machine fills local stats from this user's mirrored uploads
+        if self.stats_seeded or self.mirror.last_key() is None: return
+        self.stats_seeded = True
+        self.controller.stats.seed(self.mirror.user_sessions(self.controller.username))
+
+    def set_window(self, label):
+        self.window = WINDOWS[label]
+        self.version, self.ranking, self.presented = 0, None, None
+        # 🟢 FIX: clear the page here rather than presenting a made-up version that the real publish would lose to
+        self.clear_rows()
+        self.set_my_rank(None)
+        self.loading_label = ctk.CTkLabel(self.lb_scroll, text="Fetching Data...", font=("Roboto", 14), text_color=TEXT_SEC)
+        self.loading_label.pack(pady=50)
+        cached = self.service.cached()
+        if cached: executor.submit("ui", self.present, *cached, key="leaderboard-present")
+        else: self.service.refresh()
+
+    def present(self, version, totals):
+        # Worker thread: build the ranking off the Tk loop, then hand it over
+        window = self.window
+        if window is None and totals is self.presented: return   # republished unchanged
+        # 🟢 FIX: pages come from the mirror's SQL, so only the rows shown are loaded.
+        # Only a first download, published before the mirror is filled, is ranked in memory.
+        if window is None and self.mirror.last_key() is None: ranking = Ranking(totals)
+        else: ranking = MirrorRanking(self.mirror, window)
+        first_page = ranking.page(PAGE_SIZE)
+        my_rank = ranking.rank_of(self.controller.username)
+        self.controller.dispatcher.post(self.show_ranking, version, window, ranking, first_page, my_rank,
+                                        totals, key="leaderboard")
+
+    def show_ranking(self, version, window, ranking, first_page, my_rank, totals=None):
+        if window != self.window or version <= self.version or (self.stream and self.ranking): return
+        if window is None: self.presented = totals
+        self.clear_rows()
+        self.version = version
+        self.ranking = ranking
+        self.set_my_rank(my_rank)
+
+        if not first_page:
+            self.empty_label = ctk.CTkLabel(self.lb_scroll, text="No data found.", font=("Roboto", 16), text_color=TEXT_SEC)
+            self.empty_label.pack(pady=50)
+            return
+        self.add_rows(first_page, 1)
+
+    def clear_rows(self):
         for widget in self.lb_scroll.winfo_children(): widget.destroy()
-            
-        loading = ctk.CTkLabel(self.lb_scroll, text="Fetching Data...", font=("Roboto", 14), text_color=TEXT_SEC)
-        loading.pack(pady=50)
-
-        threading.Thread(target=self.fetch_and_aggregate, args=(loading,)).start()
-
-    def fetch_and_aggregate(self, loading_label):
-        try:
-            resp = requests.get(config.FIREBASE_URL).json()
-            self.after(0, lambda: loading_label.destroy())
-
-            if not resp:
-                self.after(0, lambda: ctk.CTkLabel(self.lb_scroll, text="No data found.", font=("Roboto", 16), text_color=TEXT_SEC).pack(pady=50))
-                return
-
-            user_stats = {}
-            for entry in resp.values():
-                name = entry.get("username", "Unknown")
-                duration_str = entry.get("duration", "0 min")
-                session_tasks = entry.get("tasks_done", []) 
-                session_task_count = entry.get("task_count", 0) 
-                
-                try: minutes = int(str(duration_str).split()[0])
-                except: minutes = 0
-                
-                if name not in user_stats:
-                    user_stats[name] = {'minutes': 0, 'tasks': 0, 'history': {}}
-                
-                user_stats[name]['minutes'] += minutes
-                user_stats[name]['tasks'] += session_task_count
-                for t in session_tasks:
-                    current_count = user_stats[name]['history'].get(t, 0)
-                    user_stats[name]['history'][t] = current_count + 1
-
-            sorted_users = sorted(user_stats.items(), key=lambda item: item[1]['minutes'], reverse=True)
-
-            rank = 1
-            for name, stats in sorted_users:
-                total_mins = stats['minutes']
-                total_tasks = stats['tasks']
-                history = stats['history']
-                hours, mins = divmod(total_mins, 60)
-                time_str = f"{hours}h {mins}m" if hours > 0 else f"{mins}m"
-                
-                # Colors
-                bg_color = CARD_COLOR
-                rank_color = TEXT_SEC
-                
-                if rank == 1: 
-                    rank_color = "#fcd34d" # Gold
-                    bg_color = "#422006"   # Dark Brown/Gold tint
-                elif rank == 2: rank_color = "#e2e8f0" # Silver
-                elif rank == 3: rank_color = "#fdba74" # Bronze
-                
-                self.after(0, lambda n=name, t=time_str, tc=total_tasks, h=history, r=rank, bg=bg_color, rc=rank_color: 
-                           self.create_row(n, t, tc, h, r, bg, rc))
-                rank += 1
-        except Exception as e:
-            print(f"LB Error: {e}")
-
-    def create_row(self, name, time_str, total_tasks, history, rank, bg_color, rank_color):
+        self.more_btn = self.empty_label = self.loading_label = None
+        self.rows = []
+
+    def set_my_rank(self, my_rank):
+        self.my_rank = my_rank
+        self.my_rank_label.configure(text=f"YOUR RANK: #{my_rank}" if my_rank else "")
+
+    def load_more(self):
+        start_rank = len(self.ranking.ranked) + 1
+        self.add_rows(self.ranking.page(PAGE_SIZE), start_rank)
+
+    def add_rows(self, rows, start_rank):
+        if self.more_btn:
+            self.more_btn.destroy()
+            self.more_btn = None
+
+        for rank, (name, total_mins, total_tasks) in enumerate(rows, start_rank):
+            self.create_row(rank, name, total_mins, total_tasks)
+        self.update_more_button()
+
+    def update_more_button(self):
+        if self.ranking.has_more() and not self.more_btn:
+            self.more_btn = ctk.CTkButton(
+                self.lb_scroll, text="LOAD MORE", command=self.load_more,
+                fg_color="transparent", border_width=1, border_color="#334155",
+                hover_color=CARD_COLOR, text_color=TEXT_SEC, font=("Roboto Medium", 12)
+            )
+            self.more_btn.pack(pady=10)
+
+    # --- LIVE MODE ---
+    def toggle_live(self):
+        if self.live_switch.get():
+            self.stream = EventStream(self.on_stream_event, self.stream_params)
+            self.stream.start()
+        elif self.stream:
+            self.stream.stop()
+            self.stream = None
+
+    def stream_params(self):
+        # Resume from the mirror's cursor so the initial snapshot is only the delta
+        cursor = self.mirror.sync_cursor()
+        return {"orderBy": '"$key"', "startAt": f'"{cursor}"'} if cursor else {}
+
+    def on_stream_event(self, event, path, data):
+        # Stream thread: fold new sessions into the mirror, hand changed totals to the UI
+        entries = entries_from_event(path, data)
+        if not entries: return
+        touched = self.mirror.apply(entries)
+        if not touched: return
+        with self.live_lock:
+            for name in touched: self.live_changes[name] = self.mirror.user_totals(name, self.window)
+        # A burst of events becomes one UI update per frame
+        self.controller.dispatcher.post(self.flush_live_changes, key="leaderboard-live")
+
+    def flush_live_changes(self):
+        with self.live_lock:
+            changes, self.live_changes = self.live_changes, {}
+        if changes: self.apply_live_changes(changes)
+
+    def apply_live_changes(self, changes):
+        if self.ranking is None: return
+        for name, (mins, tasks) in changes.items():
+            changed = self.ranking.update(name, mins, tasks)
+            if changed: self.refill_rows(*changed)
+        self.set_my_rank(self.ranking.rank_of(self.controller.username))
+        if not self.rows and self.ranking.has_more():
+            if self.empty_label: self.empty_label.destroy()
+            self.empty_label = None
+            self.add_rows(self.ranking.page(PAGE_SIZE), 1)
+        else:
+            self.update_more_button()
+
+    def refill_rows(self, start, end):
+        """Only rows whose rank slot changed are reconfigured."""
+        for pos in range(start, end):
+            name, mins, tasks = self.ranking.ranked[pos]
+            if pos < len(self.rows): self.fill_row(self.rows[pos], pos + 1, name, mins, tasks)
+            else: self.create_row(pos + 1, name, mins, tasks)
+
+    # --- ROWS ---
+    def create_row(self, rank, name, total_mins, total_tasks):
         # Card with subtle border
-        card = ctk.CTkFrame(self.lb_scroll, fg_color=bg_color, corner_radius=10, height=60, border_width=1, border_color="#334155")
-        card.pack(fill="x", pady=6)
-        
-        def on_click(event): self.show_user_details(name, time_str, total_tasks, history)
+        card = ctk.CTkFrame(self.lb_scroll, fg_color=CARD_COLOR, corner_radius=10, height=60, border_width=1, border_color="#334155")
+        if self.more_btn: card.pack(fill="x", pady=6, before=self.more_btn)
+        else: card.pack(fill="x", pady=6)
+        row = {"card": card}
+
+        def on_click(event): self.show_user_details(row["name"], format_minutes(row["mins"]), row["tasks"])
         card.bind("<Button-1>", on_click)
 
-        ctk.CTkLabel(card, text=f"#{rank}", font=("Roboto", 16, "bold"), width=50, text_color=rank_color).pack(side="left", padx=20, pady=15)
-        ctk.CTkLabel(card, text=name, font=("Roboto Medium", 15), text_color="white").pack(side="left", padx=10)
+        row["rank_lbl"] = ctk.CTkLabel(card, text="", font=("Roboto", 16, "bold"), width=50)
+        row["rank_lbl"].pack(side="left", padx=20, pady=15)
+        row["name_lbl"] = ctk.CTkLabel(card, text="", font=("Roboto Medium", 15), text_color="white")
+        row["name_lbl"].pack(side="left", padx=10)
         
         info = ctk.CTkFrame(card, fg_color="transparent")
         info.pack(side="right", padx=25)
-        ctk.CTkLabel(info, text=time_str, font=("Roboto", 16, "bold"), text_color=ACCENT_COLOR).pack(anchor="e")
-        ctk.CTkLabel(info, text=f"{total_tasks} Tasks", font=("Roboto", 11), text_color=TEXT_SEC).pack(anchor="e")
+        row["time_lbl"] = ctk.CTkLabel(info, text="", font=("Roboto", 16, "bold"), text_color=ACCENT_COLOR)
+        row["time_lbl"].pack(anchor="e")
+        row["tasks_lbl"] = ctk.CTkLabel(info, text="", font=("Roboto", 11), text_color=TEXT_SEC)
+        row["tasks_lbl"].pack(anchor="e")
         
         for w in card.winfo_children(): w.bind("<Button-1>", on_click)
+        for w in info.winfo_children(): w.bind("<Button-1>", on_click)
+        self.rows.append(row)
+        self.fill_row(row, rank, name, total_mins, total_tasks)
+
+    def fill_row(self, row, rank, name, total_mins, total_tasks):
+        # Colors
+        bg_color = CARD_COLOR
+        rank_color = TEXT_SEC
+        
+        if rank == 1: 
+            rank_color = "#fcd34d" # Gold
+            bg_color = "#422006"   # Dark Brown/Gold tint
+        elif rank == 2: rank_color = "#e2e8f0" # Silver
+        elif rank == 3: rank_color = "#fdba74" # Bronze
+
+        row.update(name=name, mins=total_mins, tasks=total_tasks)
+        row["card"].configure(fg_color=bg_color)
+        row["rank_lbl"].configure(text=f"#{rank}", text_color=rank_color)
+        row["name_lbl"].configure(text=name)
+        row["time_lbl"].configure(text=format_minutes(total_mins))
+        row["tasks_lbl"].configure(text=f"{total_tasks} Tasks")
 
-    def show_user_details(self, name, time_str, total_tasks, history):
+    def show_user_details(self, name, time_str, total_tasks):
+        # History is an indexed query against the mirror, loaded only for this user
+        history = self.mirror.user_history(name)
         detail_window = ctk.CTkToplevel(self)
         detail_window.title(name)
         detail_window.geometry("350x550")
@@ -134,7 +282,7 @@ class LeaderboardPage(ctk.CTkFrame):
         if not history:
             ctk.CTkLabel(scroll, text="No tasks recorded.", text_color="gray", font=("Roboto", 12)).pack(pady=20)
         else:
-            for task_name, count in history.items():
+            for task_name, count in history:
                 row = ctk.CTkFrame(scroll, fg_color="transparent")
                 row.pack(fill="x", pady=2)
                 txt = f"{task_name}"
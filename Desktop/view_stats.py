@@ -0,0 +1,90 @@
+import customtkinter as ctk
+from core.leaderboard import format_minutes
+
+BG_COLOR = "#0f172a"
+CARD_COLOR = "#1e293b"
+ACCENT_COLOR = "#6366f1"
+TEXT_SEC = "#94a3b8"
+
+class StatsPage(ctk.CTkFrame):
+    def __init__(self, parent, controller, stats, search):
+        super().__init__(parent, fg_color="transparent")
+        self.controller = controller
+        self.stats = stats
+        self.search = search
+        self.values = {}
+        self.setup_ui()
+
+    def setup_ui(self):
+        ctk.CTkLabel(self, text="MY FOCUS", font=("Roboto Medium", 14), text_color=TEXT_SEC).pack(pady=(40, 20))
+
+        grid = ctk.CTkFrame(self, fg_color="transparent")
+        grid.pack(padx=60, fill="x")
+        cards = [
+            ("today", "TODAY"), ("week", "THIS WEEK"), ("month", "THIS MONTH"),
+            ("streak", "CURRENT STREAK"), ("best", "BEST STREAK"), ("avg", "AVG / DAY"),
+        ]
+        for i, (key, title) in enumerate(cards):
+            card = ctk.CTkFrame(grid, fg_color=CARD_COLOR, corner_radius=12, border_width=1, border_color="#334155")
+            card.grid(row=i // 3, column=i % 3, padx=8, pady=8, sticky="nsew")
+            grid.grid_columnconfigure(i % 3, weight=1)
+            ctk.CTkLabel(card, text=title, font=("Roboto Medium", 10), text_color=TEXT_SEC).pack(pady=(15, 0))
+            value = ctk.CTkLabel(card, text="-", font=("Roboto Mono", 22, "bold"), text_color=ACCENT_COLOR)
+            value.pack()
+            detail = ctk.CTkLabel(card, text="", font=("Roboto", 11), text_color=TEXT_SEC)
+            detail.pack(pady=(0, 15))
+            self.values[key] = (value, detail)
+
+        ctk.CTkLabel(self, text="MOST COMPLETED", font=("Roboto Medium", 12), text_color=TEXT_SEC).pack(pady=(30, 10))
+        self.top_frame = ctk.CTkFrame(self, fg_color=CARD_COLOR, corner_radius=12)
+        self.top_frame.pack(padx=60, fill="x")
+
+        ctk.CTkLabel(self, text="SEARCH HISTORY", font=("Roboto Medium", 12), text_color=TEXT_SEC).pack(pady=(30, 10))
+        self.query = ctk.CTkEntry(self, placeholder_text="Find a past task...", height=36, font=("Roboto", 13))
+        self.query.pack(padx=60, fill="x")
+        # Index lookups take well under a millisecond, so they run on every keystroke
+        self.query.bind("<KeyRelease>", lambda _: self.show_matches())
+        self.match_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.match_frame.pack(padx=60, fill="x")
+
+    def show_matches(self):
+        for w in self.match_frame.winfo_children(): w.destroy()
+        for task_name, count in self.search.search(self.query.get(), 6):
+            row = ctk.CTkFrame(self.match_frame, fg_color="transparent")
+            row.pack(fill="x", padx=15, pady=2)
+            ctk.CTkLabel(row, text=task_name, font=("Roboto", 13), text_color="#e2e8f0").pack(side="left")
+            ctk.CTkButton(row, text="+ TODAY", width=70, height=24, fg_color=ACCENT_COLOR,
+                          command=lambda t=task_name: self.reuse(t)).pack(side="right")
+            ctk.CTkLabel(row, text=f"x{count}", font=("Roboto Medium", 13), text_color=TEXT_SEC).pack(side="right", padx=10)
+
+    def reuse(self, task_name):
+        self.controller.task_manager.add_task(task_name)
+        self.query.delete(0, "end")
+        self.show_matches()
+
+    def set_card(self, key, value, detail=""):
+        value_lbl, detail_lbl = self.values[key]
+        value_lbl.configure(text=value)
+        detail_lbl.configure(text=detail)
+
+    def refresh(self):
+        # Every figure is a precomputed rollup lookup, no history scan
+        self.stats.refresh()
+        for key, (mins, tasks) in (("today", self.stats.day()), ("week", self.stats.week()), ("month", self.stats.month())):
+            self.set_card(key, format_minutes(mins), f"{tasks} Tasks")
+
+        streak = self.stats.current_streak()
+        self.set_card("streak", f"{streak}d", "keep it going!" if streak else "focus today to start")
+        self.set_card("best", f"{self.stats.best_streak()}d")
+        per_day, per_session = self.stats.averages()
+        self.set_card("avg", format_minutes(round(per_day)), f"{round(per_session)}m / session")
+
+        for w in self.top_frame.winfo_children(): w.destroy()
+        top = self.stats.top_tasks(5)
+        if not top:
+            ctk.CTkLabel(self.top_frame, text="No tasks recorded.", text_color="gray", font=("Roboto", 12)).pack(pady=20)
+        for task_name, count in top:
+            row = ctk.CTkFrame(self.top_frame, fg_color="transparent")
+            row.pack(fill="x", padx=15, pady=4)
+            ctk.CTkLabel(row, text=task_name, font=("Roboto", 13), text_color="#e2e8f0").pack(side="left")
+            ctk.CTkLabel(row, text=f"x{count}", font=("Roboto Medium", 13), text_color=ACCENT_COLOR).pack(side="right")
@@ -1,15 +1,36 @@
 import customtkinter as ctk
-import threading
-import requests
+import tkinter as tk
+import tkinter.font as tkfont
 from datetime import datetime
 from plyer import notification
-import config
+from core import api_client, executor
+from core.timer import FocusTimer, TimerCheckpoint, session_entry, format_clock
+from core.scheduler import CycleRunner, pomodoro_phases, FOCUS, LONG_BREAK
 
 # Colors
 BG_COLOR = "#0f172a"
 CARD_COLOR = "#1e293b"
 ACCENT_COLOR = "#6366f1"
 TEXT_SEC = "#94a3b8"
+BREAK_COLOR = "#10b981"
+
+class TimerDisplay(tk.Canvas):
+    """
+    The big countdown as one canvas text item. A CTkLabel redraws the whole widget
+    on every configure; here only the text item changes, and only when it differs.
+    """
+    def __init__(self, parent, text="00:00", color="white", font=("Roboto", 90, "bold")):
+        measure = tkfont.Font(family=font[0], size=font[1], weight=font[2])
+        width, height = measure.measure("000:00") + 20, measure.metrics("linespace") + 10
+        super().__init__(parent, width=width, height=height, bg=BG_COLOR, highlightthickness=0, bd=0)
+        self.item = self.create_text(width // 2, height // 2, text=text, fill=color, font=font)
+        self.shown = (text, color)
+
+    def show(self, text=None, color=None):
+        text, color = text or self.shown[0], color or self.shown[1]
+        if (text, color) == self.shown: return
+        self.itemconfigure(self.item, text=text, fill=color)
+        self.shown = (text, color)
 
 class TimerPage(ctk.CTkFrame):
     def __init__(self, parent, controller, task_manager):
@@ -18,13 +39,26 @@ class TimerPage(ctk.CTkFrame):
         self.task_manager = task_manager
         
         self.timer_state = "IDLE"
-        self.time_left = 0
-        self.initial_time = 0
+        self.tick_job = None
+        self.timer = FocusTimer()
+        self.checkpoint = TimerCheckpoint()
+        # Phase ends and reminders come from the shared deadline scheduler, delivered on the Tk loop
+        self.cycle = CycleRunner(timer=self.timer, on_start=self.on_phase_start, on_end=self.on_phase_end,
+                                 on_remind=self.on_phase_reminder, dispatch=self.controller.dispatcher.post)
         self.input_string = ""
         self.pending_tasks = set()
+        self.task_rows = {}  # text -> [row frames], so change events touch single rows
+        self.empty_label = None
 
         self.setup_ui()
+        self.restore_session()
+        self.bind("<Destroy>", lambda e: self.save_checkpoint() if e.widget is self else None)
+        # Repaint/reschedule when the page is shown, hidden, minimised or restored
+        self.bind("<Map>", lambda e: self.schedule_tick() if e.widget is self else None)
+        self.bind("<Unmap>", lambda e: self.schedule_tick() if e.widget is self else None)
+        self.winfo_toplevel().bind("<Map>", lambda e: self.schedule_tick() if e.widget is self.winfo_toplevel() else None, add="+")
         self.controller.bind("<Key>", self.handle_keypress)
+        self.task_manager.subscribe(lambda event: self.controller.dispatcher.post(self.on_tasks_changed, event))
 
     def setup_ui(self):
         # HEADER (Reduced padding)
@@ -42,6 +76,13 @@ class TimerPage(ctk.CTkFrame):
         )
         self.new_session_btn.pack()
 
+        self.pomodoro_btn = ctk.CTkButton(
+            self.idle_frame, text="Pomodoro Cycle", command=self.start_pomodoro,
+            width=220, height=40, corner_radius=20,
+            fg_color="transparent", text_color=TEXT_SEC, hover_color=CARD_COLOR, font=("Roboto Medium", 14)
+        )
+        self.pomodoro_btn.pack(pady=(10, 0))
+
         # --- 2. ACTIVE STATE (Hidden initially) ---
         self.active_frame = ctk.CTkFrame(self, fg_color="transparent")
         
@@ -50,8 +91,8 @@ class TimerPage(ctk.CTkFrame):
         self.hint_label.pack(pady=(0, 5))
 
         # Timer Display (Font reduced to 90 for safety)
-        self.timer_label = ctk.CTkLabel(self.active_frame, text="00:00", font=("Roboto", 90, "bold"), text_color="white")
-        self.timer_label.pack(pady=5)
+        self.timer_display = TimerDisplay(self.active_frame)
+        self.timer_display.pack(pady=5)
 
         # Button Row (Reduced padding)
         self.btn_row = ctk.CTkFrame(self.active_frame, fg_color="transparent")
@@ -94,7 +135,6 @@ class TimerPage(ctk.CTkFrame):
         self.task_scroll = ctk.CTkScrollableFrame(self.tasks_container, height=120, fg_color="transparent")
         self.task_scroll.pack(fill="x", padx=15)
 
-        self.update_timer()
 
     # --- VISIBILITY HELPER ---
     def update_button_visibility(self):
@@ -112,25 +152,48 @@ class TimerPage(ctk.CTkFrame):
     # --- LOGIC ---
     def refresh(self):
         for widget in self.task_scroll.winfo_children(): widget.destroy()
-        self.pending_tasks.clear() 
+        self.task_rows.clear()
+        self.empty_label = None
 
-        date_key = datetime.now().strftime("%Y-%m-%d")
-        all_data = self.task_manager.load_data()
-        day_tasks = all_data.get(date_key, [])
-        active_tasks = [t for t in day_tasks if not t.get("done", False)]
+        active_tasks = self.task_manager.pending_tasks()
+        # Goals picked for a session in progress stay picked
+        if self.timer_state in ("RUNNING", "PAUSED"): self.pending_tasks &= set(active_tasks)
+        else: self.pending_tasks.clear()
 
         if not active_tasks:
-            ctk.CTkLabel(self.task_scroll, text="No active tasks for today.", font=("Roboto", 14), text_color="#64748b").pack(pady=20)
+            self.show_empty_hint()
             return
 
-        for t in active_tasks:
-            self.create_task_row(t["text"])
+        for text in active_tasks:
+            self.create_task_row(text)
+
+    def show_empty_hint(self):
+        self.empty_label = ctk.CTkLabel(self.task_scroll, text="No active tasks for today.", font=("Roboto", 14), text_color="#64748b")
+        self.empty_label.pack(pady=20)
+
+    def on_tasks_changed(self, event):
+        # Pushed by TaskManager (local edits or another process): patch rows in place
+        if event.day != datetime.now().strftime("%Y-%m-%d"): return
+        for text in event.added:
+            if self.empty_label:
+                self.empty_label.destroy()
+                self.empty_label = None
+            self.create_task_row(text)
+        for text in event.completed:
+            rows = self.task_rows.get(text)
+            if not rows: continue
+            rows.pop().destroy()
+            if not rows:
+                del self.task_rows[text]
+                self.pending_tasks.discard(text)
+        if not self.task_rows and not self.empty_label: self.show_empty_hint()
 
     def create_task_row(self, text):
         row = ctk.CTkFrame(self.task_scroll, fg_color="#0f172a", corner_radius=8)
         row.pack(fill="x", pady=4, padx=5)
+        self.task_rows.setdefault(text, []).append(row)
         
-        check_var = ctk.IntVar(value=0)
+        check_var = ctk.IntVar(value=1 if text in self.pending_tasks else 0)
         cb = ctk.CTkCheckBox(
             row, text=text, font=("Roboto", 14), variable=check_var,
             command=lambda: self.toggle_task(text, cb, check_var),
@@ -138,6 +201,7 @@ class TimerPage(ctk.CTkFrame):
             checkmark_color="white"
         )
         cb.pack(side="left", padx=15, pady=12)
+        if check_var.get(): cb.configure(text_color="gray")
 
     def toggle_task(self, text, widget, variable):
         if variable.get() == 1:
@@ -146,6 +210,28 @@ class TimerPage(ctk.CTkFrame):
         else:
             if text in self.pending_tasks: self.pending_tasks.remove(text)
             widget.configure(text_color=("white", "white"))
+        self.save_checkpoint()
+
+    # --- CHECKPOINT ---
+    def save_checkpoint(self):
+        # Rewritten on every state change (not per tick): the timer stores its deadline. Breaks aren't kept.
+        if self.timer_state in ("RUNNING", "PAUSED") and self.cycle.kind == FOCUS: self.checkpoint.save(self.timer, self.pending_tasks)
+
+    def restore_session(self):
+        goals = self.checkpoint.load(self.timer)
+        if goals is None: return
+        self.cycle.adopt(FOCUS)
+        self.timer_state = self.timer.state
+        self.pending_tasks = set(goals)
+        self.idle_frame.pack_forget()
+        self.active_frame.pack(expand=True)
+        self.hint_label.pack_forget()
+        self.timer_display.show(format_clock(self.timer.remaining()), "white")
+        if self.timer_state == "RUNNING": self.main_action_btn.configure(text="PAUSE", fg_color="#f59e0b", hover_color="#d97706", state="normal")
+        else: self.main_action_btn.configure(text="RESUME", fg_color="#10b981", hover_color="#059669", state="normal")
+        self.update_button_visibility()
+        self.refresh()
+        self.schedule_tick()
 
     def handle_keypress(self, event):
         if self.timer_state != "EDITING" or not self.winfo_viewable(): return
@@ -162,10 +248,10 @@ class TimerPage(ctk.CTkFrame):
 
     def update_display_while_typing(self):
         if self.input_string == "":
-            self.timer_label.configure(text="00:00", text_color="#334155")
+            self.timer_display.show("00:00", "#334155")
             self.main_action_btn.configure(state="disabled", fg_color="#334155")
         else:
-            self.timer_label.configure(text=f"{self.input_string}:00", text_color=ACCENT_COLOR)
+            self.timer_display.show(f"{self.input_string}:00", ACCENT_COLOR)
             self.main_action_btn.configure(state="normal", fg_color=ACCENT_COLOR)
 
     def enter_edit_mode(self):
@@ -173,9 +259,10 @@ class TimerPage(ctk.CTkFrame):
         self.input_string = ""
         self.idle_frame.pack_forget()
         self.active_frame.pack(expand=True)
-        self.timer_label.configure(text="00:00", text_color="#334155")
+        self.timer_display.show("00:00", "#334155")
         self.main_action_btn.configure(text="START", fg_color="#334155", state="disabled")
-        self.hint_label.pack(pady=(0, 10))
+        self.hint_label.configure(text="Type minutes...")
+        self.hint_label.pack(pady=(0, 10), before=self.timer_display)
         
         self.update_button_visibility() 
         self.refresh() 
@@ -187,71 +274,102 @@ class TimerPage(ctk.CTkFrame):
 
     def start_countdown(self):
         if self.input_string == "": return
+        self.cycle.start([(FOCUS, int(self.input_string))])
+
+    def start_pomodoro(self):
+        self.idle_frame.pack_forget()
+        self.active_frame.pack(expand=True)
+        self.refresh()
+        self.cycle.start(pomodoro_phases())
+
+    def on_phase_start(self, kind, minutes):
         self.timer_state = "RUNNING"
-        self.initial_time = int(self.input_string)
-        self.time_left = self.initial_time * 60
-        
-        self.hint_label.pack_forget()
-        self.timer_label.configure(text_color="white")
-        self.main_action_btn.configure(text="PAUSE", fg_color="#f59e0b", hover_color="#d97706")
-        
-        self.update_button_visibility() 
+        if kind == FOCUS:
+            self.hint_label.pack_forget()
+            self.timer_display.show(format_clock(self.timer.remaining()), "white")
+        else:
+            self.hint_label.configure(text=f"{'LONG BREAK' if kind == LONG_BREAK else 'BREAK'} · {minutes} min")
+            self.hint_label.pack(pady=(0, 10), before=self.timer_display)
+            self.timer_display.show(format_clock(self.timer.remaining()), BREAK_COLOR)
+        self.main_action_btn.configure(text="PAUSE", fg_color="#f59e0b", hover_color="#d97706", state="normal")
+        self.save_checkpoint()
+        self.update_button_visibility()
+        self.schedule_tick()
+
+    def on_phase_end(self, kind, minutes):
+        if kind == FOCUS: self.commit_session(minutes)
+        else: self.notify("Break over, back to focus!")
+
+    def on_phase_reminder(self, kind, seconds_left):
+        self.notify(f"{'Focus' if kind == FOCUS else 'Break'} ends in {format_clock(seconds_left)}.")
+
+    def notify(self, message):
+        try: notification.notify(title="Focus Timer", message=message, timeout=5)
+        except: pass
 
     def pause_timer(self):
         self.timer_state = "PAUSED"
+        self.cycle.pause()
+        self.save_checkpoint()
+        self.schedule_tick()
         self.main_action_btn.configure(text="RESUME", fg_color="#10b981", hover_color="#059669")
         self.update_button_visibility()
 
     def resume_timer(self):
         self.timer_state = "RUNNING"
+        self.cycle.resume()
+        self.save_checkpoint()
+        self.schedule_tick()
         self.main_action_btn.configure(text="PAUSE", fg_color="#f59e0b", hover_color="#d97706")
         self.update_button_visibility()
 
     def cancel_session(self):
         self.timer_state = "IDLE"
+        self.cycle.stop()
+        self.checkpoint.clear()
+        self.schedule_tick()
         self.active_frame.pack_forget()
         self.idle_frame.pack(expand=True)
         self.refresh()
 
     def finish_early(self):
-        total_seconds = self.initial_time * 60
-        elapsed_seconds = total_seconds - self.time_left
-        actual_minutes = max(1, elapsed_seconds // 60)
-        self.commit_session(actual_minutes)
-
-    def finish_natural(self):
-        self.commit_session(self.initial_time)
+        # Ends the phase now; a cycle carries on with its next phase
+        self.cycle.end()
+
+    def schedule_tick(self):
+        """
+        (Re)plans the repaint of the next shown second while the page is visible.
+        Phases end on the scheduler's deadline, so hidden, minimised, idle or
+        paused pages have no wake-ups at all.
+        """
+        if self.tick_job: self.after_cancel(self.tick_job)
+        self.tick_job = None
+        if self.timer_state != "RUNNING" or not self.winfo_viewable(): return
+        self.timer_display.show(format_clock(self.timer.remaining()))
+        self.tick_job = self.after(int((1 - self.timer.elapsed() % 1) * 1000) + 5, self.update_timer)
 
     def update_timer(self):
-        if self.timer_state == "RUNNING" and self.time_left > 0:
-            self.time_left -= 1
-            mins, secs = divmod(self.time_left, 60)
-            self.timer_label.configure(text=f"{mins:02d}:{secs:02d}")
-        elif self.timer_state == "RUNNING" and self.time_left == 0:
-            self.finish_natural()
-        self.after(1000, self.update_timer)
+        # Remaining time comes from the deadline, so late ticks don't drift
+        self.tick_job = None
+        self.schedule_tick()
 
     def commit_session(self, duration_mins):
         self.timer_state = "FINISHED"
+        self.schedule_tick()
         self.main_action_btn.configure(text="COMPLETED", fg_color="#334155", state="disabled")
         self.update_button_visibility() 
 
-        for task_text in self.pending_tasks:
-            self.task_manager.mark_done(task_text)
-
         finished_tasks_list = list(self.pending_tasks)
-        try: notification.notify(title="Focus Timer", message=f"Session Done! {duration_mins} min logged.", timeout=5)
-        except: pass
-        threading.Thread(target=self.save_session_to_web, args=(duration_mins, finished_tasks_list)).start()
-        self.after(2000, self.refresh)
+        # 🟢 FIX: one locked write for all the session's tasks; they are uploaded with the session below
+        self.task_manager.bulk([("done", task_text, None) for task_text in finished_tasks_list])
+        self.controller.stats.record_session(duration_mins, finished_tasks_list)
+        self.checkpoint.clear()   # only once the session is safely recorded
+        self.notify(f"Session Done! {duration_mins} min logged.")
+        executor.submit("upload", self.save_session_to_web, duration_mins, finished_tasks_list)
 
     def save_session_to_web(self, duration_mins, tasks_list):
-        data = {
-            "username": self.controller.username,
-            "date": datetime.now().strftime("%Y-%m-%d %H:%M"),
-            "duration": f"{duration_mins} min",
-            "tasks_done": tasks_list,
-            "task_count": len(tasks_list)
-        }
-        try: requests.post(config.FIREBASE_URL, json=data)
+        data = session_entry(self.controller.username, duration_mins, tasks_list)
+        # One (compressed) request for the session and its task completions
+        entries = [self.task_manager.task_entry(t) for t in tasks_list] + [data]
+        try: api_client.post_sessions(entries)
         except: pass
\ No newline at end of file
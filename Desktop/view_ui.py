@@ -1,8 +1,11 @@
+import time
+from collections import deque
 import customtkinter as ctk
 from view_timer import TimerPage
 from view_tasks import TasksPage
 from view_wheel import WheelPage
 from view_leaderboard import LeaderboardPage
+from view_stats import StatsPage
 
 # --- THEME COLORS ---
 # We define them here to keep everything consistent
@@ -12,6 +15,71 @@ ACCENT_COLOR = "#6366f1"    # Indigo 500 (Vibrant, Professional)
 TEXT_PRIMARY = "#f8fafc"    # White-ish
 TEXT_SECONDARY = "#94a3b8"  # Muted Slate
 
+class SlideTransition:
+    """
+    Page slide driven by elapsed time rather than a fixed number of steps: slow
+    frames are skipped, not queued, so a slide always ends after DURATION.
+    Starting a new slide finishes the one in flight first. If frames keep costing
+    more than FRAME_BUDGET, later page switches are made instantly, until enough
+    switches have gone by that the slow slides drop out of the recent ones.
+    """
+    DURATION = 0.18       # seconds
+    FRAME_MS = 16
+    FRAME_BUDGET = 0.05   # seconds of layout/redraw per frame before we give up on animating
+    MAX_SLOW_FRAMES = 2   # slow slides among the recent ones before switching instantly
+    RECENT_SLIDES = 6     # page switches (slid or instant) remembered for that
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.job = None
+        self.old_page = self.new_page = None
+        self.started = 0.0
+        # 🟢 FIX: a rolling window instead of a counter that only grew, so a busy moment doesn't disable slides for good
+        self.recent = deque(maxlen=self.RECENT_SLIDES)   # True for each switch that had a slow frame
+
+    @property
+    def instant(self):
+        return sum(self.recent) >= self.MAX_SLOW_FRAMES
+
+    def skip(self):
+        """Records a switch made without sliding; it ages out the slow ones, so sliding is tried again."""
+        self.finish()
+        self.recent.append(False)
+
+    def start(self, old_page, new_page):
+        self.finish()
+        self.old_page, self.new_page = old_page, new_page
+        new_page.place(relx=1.0, y=0, relwidth=1, relheight=1)
+        new_page.lift()
+        self.started = time.monotonic()
+        self.step()
+
+    def step(self):
+        self.job = None
+        progress = (time.monotonic() - self.started) / self.DURATION
+        if progress >= 1:
+            self.recent.append(False)
+            return self.finish()
+        frame_start = time.monotonic()
+        ease = 1 - pow(1 - progress, 3)
+        self.new_page.place(relx=1.0 - ease, y=0, relwidth=1, relheight=1)
+        self.old_page.place(relx=0.0 - (ease * 0.15), y=0, relwidth=1, relheight=1)
+        self.widget.update_idletasks()   # pay for the layout now, so we can time it
+        cost = time.monotonic() - frame_start
+        if cost > self.FRAME_BUDGET:
+            self.recent.append(True)
+            return self.finish()
+        self.job = self.widget.after(max(1, self.FRAME_MS - int(cost * 1000)), self.step)
+
+    def finish(self):
+        """Jumps an in-flight slide to its end state (no-op when idle)."""
+        if self.job: self.widget.after_cancel(self.job)
+        self.job = None
+        if self.new_page is None: return
+        if self.old_page is not self.new_page: self.old_page.place_forget()
+        self.new_page.place(relx=0, y=0, relwidth=1, relheight=1)
+        self.old_page = self.new_page = None
+
 class MainUI(ctk.CTkFrame):
     def __init__(self, parent, controller, username, task_manager):
         super().__init__(parent, fg_color=BG_COLOR)
@@ -21,6 +89,7 @@ class MainUI(ctk.CTkFrame):
         
         self.current_page_name = None
         self.pages = {}
+        self.transition = SlideTransition(self)
         
         self.setup_layout()
         self.init_pages()
@@ -46,6 +115,7 @@ class MainUI(ctk.CTkFrame):
         self.create_nav_btn("TASKS", "Tasks")
         self.create_nav_btn("WHEEL", "Wheel")
         self.create_nav_btn("RANKS", "Leaderboard")
+        self.create_nav_btn("STATS", "Stats")
 
         # User Profile (Floating Card at bottom)
         user_frame = ctk.CTkFrame(self.sidebar, fg_color="#1e293b", corner_radius=12, border_width=1, border_color="#334155")
@@ -64,6 +134,7 @@ class MainUI(ctk.CTkFrame):
         self.pages["Tasks"] = TasksPage(self.container, self.controller, self.task_manager)
         self.pages["Wheel"] = WheelPage(self.container, self.controller, self.task_manager)
         self.pages["Leaderboard"] = LeaderboardPage(self.container, self.controller)
+        self.pages["Stats"] = StatsPage(self.container, self.controller, self.controller.stats, self.controller.search)
 
     def create_nav_btn(self, text, page_name):
         # Using a Frame to hold the button helps with sizing
@@ -97,25 +168,12 @@ class MainUI(ctk.CTkFrame):
         if hasattr(next_page, "refresh"): next_page.refresh()
         elif hasattr(next_page, "refresh_data"): next_page.refresh_data()
 
-        if not animate or not self.current_page_name:
+        if not animate or not self.current_page_name or self.transition.instant:
+            if self.transition.instant: self.transition.skip()
+            else: self.transition.finish()
             if self.current_page_name: self.pages[self.current_page_name].place_forget()
             next_page.place(x=0, y=0, relwidth=1, relheight=1)
-            self.current_page_name = page_name
         else:
-            old_page = self.pages[self.current_page_name]
-            next_page.place(relx=1.0, y=0, relwidth=1, relheight=1)
-            next_page.lift()
-            self.animate_slide(old_page, next_page)
-            self.current_page_name = page_name
-
-    def animate_slide(self, old_page, new_page, step=0):
-        limit = 12 # Slightly faster for snappy feel
-        if step > limit:
-            old_page.place_forget()
-            new_page.place(relx=0, y=0, relwidth=1, relheight=1)
-            return
-        progress = step / limit
-        ease = 1 - pow(1 - progress, 3)
-        new_page.place(relx=1.0 - ease, y=0, relwidth=1, relheight=1)
-        old_page.place(relx=0.0 - (ease * 0.15), y=0, relwidth=1, relheight=1)
-        self.after(10, lambda: self.animate_slide(old_page, new_page, step + 1))
\ No newline at end of file
+            # A click mid-slide snaps the running slide to its end, then slides on from there
+            self.transition.start(self.pages[self.current_page_name], next_page)
+        self.current_page_name = page_name
\ No newline at end of file
@@ -1,16 +1,19 @@
 import customtkinter as ctk
-import random
-import time
-import threading
 from datetime import datetime
+from core.sampler import TaskSampler
+
+SPIN_FRAMES = 25
 
 class WheelPage(ctk.CTkFrame):
-    def __init__(self, parent, controller, task_manager):
+    def __init__(self, parent, controller, task_manager, seed=None):
         super().__init__(parent, fg_color="transparent")
         self.controller = controller
         self.task_manager = task_manager
         self.spinning = False
+        # Weighted by how often a task was skipped; kept current from change events
+        self.sampler = TaskSampler(task_manager, seed=seed)
         self.setup_ui()
+        self.task_manager.subscribe(lambda event: self.controller.dispatcher.post(self.on_tasks_changed, event))
 
     def setup_ui(self):
         self.header = ctk.CTkLabel(self, text="TASK ROULETTE", font=("Roboto Medium", 14), text_color="#606060")
@@ -38,35 +41,41 @@ class WheelPage(ctk.CTkFrame):
         )
         self.spin_btn.pack(pady=40)
 
-        self.hint_label = ctk.CTkLabel(self, text="Picks a random task from your active list.", font=("Roboto", 12), text_color="gray")
+        self.hint_label = ctk.CTkLabel(self, text="Picks a task from your active list. Skipped ones come up more often.", font=("Roboto", 12), text_color="gray")
         self.hint_label.pack(side="bottom", pady=20)
 
     def refresh(self):
         self.result_label.configure(text="READY?", text_color="#2196F3")
         self.spin_btn.configure(state="normal", fg_color="#E91E63")
 
-    def start_spin(self):
-        date_key = datetime.now().strftime("%Y-%m-%d")
-        all_data = self.task_manager.load_data()
-        day_tasks = all_data.get(date_key, [])
-        active_tasks = [t["text"] for t in day_tasks if not t.get("done", False)]
+    def on_tasks_changed(self, event):
+        # The sampler follows the store itself; this only resets the display
+        if event.day != datetime.now().strftime("%Y-%m-%d"): return
+        if event.added and not self.spinning: self.refresh()
 
-        if not active_tasks:
+    def start_spin(self):
+        if not len(self.sampler):
             self.result_label.configure(text="NO TASKS!", text_color="#EF5350")
             return
 
         self.spin_btn.configure(state="disabled", fg_color="#424242")
         self.spinning = True
-        threading.Thread(target=self.run_animation, args=(active_tasks,)).start()
+        self.spin_step(0, 50)
 
-    def run_animation(self, tasks):
-        delay = 0.05
-        for _ in range(25):
-            selected = random.choice(tasks)
-            self.result_label.configure(text=selected, text_color="#ffffff")
-            time.sleep(delay)
-            delay += 0.01
-        
-        winner = random.choice(tasks)
-        self.result_label.configure(text=f"WINNER:\n{winner}", text_color="#00C853")
-        self.spin_btn.configure(state="normal", fg_color="#E91E63")
\ No newline at end of file
+    def spin_step(self, frame, delay_ms):
+        # Runs on the Tk loop: each frame schedules the next one, slowing down as it goes
+        if frame < SPIN_FRAMES:
+            selected = self.sampler.draw()
+            if selected is not None:
+                self.result_label.configure(text=selected, text_color="#ffffff")
+                self.after(delay_ms, self.spin_step, frame + 1, delay_ms + 10)
+                return
+
+        winner = self.sampler.pick()
+        if winner is None: self.result_label.configure(text="NO TASKS!", text_color="#EF5350")
+        else: self.result_label.configure(text=f"WINNER:\n{winner}", text_color="#00C853")
+        self.finish_spin()
+
+    def finish_spin(self):
+        self.spin_btn.configure(state="normal", fg_color="#E91E63")
+        self.spinning = False
\ No newline at end of file
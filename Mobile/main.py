@@ -1,6 +1,5 @@
 import os
 import sys
-import time
 import threading
 from datetime import datetime
 import flet as ft
@@ -16,6 +15,12 @@ if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
 from core.data_manager import TaskManager 
+from core import config, executor
+from core.analytics import FocusStats
+from core.search import TaskSearch
+from core.sync import SyncService
+from core.timer import FocusTimer, TimerCheckpoint, format_clock, session_entry, RUNNING, PAUSED
+from core.scheduler import CycleRunner, default_scheduler, pomodoro_phases, FOCUS
 
 def main(page: ft.Page):
     # 📱 Window Configuration
@@ -28,35 +33,91 @@ def main(page: ft.Page):
     
     # Initialize the shared data manager
     manager = TaskManager(username="MobileUser")
-    timer_data = {"running": False, "seconds": 1500}
+    timer = FocusTimer()
+    stats = FocusStats()
+    # Own file, so a session running on the Desktop app isn't picked up here
+    checkpoint = TimerCheckpoint("mobile_" + config.TIMER_STATE_FILE)
+    goals = set()
+    # Past tasks for type-ahead; loading (or rebuilding) the index stays off the UI
+    search = TaskSearch()
+    executor.submit("tasks", search.attach, manager)
+    # Shares the task list with the Desktop app when FOCUS_SYNC_URL points at it
+    sync = SyncService(manager).start() if config.SYNC_URL or config.SYNC_PORT else None
 
     # --- TIMER LOGIC ---
-    def format_time(s):
-        mins, secs = divmod(s, 60)
-        return f"{mins:02d}:{secs:02d}"
+    tick_job = None   # scheduler job for the next repaint
+    tick_lock = threading.Lock()
+    visible = True    # no repaints while the app is in the background
+
+    def schedule_tick():
+        # 🟢 FIX: one scheduler job per shown second instead of a sleep loop holding an executor worker
+        nonlocal tick_job
+        with tick_lock:
+            if tick_job: default_scheduler().cancel(tick_job)
+            tick_job = None
+            if timer.state != RUNNING or not visible: return
+            tick_job = default_scheduler().call_later(1 - timer.elapsed() % 1 + 0.005, update_timer)
 
     def update_timer():
-        while timer_data["running"] and timer_data["seconds"] > 0:
-            time.sleep(1)
-            timer_data["seconds"] -= 1
-            timer_text.value = format_time(timer_data["seconds"])
-            page.update()
-        
-        if timer_data["seconds"] == 0:
-            timer_data["running"] = False
-            start_btn.content.value = "START SESSION"
-            page.update()
+        # Phases end on the shared scheduler's deadline; this only repaints
+        timer_text.value = format_clock(timer.remaining())
+        page.update()
+        schedule_tick()
+
+    def phase_started(kind, minutes):
+        timer_text.value = format_clock(timer.remaining())
+        timer_text.color = "white" if kind == FOCUS else "#10b981"
+        start_btn.content.value = "PAUSE"
+        schedule_tick()
+        page.update()
+
+    def record_session(minutes, tasks):
+        # Like the Desktop app: goals marked done, stats folded in, then one upload for the session and its tasks
+        manager.bulk([("done", text, None) for text in tasks])
+        stats.record_session(minutes, tasks)
+        checkpoint.clear()   # only once the session is safely recorded
+        executor.submit("upload", upload_session, minutes, tasks)
+
+    def upload_session(minutes, tasks):
+        from core import api_client   # deferred: requests is slow to import and only needed here
+        entries = [manager.task_entry(text) for text in tasks] + [session_entry(manager.username, minutes, tasks)]
+        try: api_client.post_sessions(entries)
+        except Exception as e: print(f"Upload Error: {e}")
+
+    def phase_ended(kind, minutes):
+        if kind == FOCUS:
+            # 🟢 FIX: a finished focus phase is a session: record it off the scheduler thread
+            executor.submit("tasks", record_session, minutes, sorted(goals))
+            goals.clear()
+        timer_text.value = format_clock(0)
+        start_btn.content.value = "START SESSION"
+        schedule_tick()
+        page.update()
+
+    cycle = CycleRunner(timer=timer, on_start=phase_started, on_end=phase_ended)
 
     def toggle_timer(e):
-        if not timer_data["running"]:
-            timer_data["running"] = True
+        if timer.state == RUNNING:
+            cycle.pause()
+            start_btn.content.value = "RESUME"
+        elif timer.state == PAUSED:
+            cycle.resume()
             start_btn.content.value = "PAUSE"
-            threading.Thread(target=update_timer, daemon=True).start()
         else:
-            timer_data["running"] = False
-            start_btn.content.value = "RESUME"
+            cycle.start([(FOCUS, config.FOCUS_MINS)])
+        schedule_tick()
+        if cycle.kind == FOCUS: checkpoint.save(timer, goals)
         page.update()
 
+    def start_pomodoro(e):
+        cycle.start(pomodoro_phases())
+        checkpoint.save(timer, goals)
+
+    def toggle_goal(e):
+        if e.control.value: goals.add(e.control.label)
+        else: goals.discard(e.control.label)
+        if cycle.kind == FOCUS: checkpoint.save(timer, goals)
+
     # --- UI COMPONENTS ---
     # Using white for high visibility on the dark background
     timer_text = ft.Text("25:00", size=48, weight="bold", color="white")
@@ -68,38 +129,58 @@ def main(page: ft.Page):
         style=ft.ButtonStyle(bgcolor="#6366f1", color="white"),
         width=250
     )
+    pomodoro_btn = ft.TextButton(content=ft.Text("POMODORO CYCLE", size=12), on_click=start_pomodoro)
 
     task_input = ft.TextField(
         label="Add a task...", 
         bgcolor="#1e293b", # Matches desktop CARD_COLOR
         expand=True,
+        on_change=lambda _: show_suggestions(),
         on_submit=lambda _: add_task()
     )
+    suggestions = ft.Row(wrap=True, spacing=5)
     
     tasks_list = ft.Column(scroll=ft.ScrollMode.AUTO, expand=True)
 
     def add_task():
         if not task_input.value: return
         # Save task using shared logic from core
-        date_key = manager.get_key(datetime.now())
-        data = manager.load_data()
-        tasks = data.get(date_key, [])
-        tasks.append({"text": task_input.value, "done": False})
-        data[date_key] = tasks
-        manager.save_data(data)
+        manager.add_task(task_input.value)
         
+        # The new checkbox arrives through on_tasks_changed
         task_input.value = ""
-        refresh_tasks()
+        suggestions.controls.clear()
+        page.update()
+
+    def show_suggestions():
+        # Most written past tasks with a word starting with what was typed
+        suggestions.controls = [
+            ft.TextButton(content=ft.Text(text, size=12), on_click=lambda _, t=text: pick_suggestion(t))
+            for text in search.suggest(task_input.value or "", 4)
+        ]
+        page.update()
+
+    def pick_suggestion(text):
+        task_input.value = text
+        add_task()
 
     def refresh_tasks():
         tasks_list.controls.clear()
-        # Load tasks from the shared JSON file
-        data = manager.load_data()
-        date_key = manager.get_key(datetime.now())
-        tasks = data.get(date_key, [])
-        for t in tasks:
-            if not t.get("done", False):
-                tasks_list.controls.append(ft.Checkbox(label=t["text"]))
+        # Pending tasks come straight from the manager's day index
+        for text in manager.pending_tasks():
+            tasks_list.controls.append(ft.Checkbox(label=text, value=text in goals, on_change=toggle_goal))
+        page.update()
+
+    def on_tasks_changed(event):
+        # Pushed by the manager, also when the Desktop app edits the shared file
+        if event.day != manager.get_key(datetime.now()): return
+        for text in event.added:
+            tasks_list.controls.append(ft.Checkbox(label=text, on_change=toggle_goal))
+        for text in event.completed:
+            for box in tasks_list.controls:
+                if box.label == text:
+                    tasks_list.controls.remove(box)
+                    break
         page.update()
 
     # --- LAYOUT ---
@@ -109,14 +190,41 @@ def main(page: ft.Page):
         # 🟢 FIXED: Using string "center" to avoid alignment errors
         ft.Container(content=timer_text, alignment=ft.alignment.Alignment(0, 0)),
         ft.Row([start_btn], alignment=ft.MainAxisAlignment.CENTER),
+        ft.Row([pomodoro_btn], alignment=ft.MainAxisAlignment.CENTER),
         ft.Divider(height=20),
         ft.Row([task_input, ft.IconButton(icon="add", on_click=lambda _: add_task())]),
+        suggestions,
         ft.Text("TODAY'S GOALS", size=12, color="gray", weight="bold"),
         tasks_list
     )
 
-    # Initial load of tasks
+    # Pick up a session that was running when the app was last closed
+    restored = checkpoint.load(timer)
+    if restored is not None:
+        goals.update(restored)
+        cycle.adopt(FOCUS)
+        timer_text.value = format_clock(timer.remaining())
+        start_btn.content.value = "PAUSE" if timer.state == RUNNING else "RESUME"
+        schedule_tick()
+
+    # Initial load of tasks, then live updates
     refresh_tasks()
+    manager.subscribe(on_tasks_changed)
+    def on_disconnect(e):
+        search.close()
+        if sync: sync.stop()
+
+    def on_lifecycle(e):
+        # Like the Desktop timer page: the clock only ticks while someone can see it
+        nonlocal visible
+        if e.state in (ft.AppLifecycleState.HIDE, ft.AppLifecycleState.PAUSE): visible = False
+        elif e.state in (ft.AppLifecycleState.SHOW, ft.AppLifecycleState.RESUME): visible = True
+        else: return
+        if visible and timer.state == RUNNING: update_timer()   # catch up at once, then tick again
+        else: schedule_tick()
+
+    page.on_disconnect = on_disconnect
+    page.on_app_lifecycle_state_change = on_lifecycle
 
 if __name__ == "__main__":
     # 🟢 FIXED: Using target=main to match the latest Flet expectations
@@ -0,0 +1,220 @@
+"""
+Command-line access to the shared task store, timer and stats, for scripting.
+Only uses core (never a GUI toolkit); the network client is imported just for uploads.
+
+  python -m core add "Write report" "Email Bob"
+  python -m core done "Write report"
+  python -m core list
+  python -m core log 25 --task "Write report"
+  python -m core timer 25 --task "Write report"
+  python -m core stats
+  python -m core search email
+  python -m core batch < ops.txt
+
+Batch input has one operation per line (blank lines and # comments are skipped):
+  add <text>
+  done <text>
+  log <minutes> [<task>; <task> ...]
+Prefix a line with @YYYY-MM-DD to target another day, or give JSON objects such as
+{"op": "add", "text": "...", "date": "2024-05-01"} / {"op": "log", "minutes": 25, "tasks": [...]}.
+Operations apply in input order. Finished tasks and sessions are uploaded to the
+leaderboard like in the apps (done, log, timer and batch take --offline to skip that).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from . import config
+from .data_manager import TaskManager
+from .analytics import FocusStats
+from .search import TaskSearch
+from .timer import FocusTimer, format_clock, session_entry
+
+BATCH_CHUNK = 5000   # operations per locked write in batch mode
+
+def current_user():
+    try:
+        with open(config.CONFIG_FILE, "r") as f: return json.load(f).get("username", "Guest")
+    except (OSError, ValueError): return "Guest"
+
+def upload(entries):
+    if not entries: return
+    from . import api_client   # deferred: keeps startup fast when nothing is uploaded
+    try: api_client.post_sessions(entries).raise_for_status()
+    except Exception as e: print(f"Upload Error: {e}", file=sys.stderr)
+
+def log_sessions(manager, stats, sessions, username, offline=False):
+    """Records (minutes, tasks, date_key) sessions: tasks marked done, stats folded in, uploaded."""
+    manager.bulk([("done", t, day) for _, tasks, day in sessions for t in tasks])
+    stats.record_sessions([(mins, tasks, datetime.strptime(day, "%Y-%m-%d") if day else None) for mins, tasks, day in sessions])
+    if not offline:
+        upload([e for mins, tasks, _ in sessions for e in
+                [manager.task_entry(t) for t in tasks] + [session_entry(username, mins, tasks)]])
+
+def log_tasks(manager, stats, ops, offline=False):
+    """Records ("done", text, date_key) completions made outside a session: stats folded in, uploaded."""
+    days = {}
+    for _, text, day in ops: days.setdefault(day, []).append(text)
+    for day, texts in days.items(): stats.record_tasks(texts, datetime.strptime(day, "%Y-%m-%d") if day else None)
+    if not offline: upload([manager.task_entry(text) for _, text, _ in ops])   # like the apps' mark_done
+
+def parse_op(line):
+    """Batch line -> (op, args, date_key)."""
+    if line.startswith("{"):
+        obj = json.loads(line)
+        op = obj.get("op")
+        if op in ("add", "done"): return op, str(obj["text"]), obj.get("date")
+        if op == "log": return op, (int(obj["minutes"]), [str(t) for t in obj.get("tasks", [])]), obj.get("date")
+        raise ValueError(f"unknown op {op!r}")
+    date_key = None
+    if line.startswith("@"):
+        date_key, _, line = line[1:].partition(" ")
+        datetime.strptime(date_key, "%Y-%m-%d")
+    op, _, rest = line.strip().partition(" ")
+    rest = rest.strip()
+    if op in ("add", "done") and rest: return op, rest, date_key
+    if op == "log" and rest:
+        mins, _, tasks = rest.partition(" ")
+        return op, (int(mins), [t.strip() for t in tasks.split(";") if t.strip()]), date_key
+    raise ValueError(f"cannot parse {line!r}")
+
+# --- COMMANDS ---
+def cmd_add(args, manager):
+    manager.bulk([("add", t, args.date) for t in args.text])
+    print(f"Added {len(args.text)} task(s)")
+
+def cmd_done(args, manager):
+    ops = [("done", t, args.date) for t in args.text]
+    manager.bulk(ops)
+    log_tasks(manager, FocusStats(), ops, args.offline)
+    print(f"Completed {len(args.text)} task(s)")
+
+def cmd_list(args, manager):
+    date_key = args.date or datetime.now().strftime("%Y-%m-%d")
+    if args.all:
+        for t in manager.load_data().get(date_key, []): print(f"[{'x' if t.get('done') else ' '}] {t['text']}")
+    else:
+        for text in manager.pending_tasks(date_key): print(text)
+
+def cmd_progress(args, manager):
+    done, total = manager.progress(args.date)
+    print(f"{done}/{total}")
+
+def cmd_log(args, manager):
+    log_sessions(manager, FocusStats(), [(args.minutes, args.task, args.date)], args.user or current_user(), args.offline)
+    print(f"Logged {args.minutes} min")
+
+def cmd_timer(args, manager):
+    timer = FocusTimer()
+    timer.start(args.minutes)
+    try:
+        while not timer.is_done():
+            print(f"\r{format_clock(timer.remaining())}", end="", flush=True)
+            time.sleep(1 - timer.elapsed() % 1)   # wake on the next whole second
+    except KeyboardInterrupt: pass   # Ctrl+C finishes early, like the FINISH button
+    minutes = timer.finish()
+    print(f"\r{format_clock(timer.remaining())}")
+    log_sessions(manager, FocusStats(), [(minutes, args.task, None)], args.user or current_user(), args.offline)
+    print(f"Logged {minutes} min")
+
+def cmd_stats(args, manager):
+    stats = FocusStats()
+    for label, (mins, tasks) in (("Today", stats.day()), ("This week", stats.week()),
+                                 ("This month", stats.month()), ("Last 7 days", stats.last_7_days())):
+        print(f"{label:<12} {mins:>6} min  {tasks:>4} tasks")
+    print(f"Streak       {stats.current_streak()} day(s) (best {stats.best_streak()})")
+
+def cmd_search(args, manager):
+    search = TaskSearch().attach(manager)
+    try:
+        for text, count in search.search(" ".join(args.query), args.limit): print(f"{count:>5}  {text}")
+    finally: search.close()
+
+def cmd_batch(args, manager):
+    source = open(args.file, "r") if args.file else sys.stdin
+    stats, username = FocusStats(), args.user or current_user()
+    run, run_kind, counts, errors = [], None, {"add": 0, "done": 0, "log": 0}, 0
+
+    def flush():
+        # 🟢 FIX: one run of consecutive task ops (or sessions) at a time, so lines apply in input order
+        if run_kind == "log": log_sessions(manager, stats, run, username, args.offline)
+        elif run:
+            manager.bulk(run)
+            log_tasks(manager, stats, [o for o in run if o[0] == "done"], args.offline)
+        run.clear()
+
+    try:
+        for n, line in enumerate(source, 1):
+            line = line.strip()
+            if not line or line.startswith("#"): continue
+            try: op, value, date_key = parse_op(line)
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"line {n}: {e}", file=sys.stderr)
+                errors += 1
+                continue
+            kind = "log" if op == "log" else "tasks"
+            if kind != run_kind or len(run) >= BATCH_CHUNK:
+                flush()
+                run_kind = kind
+            run.append(value + (date_key,) if op == "log" else (op, value, date_key))
+            counts[op] += 1
+        flush()
+    finally:
+        if args.file: source.close()
+    print(f"Added {counts['add']}, completed {counts['done']}, logged {counts['log']} session(s)"
+          + (f", {errors} bad line(s)" if errors else ""))
+    return 1 if errors else 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m core", description="Focus Station without the GUI")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def command(name, func, help_text):
+        p = sub.add_parser(name, help=help_text)
+        p.set_defaults(func=func)
+        return p
+
+    p = command("add", cmd_add, "add tasks")
+    p.add_argument("text", nargs="+")
+    p.add_argument("--date", help="YYYY-MM-DD (default today)")
+    p = command("done", cmd_done, "mark tasks done")
+    p.add_argument("text", nargs="+")
+    p.add_argument("--date")
+    p.add_argument("--offline", action="store_true", help="don't upload to the leaderboard")
+    p = command("list", cmd_list, "print pending tasks")
+    p.add_argument("--date")
+    p.add_argument("--all", action="store_true", help="include finished tasks")
+    p = command("progress", cmd_progress, "print done/total for a day")
+    p.add_argument("--date")
+    for name, func, help_text in (("log", cmd_log, "record a finished session"), ("timer", cmd_timer, "run a countdown, then log it")):
+        p = command(name, func, help_text)
+        p.add_argument("minutes", type=int)
+        p.add_argument("--task", action="append", default=[], help="task finished in the session (repeatable)")
+        p.add_argument("--user", help="leaderboard name (default from the config file)")
+        p.add_argument("--offline", action="store_true", help="don't upload to the leaderboard")
+        if name == "log": p.add_argument("--date")
+    command("stats", cmd_stats, "print your focus stats")
+    p = command("search", cmd_search, "find past tasks, most written first")
+    p.add_argument("query", nargs="+")
+    p.add_argument("--limit", type=int, default=20)
+    p = command("batch", cmd_batch, "apply operations read from stdin or a file")
+    p.add_argument("file", nargs="?")
+    p.add_argument("--user")
+    p.add_argument("--offline", action="store_true", help="don't upload to the leaderboard")
+    for name in ("add", "done", "log", "timer", "batch"): sub.choices[name].set_defaults(writes=True)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    manager = TaskManager(args.user if getattr(args, "user", None) else current_user())
+    # Keep a saved search index current, rather than leaving it to be rebuilt by the next reader
+    search = TaskSearch().attach(manager) if getattr(args, "writes", False) and os.path.exists(config.SEARCH_INDEX_FILE) else None
+    try: return args.func(args, manager) or 0
+    finally:
+        if search: search.close()
+        manager.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
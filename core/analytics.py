@@ -0,0 +1,165 @@
+import json
+import heapq
+import os
+import threading
+from datetime import datetime, date, timedelta
+from . import config
+from .utils import file_lock, atomic_write
+
+def week_key(day):
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+class FocusStats:
+    """
+    Your own focus history as precomputed rollups, so trends never need the
+    global leaderboard. Every committed session updates the day, ISO-week and
+    month buckets, running totals, per-task counts and the streak in place;
+    every query is a dict lookup (or a fixed 7-bucket sum), whatever the history length.
+    """
+    def __init__(self, path=None):
+        self.path = path or config.STATS_FILE
+        self._lock = threading.RLock()
+        self._token = None
+        self.data = self._empty()
+        self._reload()
+
+    @staticmethod
+    def _empty():
+        return {
+            "days": {}, "weeks": {}, "months": {},   # key -> [minutes, tasks]
+            "per_task": {},                          # task text -> times completed
+            "minutes": 0, "tasks": 0, "sessions": 0, "active_days": 0,
+            "streak": 0, "best_streak": 0, "last_day": None,
+        }
+
+    def _file_token(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_ino, st.st_mtime_ns, st.st_size)
+        except OSError: return None
+
+    def _reload(self):
+        token = self._file_token()
+        if token is None or token == self._token: return
+        try:
+            with open(self.path, "r") as f: loaded = json.load(f)
+            self.data = dict(self._empty(), **loaded)
+            self._token = token
+        except (OSError, ValueError) as e:
+            print(f"Stats Load Error: {e}")
+
+    # --- UPDATES ---
+    def record_session(self, minutes, tasks_done=(), when=None):
+        """Folds one finished session into every rollup and saves."""
+        self.record_sessions([(minutes, tasks_done, when)])
+
+    def record_sessions(self, sessions):
+        """Folds (minutes, tasks_done, when) sessions into the rollups with a single save."""
+        with self._lock, file_lock(self.path + ".lock"):
+            self._reload()   # another process may have recorded a session meanwhile
+            for minutes, tasks_done, when in sessions: self._fold(minutes, list(tasks_done), (when or datetime.now()).date())
+            atomic_write(self.path, json.dumps(self.data))
+            self._token = self._file_token()
+
+    def record_tasks(self, tasks_done, when=None):
+        """Folds tasks finished outside a focus session (e.g. `python -m core done`) into the task rollups."""
+        with self._lock, file_lock(self.path + ".lock"):
+            self._reload()
+            self._fold(0, list(tasks_done), (when or datetime.now()).date(), session=False)
+            atomic_write(self.path, json.dumps(self.data))
+            self._token = self._file_token()
+
+    def seed(self, sessions):
+        """
+        Backfills a history with nothing recorded yet (e.g. the first run on this
+        machine) from past (minutes, tasks_done, when) sessions, such as the user's
+        uploads in the leaderboard mirror; minutes None marks tasks finished outside
+        a session. Returns whether anything was folded in.
+        """
+        if self.data["sessions"] or self.data["tasks"]: return False   # the common case, without the file lock
+        with self._lock, file_lock(self.path + ".lock"):
+            self._reload()
+            if self.data["sessions"] or self.data["tasks"]: return False
+            for minutes, tasks_done, when in sessions:
+                self._fold(minutes or 0, list(tasks_done), when.date(), session=minutes is not None)
+            if not self.data["sessions"] and not self.data["tasks"]: return False
+            atomic_write(self.path, json.dumps(self.data))
+            self._token = self._file_token()
+            return True
+
+    def _fold(self, minutes, tasks_done, day, session=True):
+        d = self.data
+        day_key = day.isoformat()
+        if day_key not in d["days"]: d["active_days"] += 1
+        for bucket, key in (("days", day_key), ("weeks", week_key(day)), ("months", day_key[:7])):
+            totals = d[bucket].setdefault(key, [0, 0])
+            totals[0] += minutes
+            totals[1] += len(tasks_done)
+        for t in tasks_done: d["per_task"][t] = d["per_task"].get(t, 0) + 1
+        d["minutes"] += minutes
+        d["tasks"] += len(tasks_done)
+        if not session: return   # finished tasks alone don't count as a session or extend the streak
+        d["sessions"] += 1
+
+        last = date.fromisoformat(d["last_day"]) if d["last_day"] else None
+        if last is None or day > last:
+            d["streak"] = d["streak"] + 1 if last == day - timedelta(days=1) else 1
+            d["last_day"] = day_key
+            d["best_streak"] = max(d["best_streak"], d["streak"])
+
+    # --- QUERIES ---
+    def day(self, day=None):
+        """(minutes, tasks) for a date (default today)."""
+        day = day or date.today()
+        with self._lock: return tuple(self.data["days"].get(day.isoformat(), (0, 0)))
+
+    def week(self, day=None):
+        day = day or date.today()
+        with self._lock: return tuple(self.data["weeks"].get(week_key(day), (0, 0)))
+
+    def month(self, day=None):
+        day = day or date.today()
+        with self._lock: return tuple(self.data["months"].get(day.isoformat()[:7], (0, 0)))
+
+    def last_7_days(self, day=None):
+        """Rolling (minutes, tasks) over the 7 days ending at `day`."""
+        day = day or date.today()
+        with self._lock:
+            days = self.data["days"]
+            buckets = [days.get((day - timedelta(days=i)).isoformat(), (0, 0)) for i in range(7)]
+        return sum(b[0] for b in buckets), sum(b[1] for b in buckets)
+
+    def current_streak(self, today=None):
+        """Consecutive focused days ending today (or yesterday, if today isn't done yet)."""
+        today = today or date.today()
+        with self._lock:
+            last = self.data["last_day"]
+            if not last or date.fromisoformat(last) < today - timedelta(days=1): return 0
+            return self.data["streak"]
+
+    def best_streak(self):
+        with self._lock: return self.data["best_streak"]
+
+    def averages(self):
+        """(minutes per active day, minutes per session)."""
+        with self._lock:
+            d = self.data
+            per_day = d["minutes"] / d["active_days"] if d["active_days"] else 0
+            per_session = d["minutes"] / d["sessions"] if d["sessions"] else 0
+        return per_day, per_session
+
+    def task_total(self, task_text):
+        with self._lock: return self.data["per_task"].get(task_text, 0)
+
+    def top_tasks(self, n=5):
+        """[(task, times completed)] for the n most completed tasks."""
+        with self._lock: return heapq.nlargest(n, self.data["per_task"].items(), key=lambda kv: kv[1])
+
+    def totals(self):
+        """(minutes, tasks, sessions) over all time."""
+        with self._lock: return self.data["minutes"], self.data["tasks"], self.data["sessions"]
+
+    def refresh(self):
+        """Picks up sessions recorded by another process (e.g. the Mobile app)."""
+        with self._lock: self._reload()
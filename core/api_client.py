@@ -0,0 +1,115 @@
+import gzip
+import json
+import threading
+import requests
+from . import config
+from .utils import PushIds
+
+GZIP_MIN_BYTES = 1024   # smaller bodies aren't worth compressing
+
+_local = threading.local()
+_push_ids = PushIds()
+_gzip_rejected = False   # set once the server refuses a compressed body
+
+def _http():
+    # One keep-alive session per thread instead of a new connection per call
+    session = getattr(_local, "session", None)
+    if session is None: session = _local.session = requests.Session()
+    return session
+
+def _headers():
+    return {"Accept-Encoding": "gzip" if config.COMPRESS_TRANSFERS else "identity"}
+
+def fetch_sessions(after_key=None, timeout=15):
+    """
+    Leaderboard sessions as {push_id: entry}.
+    Firebase push ids sort by creation time, so passing the newest key we already
+    have only downloads the sessions posted after it.
+    """
+    params = {}
+    if after_key: params = {"orderBy": '"$key"', "startAt": f'"{after_key}"'}
+    resp = _http().get(config.FIREBASE_URL, params=params, headers=_headers(), timeout=timeout)
+    resp.raise_for_status()
+    data = resp.json() or {}
+    data.pop(after_key, None)   # startAt is inclusive
+    return data
+
+def post_session(entry, timeout=10):
+    return _http().post(config.FIREBASE_URL, json=entry, headers=_headers(), timeout=timeout)
+
+def post_sessions(entries, timeout=10):
+    """
+    Uploads several sessions in one PATCH, using client-side push ids like the
+    Firebase SDKs do. Large bodies are gzipped unless COMPRESS_TRANSFERS is off;
+    if the server rejects that, we fall back to plain JSON for the rest of the run.
+    """
+    global _gzip_rejected
+    if len(entries) == 1: return post_session(entries[0], timeout)
+    body = json.dumps({_push_ids.next(): e for e in entries}).encode()
+    headers = dict(_headers(), **{"Content-Type": "application/json"})
+
+    if config.COMPRESS_TRANSFERS and not _gzip_rejected and len(body) >= GZIP_MIN_BYTES:
+        resp = _http().patch(config.FIREBASE_URL, data=gzip.compress(body, 6),
+                             headers=dict(headers, **{"Content-Encoding": "gzip"}), timeout=timeout)
+        if resp.status_code not in (400, 415): return resp
+        _gzip_rejected = True
+    return _http().patch(config.FIREBASE_URL, data=body, headers=headers, timeout=timeout)
+
+class EventStream:
+    """
+    Follows the RTDB REST event stream (server-sent events) for the leaderboard
+    over one persistent connection, reconnecting with backoff when it drops.
+    on_event(event, path, data) runs on the stream thread for every put/patch;
+    params_fn() supplies the query for each (re)connect, so it can resume from a cursor.
+    """
+    def __init__(self, on_event, params_fn=dict):
+        self.on_event = on_event
+        self.params_fn = params_fn
+        self._stop = threading.Event()
+        self._resp = None
+        self._thread = None
+
+    def start(self):
+        if self._thread: return
+        self._thread = threading.Thread(target=self._run, name="LeaderboardStream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        resp = self._resp
+        if resp is not None:
+            # Unblocks the read instead of waiting for the next keep-alive
+            try: resp.close()
+            except Exception: pass
+
+    def _run(self):
+        backoff = 1
+        while not self._stop.is_set():
+            try:
+                self._follow()
+                backoff = 1
+            except Exception as e:
+                if self._stop.is_set(): break
+                print(f"Stream Error: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 60)
+
+    def _follow(self):
+        headers = dict(_headers(), Accept="text/event-stream")
+        # Read timeout well above the server's 30s keep-alives catches dead links
+        with _http().get(config.FIREBASE_URL, params=self.params_fn(), headers=headers,
+                         stream=True, timeout=(10, 90)) as resp:
+            resp.raise_for_status()
+            self._resp = resp
+            event = None
+            for line in resp.iter_lines(decode_unicode=True):
+                if self._stop.is_set(): return
+                if line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:"):
+                    if event in ("put", "patch"):
+                        payload = json.loads(line[5:])
+                        self.on_event(event, payload["path"], payload["data"])
+                    elif event in ("cancel", "auth_revoked"):
+                        raise ConnectionError(f"stream {event}")
+        self._resp = None
@@ -1,5 +1,7 @@
 # core/config.py
 
+import os
+
 # 🟢 REMOVED: import customtkinter as ctk 
 # (This prevents mobile crashes!)
 
@@ -18,6 +20,36 @@ CURRENT_VERSION = "0.9.0"
 
 VERSION_URL = f"https://raw.githubusercontent.com/{GITHUB_USER}/{GITHUB_REPO}/main/timer/version.txt"
 RELEASE_URL = f"https://github.com/{GITHUB_USER}/{GITHUB_REPO}/releases/latest/download/"
-FIREBASE_URL = "https://productivity-71d06-default-rtdb.europe-west1.firebasedatabase.app/leaderboard.json"
+# FOCUS_FIREBASE_URL points the apps at another database, e.g. core.fake_rtdb for testing
+FIREBASE_URL = os.environ.get("FOCUS_FIREBASE_URL", "https://productivity-71d06-default-rtdb.europe-west1.firebasedatabase.app/leaderboard.json")
+# Set FOCUS_COMPRESS=0 to turn off gzip on leaderboard transfers and snapshot files
+COMPRESS_TRANSFERS = os.environ.get("FOCUS_COMPRESS", "1") != "0"
 CONFIG_FILE = "user_config.json"
-TASKS_FILE = "user_tasks.json"
\ No newline at end of file
+TASKS_FILE = "user_tasks.json"
+# Task search index, saved next to the task store
+SEARCH_INDEX_FILE = "user_tasks.index.json.gz"
+STATS_FILE = "user_stats.json"
+TIMER_STATE_FILE = "timer_state.json"
+# Whether a session restored after the app was closed counts the time it was closed
+CREDIT_CLOSED_TIME = True
+# Pomodoro cycle: focus rounds with short breaks, and a long break every few rounds
+FOCUS_MINS = 25
+SHORT_BREAK_MINS = 5
+LONG_BREAK_MINS = 15
+LONG_BREAK_EVERY = 4
+POMODORO_ROUNDS = 4
+# Heads-up notification this many seconds before a phase ends (0 to turn off)
+REMIND_BEFORE_SECS = 60
+LEADERBOARD_DB = "leaderboard_cache.db"
+LEADERBOARD_SNAPSHOT = "leaderboard_snapshot.json.gz"
+# Seconds the leaderboard is shown without revalidating in the background
+LEADERBOARD_TTL = 60
+# Task sync between devices: set FOCUS_SYNC_PORT on the device that serves, FOCUS_SYNC_URL on the others
+SYNC_STATE_FILE = "sync_state.json.gz"
+SYNC_URL = os.environ.get("FOCUS_SYNC_URL", "")
+SYNC_PORT = int(os.environ.get("FOCUS_SYNC_PORT", "0"))
+# Serving device's address; anything but loopback also needs FOCUS_SYNC_TOKEN, a secret every device shares
+SYNC_HOST = os.environ.get("FOCUS_SYNC_HOST", "127.0.0.1")
+SYNC_TOKEN = os.environ.get("FOCUS_SYNC_TOKEN", "")
+SYNC_INTERVAL = 30   # seconds between rounds
+SYNC_DEBOUNCE = 2    # seconds after a local edit before syncing it
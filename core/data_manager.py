@@ -1,60 +1,399 @@
+import copy
 import json
 import os
 import threading
-import requests
+from collections import deque, namedtuple
+from contextlib import contextmanager
 from datetime import datetime
 # Use relative import for the shared config
-from . import config 
+from . import config
+from . import executor
+from .utils import file_lock, atomic_write, FileWatcher
+
+# Change notification sent to subscribers. `added` holds new tasks that are still
+# pending, `completed` holds tasks that became done (both as lists of texts), and
+# `created` the texts in `completed` that weren't on the day's list before.
+# seq: the manager's change counter after the write the event describes (see TaskManager.stamp)
+TaskEvent = namedtuple("TaskEvent", ["day", "added", "completed", "created", "seq"], defaults=((), 0))
+
+class DayIndex:
+    """
+    Bookkeeping for one day's task list, so lookups don't rescan the day.
+    Positions refer to the index of a task inside the day's list.
+    """
+    __slots__ = ("open_by_text", "pending", "done_count")
+
+    def __init__(self, day_tasks=()):
+        self.open_by_text = {}   # text -> deque of undone positions (oldest first)
+        self.pending = {}        # position -> None, used as an insertion-ordered set
+        self.done_count = 0
+        for pos, t in enumerate(day_tasks): self.add(pos, t)
+
+    def add(self, pos, task):
+        if task.get("done", False):
+            self.done_count += 1
+        else:
+            self.open_by_text.setdefault(task["text"], deque()).append(pos)
+            self.pending[pos] = None
+
+    def take(self, task_text):
+        """Removes and returns the first undone position for task_text, or None."""
+        positions = self.open_by_text.get(task_text)
+        if not positions: return None
+        pos = positions.popleft()
+        if not positions: del self.open_by_text[task_text]
+        del self.pending[pos]
+        self.done_count += 1
+        return pos
+
+def _keyed(day_tasks):
+    # Identify tasks by (text, n-th occurrence of that text) so both sides agree
+    seen, keyed = {}, {}
+    for t in day_tasks:
+        n = seen.get(t["text"], 0)
+        seen[t["text"]] = n + 1
+        keyed[(t["text"], n)] = t
+    return keyed
+
+def merge_day(base, ours, theirs):
+    """
+    Three-way merge of one day's task list.
+    Tasks added on either side are kept, a task removed on either side is dropped,
+    and a task counts as done if either side finished it.
+    """
+    kb, ko, kt = _keyed(base), _keyed(ours), _keyed(theirs)
+    merged = []
+    for key, task in list(kt.items()) + [(k, t) for k, t in ko.items() if k not in kt]:
+        if key in kb and (key not in ko or key not in kt): continue
+        done = kt.get(key, {}).get("done", False) or ko.get(key, {}).get("done", False)
+        merged.append(dict(task, done=done))
+    return merged
+
+def diff_data(old, new):
+    """TaskEvents describing how `new` differs from `old`, one per changed day."""
+    events = []
+    for day, new_tasks in new.items():
+        old_tasks = old.get(day, [])
+        if new_tasks == old_tasks: continue
+        ko = _keyed(old_tasks)
+        added, completed, created = [], [], []
+        for key, t in _keyed(new_tasks).items():
+            before = ko.get(key)
+            if t.get("done", False):
+                if before is None or not before.get("done", False): completed.append(t["text"])
+                if before is None: created.append(t["text"])
+            elif before is None:
+                added.append(t["text"])
+        if added or completed: events.append(TaskEvent(day, added, completed, created))
+    return events
+
+def merge_data(base, ours, theirs):
+    """Merges our edits (relative to base) into theirs, day by day."""
+    merged = dict(theirs)
+    for day in set(base) | set(ours):
+        b, o, t = base.get(day, []), ours.get(day), theirs.get(day)
+        if o == b: continue
+        if o is None:
+            if t == b: merged.pop(day, None)
+        elif t is None or t == b:
+            merged[day] = o
+        else:
+            merged[day] = merge_day(b, o, t)
+    return merged
 
 class TaskManager:
     """
     Shared Logic for Desktop and Mobile.
     Now independent of any specific UI framework (Tkinter/Flet).
+
+    Several processes (Desktop + Mobile) may share TASKS_FILE. Writes take an advisory
+    lock and replace the file atomically; if the file changed since we last read it,
+    our change is re-applied to (or merged with) the newer contents instead of clobbering it.
     """
     def __init__(self, username="Guest"):
         self.username = username
+        self._lock = threading.RLock()
+        self._data = {}
+        self._token = None
+        self._base_text = "{}"   # file contents our cache is based on (for merges)
+        self._indexes = {}
+        self._locked = False     # True while this instance holds the file lock
+        self._loaded = False
+        self._seq = 0            # bumped whenever the cached contents change
+        self._subscribers = []
+        self._watcher = None
 
-    def load_data(self):
-        if not os.path.exists(config.TASKS_FILE): return {}
+    def _lock_path(self):
+        return config.TASKS_FILE + ".lock"
+
+    def _file_token(self):
+        # A new inode on every atomic replace makes this a reliable version stamp
         try:
-            with open(config.TASKS_FILE, "r") as f:
-                data = json.load(f)
-                return {datetime.now().strftime("%Y-%m-%d"): data} if isinstance(data, list) else data
-        except: return {}
+            st = os.stat(config.TASKS_FILE)
+            return (st.st_ino, st.st_mtime_ns, st.st_size)
+        except OSError: return None
+
+    def _read_file(self):
+        token = self._file_token()
+        if token is None: return None, "{}"
+        with open(config.TASKS_FILE, "r") as f:
+            return token, f.read()
+
+    def load_data(self):
+        """Re-reads the file and returns a copy of its contents: edits go through save_data() or the task methods."""
+        # 🟢 FIX: handing out the cache itself let callers change it behind the day indexes and version
+        with self._lock: return copy.deepcopy(self._reload())
+
+    def _reload(self):
+        with self._lock:
+            try:
+                token, text = self._read_file()
+                data = json.loads(text)
+            except (OSError, ValueError):
+                # Possibly a legacy non-atomic writer mid-write: retry while holding the lock
+                try:
+                    if self._locked:
+                        token, text = self._read_file()
+                    else:
+                        with file_lock(self._lock_path()):
+                            token, text = self._read_file()
+                    data = json.loads(text)
+                except (OSError, ValueError):
+                    token, text, data = None, "{}", {}
+            if isinstance(data, list):
+                data = {datetime.now().strftime("%Y-%m-%d"): data}
+            old, was_loaded = self._data, self._loaded
+            self._data, self._token, self._base_text, self._indexes = data, token, text, {}
+            self._loaded = True
+            self._seq += 1
+            if self._subscribers and was_loaded: self._emit(diff_data(old, data), self._seq)
+            return data
+
+    def _write(self, data):
+        # Caller holds the file lock
+        text = json.dumps(data, indent=4)
+        atomic_write(config.TASKS_FILE, text)
+        self._data, self._token, self._base_text = data, self._file_token(), text
+        self._seq += 1
 
     def save_data(self, data):
-        with open(config.TASKS_FILE, "w") as f:
-            json.dump(data, f, indent=4)
+        with self._lock, self._file_locked():
+            if self._file_token() != self._token:
+                # Someone else saved since our last read: merge instead of overwriting
+                try:
+                    _, theirs_text = self._read_file()
+                    theirs = json.loads(theirs_text)
+                except (OSError, ValueError): theirs = {}
+                data = merge_data(json.loads(self._base_text), data, theirs)
+            before = json.loads(self._base_text) if self._subscribers else None
+            self._write(data)
+            self._indexes = {}
+            if before is not None: self._emit(diff_data(before, data), self._seq)
+
+    @contextmanager
+    def _file_locked(self):
+        with file_lock(self._lock_path()):
+            self._locked = True
+            try: yield
+            finally: self._locked = False
+
+    def _commit(self, apply):
+        """
+        Runs apply() against the latest file contents under the file lock, then saves.
+        If another process wrote in between, the cache is reloaded first, so the
+        operation is replayed on their version rather than lost.
+        Returns apply()'s result and the seq of the write.
+        """
+        with self._lock, self._file_locked():
+            self._state()
+            result = apply()
+            self._write(self._data)
+            return result, self._seq
+
+    def _state(self):
+        """Cached file contents; only re-read when the file changed on disk."""
+        with self._lock:
+            # 🟢 FIX: a missing file (token None) no longer forces a reload, which dropped a bulk's earlier edits
+            if not self._loaded or self._file_token() != self._token: self._reload()
+            return self._data
+
+    def version(self):
+        """Version stamp of the file contents the cache (and the events sent so far) reflect."""
+        with self._lock:
+            self._state()
+            return self._token
+
+    def stamp(self):
+        """(version, seq) of the cached contents: events with a higher seq describe later changes."""
+        with self._lock:
+            self._state()
+            return self._token, self._seq
+
+    def snapshot(self, fn):
+        """
+        Calls fn(data) on the cached contents under the lock, so nothing changes
+        meanwhile, and returns (fn's result, version, seq). fn must not modify data.
+        """
+        with self._lock:
+            data = self._state()
+            return fn(data), self._token, self._seq
+
+    def _day(self, date_key):
+        with self._lock:
+            data = self._state()
+            index = self._indexes.get(date_key)
+            if index is None:
+                index = self._indexes[date_key] = DayIndex(data.get(date_key, []))
+            return data.get(date_key, []), index
+
+    # --- CHANGE NOTIFICATIONS ---
+    def subscribe(self, callback):
+        """
+        Calls callback(TaskEvent) for every change to the task store, whether made
+        through this manager or by another process. Events from other processes
+        arrive on a watcher thread, so UI callbacks should hand off to their own loop.
+        Returns a function that unsubscribes.
+        """
+        with self._lock:
+            self._state()   # prime the cache so the first event is a real diff
+            self._subscribers.append(callback)
+            if self._watcher is None:
+                self._watcher = FileWatcher(config.TASKS_FILE, self._on_file_changed)
+                self._watcher.start()
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers: self._subscribers.remove(callback)
+        return unsubscribe
+
+    def close(self):
+        with self._lock:
+            if self._watcher: self._watcher.stop()
+            self._watcher = None
+            self._subscribers.clear()
+
+    def _on_file_changed(self):
+        # Our own saves update the token first, so only foreign writes reload here
+        self._state()
+
+    def _emit(self, events, seq):
+        for event in events:
+            event = event._replace(seq=seq)
+            for callback in list(self._subscribers):
+                try: callback(event)
+                except Exception as e: print(f"Subscriber Error: {e}")
 
     def get_key(self, date_obj):
         return date_obj.strftime("%Y-%m-%d")
 
-    def mark_done(self, task_text, date_key=None):
+    def pending_tasks(self, date_key=None):
+        """Texts of the day's undone tasks, in list order."""
         if not date_key: date_key = datetime.now().strftime("%Y-%m-%d")
-        all_data = self.load_data()
-        day_tasks = all_data.get(date_key, [])
-        
-        found = False
-        for t in day_tasks:
-            if t["text"] == task_text and not t.get("done", False):
-                t["done"] = True
-                found = True
-                break
-        
-        if not found: day_tasks.append({"text": task_text, "done": True})
-        
-        all_data[date_key] = day_tasks
-        self.save_data(all_data)
-        threading.Thread(target=self.upload, args=(task_text,)).start()
+        with self._lock:
+            day_tasks, index = self._day(date_key)
+            return [day_tasks[pos]["text"] for pos in index.pending]
 
-    def upload(self, task_name):
+    def progress(self, date_key=None):
+        """Returns (done, total) for the day."""
+        if not date_key: date_key = datetime.now().strftime("%Y-%m-%d")
+        with self._lock:
+            _, index = self._day(date_key)
+            return index.done_count, index.done_count + len(index.pending)
+
+    def _add(self, date_key, task_text, done=False):
+        # Callers hold the file lock (inside _commit)
+        _, index = self._day(date_key)
+        day_tasks = self._data.setdefault(date_key, [])
+        task = {"text": task_text, "done": done}
+        day_tasks.append(task)
+        index.add(len(day_tasks) - 1, task)
+
+    def _done(self, date_key, task_text):
+        _, index = self._day(date_key)
+        day_tasks = self._data.setdefault(date_key, [])
+        pos = index.take(task_text)
+        if pos is not None: day_tasks[pos]["done"] = True
+        else: self._add(date_key, task_text, done=True)
+        return pos is None   # True if the task wasn't on the list
+
+    def add_task(self, task_text, date_key=None, done=False):
+        if not date_key: date_key = datetime.now().strftime("%Y-%m-%d")
+        _, seq = self._commit(lambda: self._add(date_key, task_text, done))
+        if done: self._emit([TaskEvent(date_key, [], [task_text], [task_text])], seq)
+        else: self._emit([TaskEvent(date_key, [task_text], [])], seq)
+
+    def mark_done(self, task_text, date_key=None, upload=True):
+        if not date_key: date_key = datetime.now().strftime("%Y-%m-%d")
+        created, seq = self._commit(lambda: self._done(date_key, task_text))
+        self._emit([TaskEvent(date_key, [], [task_text], [task_text] if created else [])], seq)
+        if upload: executor.submit("upload", self.upload, task_text)
+
+    def bulk(self, ops):
+        """
+        Applies many ("add" | "done", task_text, date_key) operations in one locked
+        read-modify-write, instead of one file rewrite per task. date_key may be None
+        for today. Nothing is uploaded. Returns the number of operations applied.
+        """
+        today = datetime.now().strftime("%Y-%m-%d")
+        changes = {}   # day -> (added, completed, created)
+
+        def apply():
+            for action, task_text, date_key in ops:
+                date_key = date_key or today
+                added, completed, created = changes.setdefault(date_key, ([], [], []))
+                if action == "add":
+                    self._add(date_key, task_text)
+                    added.append(task_text)
+                else:
+                    if self._done(date_key, task_text): created.append(task_text)
+                    completed.append(task_text)
+
+        ops = list(ops)
+        for action, _, _ in ops:
+            if action not in ("add", "done"): raise ValueError(f"unknown task operation {action!r}")
+        if not ops: return 0
+        _, seq = self._commit(apply)
+        self._emit([TaskEvent(day, *lists) for day, lists in changes.items()], seq)
+        return len(ops)
+
+    def days(self, keys=None):
+        """Copies of the task lists of the given days (every day when keys is None)."""
+        with self._lock:
+            data = self._state()
+            return {d: [dict(t) for t in data.get(d, [])] for d in (data if keys is None else keys)}
+
+    def update_days(self, fn):
+        """
+        Calls fn(data) with the latest file contents under the file lock; the
+        {day: tasks} it returns replaces those days in the same locked write
+        (nothing is written if it returns nothing). Returns that dict.
+        """
+        with self._lock:
+            with self._file_locked():
+                self._state()
+                days = fn(self._data)
+                if not days: return {}
+                before = {day: self._data.get(day, []) for day in days}
+                for day, tasks in days.items():
+                    self._data[day] = tasks
+                    self._indexes.pop(day, None)
+                self._write(self._data)
+                seq = self._seq
+            self._emit(diff_data(before, days), seq)
+            return days
+
+    def task_entry(self, task_name):
+        """Leaderboard entry for a single finished task."""
         # 🟢 FIX: Uses self.username instead of self.controller.username
-        data = {
+        return {
             "username": self.username,
             "date": datetime.now().strftime("%Y-%m-%d %H:%M"),
             "duration": "0 min",
             "tasks_done": [task_name],
             "task_count": 1
         }
-        try: requests.post(config.FIREBASE_URL, json=data)
-        except: pass
\ No newline at end of file
+
+    def upload(self, task_name):
+        from . import api_client   # deferred: requests is slow to import and only needed here
+        try: api_client.post_session(self.task_entry(task_name))
+        except: pass
@@ -0,0 +1,135 @@
+# Shared background worker pool for the apps (no UI, no network)
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+MAX_WORKERS = 4
+# Most tasks a category may run at once; others wait in the category's queue
+CATEGORY_LIMITS = {
+    "leaderboard": 1,
+    "upload": 2,
+    "tasks": 1,
+    "updater": 1,
+    "ui": 2,
+    "sync": 1,
+}
+
+class BackgroundExecutor:
+    """
+    Bounded pool of daemon workers with named categories. Each category runs at
+    most its limit of tasks at a time; the rest queue without holding a worker.
+    Submitting with a key that is already queued or running returns that task's
+    future instead of starting a duplicate. Futures of queued tasks can be cancelled.
+    """
+    def __init__(self, max_workers=MAX_WORKERS, limits=None):
+        self.max_workers = max_workers
+        self.limits = dict(CATEGORY_LIMITS, **(limits or {}))
+        self._lock = threading.Lock()
+        self._ready = deque()          # (future, fn, args, kwargs, category, key) allowed to run
+        self._waiting = {}             # category -> deque of tasks over its limit
+        self._running = {}             # category -> running count
+        self._by_key = {}              # (category, key) -> future
+        self._workers = []
+        self._idle = 0
+        self._wake = threading.Condition(self._lock)
+        self._shutdown = False
+
+    def submit(self, category, fn, *args, key=None, **kwargs):
+        with self._lock:
+            if self._shutdown: raise RuntimeError("executor is shut down")
+            if key is not None:
+                existing = self._by_key.get((category, key))
+                if existing is not None and not existing.done(): return existing
+            future = Future()
+            task = (future, fn, args, kwargs, category, key)
+            if key is not None: self._by_key[(category, key)] = future
+            if self._running.get(category, 0) < self.limits.get(category, self.max_workers):
+                self._running[category] = self._running.get(category, 0) + 1
+                self._ready.append(task)
+                self._wake_worker()
+            else:
+                self._waiting.setdefault(category, deque()).append(task)
+            return future
+
+    def cancel(self, category):
+        """Cancels every queued (not yet started) task of a category."""
+        with self._lock:
+            tasks = list(self._waiting.pop(category, ()))
+            tasks += [t for t in self._ready if t[4] == category]
+        for task in tasks: task[0].cancel()
+
+    def shutdown(self, wait=True, timeout=None):
+        """Drops queued tasks and stops the workers, waiting up to timeout for running ones."""
+        with self._lock:
+            self._shutdown = True
+            queued = list(self._ready) + [t for q in self._waiting.values() for t in q]
+            self._ready.clear()
+            self._waiting.clear()
+            self._wake.notify_all()
+            workers = list(self._workers)
+        for task in queued: task[0].cancel()
+        if wait:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            for w in workers: w.join(None if deadline is None else max(0, deadline - time.monotonic()))
+
+    # --- WORKERS ---
+    def _wake_worker(self):
+        # Caller holds the lock
+        if self._idle: self._wake.notify()
+        elif len(self._workers) < self.max_workers:
+            worker = threading.Thread(target=self._work, name=f"Worker-{len(self._workers) + 1}", daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _next(self):
+        with self._lock:
+            while not self._ready and not self._shutdown:
+                self._idle += 1
+                self._wake.wait()
+                self._idle -= 1
+            return self._ready.popleft() if self._ready else None
+
+    def _finished(self, category, key, future):
+        with self._lock:
+            if key is not None and self._by_key.get((category, key)) is future: del self._by_key[(category, key)]
+            waiting = self._waiting.get(category)
+            while waiting and waiting[0][0].cancelled(): waiting.popleft()
+            if waiting and not self._shutdown:
+                # Hand our slot straight to the next task of the same category
+                self._ready.append(waiting.popleft())
+                self._wake_worker()
+            else:
+                self._running[category] -= 1
+
+    def _work(self):
+        while True:
+            task = self._next()
+            if task is None: return
+            future, fn, args, kwargs, category, key = task
+            try:
+                if future.set_running_or_notify_cancel():
+                    try: future.set_result(fn(*args, **kwargs))
+                    except BaseException as e:
+                        print(f"Background Error ({category}): {e}")
+                        future.set_exception(e)
+            finally:
+                self._finished(category, key, future)
+
+_default = None
+_default_lock = threading.Lock()
+
+def default_executor():
+    """The process-wide executor, created on first use."""
+    global _default
+    with _default_lock:
+        if _default is None: _default = BackgroundExecutor()
+        return _default
+
+def submit(category, fn, *args, key=None, **kwargs):
+    return default_executor().submit(category, fn, *args, key=key, **kwargs)
+
+def shutdown(wait=True, timeout=None):
+    with _default_lock:
+        executor = _default
+    if executor: executor.shutdown(wait, timeout)
@@ -0,0 +1,254 @@
+"""
+Local stand-in for the Firebase Realtime Database REST API, for tests and load runs.
+
+Covers the subset the app uses:
+  GET    /path.json   (orderBy="$key"|"<child>", startAt, endAt, limitToFirst, limitToLast)
+  POST   /path.json   push with a Firebase-style chronological id -> {"name": id}
+  PUT / PATCH / DELETE /path.json
+  ETag   "X-Firebase-ETag: true" returns an ETag, "if-match" makes writes conditional
+  gzip   responses honour Accept-Encoding, request bodies may be Content-Encoding: gzip
+  Stream "Accept: text/event-stream" sends put/patch server-sent events
+
+Run standalone with: python -m core.fake_rtdb --port 8765
+then point the apps at it with FOCUS_FIREBASE_URL=http://127.0.0.1:8765/leaderboard.json
+"""
+import gzip
+import json
+import queue
+import hashlib
+import argparse
+import threading
+from urllib.parse import urlsplit, parse_qs, unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from .utils import PushIds
+
+KEEP_ALIVE_SECS = 30
+GZIP_MIN_BYTES = 1024
+
+def split_path(path):
+    path = unquote(path)
+    if path.endswith(".json"): path = path[:-5]
+    return [p for p in path.split("/") if p]
+
+def _event(name, path, data):
+    return name, json.dumps({"path": path, "data": data})
+
+def etag_of(value):
+    return hashlib.md5(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+class Database:
+    """In-memory JSON tree with change listeners for streaming clients."""
+    def __init__(self, data=None):
+        self.root = data or {}
+        self.lock = threading.RLock()
+        self.listeners = []     # [(path parts, queue)]
+        self.ids = PushIds()
+
+    def get(self, parts):
+        node = self.root
+        for p in parts:
+            if not isinstance(node, dict) or p not in node: return None
+            node = node[p]
+        return node
+
+    def _set(self, parts, value):
+        if not parts:
+            self.root = value if isinstance(value, dict) else {}
+            return
+        node = self.root
+        for p in parts[:-1]:
+            if not isinstance(node.get(p), dict): node[p] = {}
+            node = node[p]
+        if value is None: node.pop(parts[-1], None)
+        else: node[parts[-1]] = value
+
+    def put(self, parts, value):
+        with self.lock:
+            self._set(parts, value)
+            self._publish("put", parts, value)
+
+    def patch(self, parts, changes):
+        with self.lock:
+            for key, value in changes.items():
+                self._set(parts + split_path(key), value)
+            self._publish("patch", parts, changes)
+
+    def push(self, parts, value):
+        with self.lock:
+            key = self.ids.next()
+            self._set(parts + [key], value)
+            self._publish("put", parts + [key], value)
+            return key
+
+    def listen(self, parts, params=None):
+        # Like RTDB, the query only shapes the initial snapshot
+        q = queue.Queue()
+        with self.lock:
+            self.listeners.append((parts, q))
+            q.put(_event("put", "/", apply_query(self.get(parts), params or {})))
+        return q
+
+    def unlisten(self, q):
+        with self.lock:
+            self.listeners = [(p, lq) for p, lq in self.listeners if lq is not q]
+
+    def _publish(self, event, parts, data):
+        # Called under the lock; events are encoded now since the tree keeps changing
+        for lparts, q in self.listeners:
+            if parts[:len(lparts)] == lparts:
+                q.put(_event(event, "/" + "/".join(parts[len(lparts):]), data))
+            elif lparts[:len(parts)] == parts:
+                # A write above the listener's path: resend its whole node
+                q.put(_event("put", "/", self.get(lparts)))
+
+def _rank(v):
+    # RTDB ordering: nulls, booleans, numbers, strings, then objects
+    if v is None: return (0, 0)
+    if isinstance(v, bool): return (1, v)
+    if isinstance(v, (int, float)): return (2, v)
+    if isinstance(v, str): return (3, v)
+    return (4, 0)
+
+def apply_query(value, params):
+    """Applies RTDB ordering/filtering query params to a node."""
+    if not isinstance(value, dict) or "orderBy" not in params: return value
+    order_by = json.loads(params["orderBy"])
+    if order_by == "$key": key_of = lambda kv: kv[0]
+    elif order_by == "$value": key_of = lambda kv: kv[1]
+    else: key_of = lambda kv: kv[1].get(order_by) if isinstance(kv[1], dict) else None
+
+    items = sorted(value.items(), key=lambda kv: (_rank(key_of(kv)), kv[0]))
+    if "startAt" in params:
+        start = _rank(json.loads(params["startAt"]))
+        items = [kv for kv in items if _rank(key_of(kv)) >= start]
+    if "endAt" in params:
+        end = _rank(json.loads(params["endAt"]))
+        items = [kv for kv in items if _rank(key_of(kv)) <= end]
+    if "limitToFirst" in params: items = items[:int(params["limitToFirst"])]
+    if "limitToLast" in params: items = items[-int(params["limitToLast"]):]
+    return dict(items)
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256    # the default of 5 resets connections under load
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    db = None   # set by make_server
+
+    def log_message(self, fmt, *args): pass
+
+    def _parts_and_params(self):
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        return split_path(url.path), params
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length) if length else b""
+        if raw and self.headers.get("Content-Encoding") == "gzip": raw = gzip.decompress(raw)
+        return json.loads(raw) if raw else None
+
+    def _send_json(self, value, status=200, etag=None):
+        self._send_body(json.dumps(value).encode(), status, etag)
+
+    def _send_body(self, body, status=200, etag=None):
+        gzipped = len(body) >= GZIP_MIN_BYTES and "gzip" in self.headers.get("Accept-Encoding", "")
+        if gzipped: body = gzip.compress(body, 6)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if gzipped: self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        if etag: self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _check_if_match(self, parts):
+        expected = self.headers.get("if-match")
+        if expected is None: return True
+        current = etag_of(self.db.get(parts))
+        if expected == current: return True
+        self._send_json({"error": "ETag mismatch"}, 412, etag=current)
+        return False
+
+    def do_GET(self):
+        parts, params = self._parts_and_params()
+        if "text/event-stream" in self.headers.get("Accept", ""):
+            return self._stream(parts, params)
+        with self.db.lock:
+            # Serialize under the lock: the tree is mutated in place by writers
+            value = self.db.get(parts)
+            tag = etag_of(value) if self.headers.get("X-Firebase-ETag") == "true" else None
+            body = json.dumps(apply_query(value, params)).encode()
+        self._send_body(body, etag=tag)
+
+    def do_POST(self):
+        parts, _ = self._parts_and_params()
+        self._send_json({"name": self.db.push(parts, self._body())})
+
+    def do_PUT(self):
+        parts, _ = self._parts_and_params()
+        value = self._body()
+        with self.db.lock:
+            if not self._check_if_match(parts): return
+            self.db.put(parts, value)
+            tag = etag_of(value)
+        self._send_json(value, etag=tag)
+
+    def do_PATCH(self):
+        parts, _ = self._parts_and_params()
+        changes = self._body() or {}
+        with self.db.lock:
+            if not self._check_if_match(parts): return
+            self.db.patch(parts, changes)
+        self._send_json(changes)
+
+    def do_DELETE(self):
+        parts, _ = self._parts_and_params()
+        with self.db.lock:
+            if not self._check_if_match(parts): return
+            self.db.put(parts, None)
+        self._send_json(None)
+
+    def _stream(self, parts, params):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        q = self.db.listen(parts, params)
+        try:
+            while True:
+                try:
+                    event, payload = q.get(timeout=KEEP_ALIVE_SECS)
+                except queue.Empty:
+                    event, payload = "keep-alive", "null"
+                self.wfile.write(f"event: {event}\ndata: {payload}\n\n".encode())
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.db.unlisten(q)
+            self.close_connection = True
+
+def make_server(host="127.0.0.1", port=0, data=None):
+    """Returns (server, database). Port 0 picks a free port; see server.server_address."""
+    db = Database(data)
+    handler = type("BoundHandler", (Handler,), {"db": db})
+    return Server((host, port), handler), db
+
+def start_in_background(host="127.0.0.1", port=0, data=None):
+    """Starts a server thread and returns (server, database, base_url)."""
+    server, db = make_server(host, port, data)
+    threading.Thread(target=server.serve_forever, name="FakeRTDB", daemon=True).start()
+    return server, db, f"http://{server.server_address[0]}:{server.server_address[1]}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Firebase RTDB stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    server, _ = make_server(args.host, args.port)
+    print(f"Fake RTDB on http://{args.host}:{args.port}/leaderboard.json")
+    try: server.serve_forever()
+    except KeyboardInterrupt: pass
@@ -0,0 +1,137 @@
+# Shared leaderboard helpers (no UI, no network)
+import bisect
+import heapq
+
+def parse_minutes(entry):
+    """Sessions store their length as e.g. "25 min"."""
+    try: return int(str(entry.get("duration", "0 min")).split()[0])
+    except (ValueError, IndexError): return 0
+
+def format_minutes(total_mins):
+    hours, mins = divmod(total_mins, 60)
+    return f"{hours}h {mins}m" if hours > 0 else f"{mins}m"
+
+def aggregate_entries(entries, histories=False):
+    """
+    Per-user totals for an iterable of session entries, as
+    {name: {"minutes": int, "tasks": int, "history": {task: count}}}.
+    History stays empty, so memory is one row per user: exact per-user histories
+    come from the mirror (LeaderboardMirror.user_history). histories=True counts
+    them in memory too, e.g. to measure what that costs.
+    """
+    user_stats = {}
+    for entry in entries:
+        if not isinstance(entry, dict): continue
+        name = entry.get("username", "Unknown")
+        stats = user_stats.get(name)
+        if stats is None:
+            stats = user_stats[name] = {"minutes": 0, "tasks": 0, "history": {}}
+        stats["minutes"] += parse_minutes(entry)
+        stats["tasks"] += entry.get("task_count", 0) or 0
+        if not histories: continue
+        history = stats["history"]
+        for t in entry.get("tasks_done", []) or []: history[t] = history.get(t, 0) + 1
+    return user_stats
+
+def entries_from_event(path, data):
+    """
+    Session entries {push_id: entry} carried by a leaderboard stream put/patch.
+    Field-level edits to existing sessions ("/<id>/duration") are ignored.
+    """
+    parts = [p for p in path.split("/") if p]
+    if not parts and isinstance(data, dict):
+        return {k: v for k, v in data.items() if "/" not in k and isinstance(v, dict)}
+    if len(parts) == 1 and isinstance(data, dict):
+        return {parts[0]: data}
+    return {}
+
+class Ranking:
+    """
+    Lazily ranked view over {username: (minutes, tasks)}.
+    Heapifies once and pops users a page at a time, so the first page costs
+    O(n + k log n) instead of sorting everyone. Ties are broken by name.
+    update() re-ranks a single user in place for live updates; superseded heap
+    entries are skipped lazily when popped.
+    """
+    def __init__(self, totals):
+        self.totals = totals
+        self._heap = [(-mins, name) for name, (mins, _) in totals.items()]
+        heapq.heapify(self._heap)
+        self.ranked = []     # [(name, minutes, tasks)] in rank order, grows per page
+        self._keys = []      # (-minutes, name) for each entry of ranked, for bisecting
+        self._in_ranked = set()
+        self._slots = 0      # how many ranks the loaded pages asked for
+
+    def _valid_top(self):
+        # Drops stale heap entries (already ranked, or totals changed since pushed)
+        while self._heap:
+            neg_mins, name = self._heap[0]
+            if name not in self._in_ranked and self.totals[name][0] == -neg_mins: return name
+            heapq.heappop(self._heap)
+        return None
+
+    def _pop(self):
+        name = self._valid_top()
+        if name is not None: heapq.heappop(self._heap)
+        return name
+
+    def _insert(self, name):
+        mins, tasks = self.totals[name]
+        i = bisect.bisect_left(self._keys, (-mins, name))
+        self._keys.insert(i, (-mins, name))
+        self.ranked.insert(i, (name, mins, tasks))
+        self._in_ranked.add(name)
+        return i
+
+    def page(self, size):
+        """Ranks the next `size` users and returns just those."""
+        start = len(self.ranked)
+        self._slots = start + size
+        while len(self.ranked) < self._slots:
+            name = self._pop()
+            if name is None: break
+            self._insert(name)
+        return self.ranked[start:]
+
+    def has_more(self):
+        return self._valid_top() is not None
+
+    def update(self, name, minutes, tasks):
+        """
+        Sets new totals for one user and keeps the loaded pages correct.
+        Returns the (start, end) slice of `ranked` whose rows changed, or None.
+        """
+        old_pos = None
+        if name in self._in_ranked:
+            old_pos = bisect.bisect_left(self._keys, (-self.totals[name][0], name))
+            del self._keys[old_pos], self.ranked[old_pos]
+            self._in_ranked.discard(name)
+        self.totals[name] = (minutes, tasks)
+        heapq.heappush(self._heap, (-minutes, name))
+
+        while len(self.ranked) < self._slots:
+            nxt = self._pop()
+            if nxt is None: break
+            self._insert(nxt)
+        # The changed user may now belong above the last loaded row: swap them in
+        top = self._valid_top()
+        if top is not None and self._keys and (-self.totals[top][0], top) < self._keys[-1]:
+            self._insert(self._pop())
+            dropped_key = self._keys.pop()
+            self.ranked.pop()
+            self._in_ranked.discard(dropped_key[1])
+            heapq.heappush(self._heap, dropped_key)
+
+        new_pos = bisect.bisect_left(self._keys, (-minutes, name)) if name in self._in_ranked else None
+        if old_pos is None and new_pos is None: return None
+        if old_pos is None or new_pos is None: return (old_pos if new_pos is None else new_pos, len(self.ranked))
+        return (min(old_pos, new_pos), max(old_pos, new_pos) + 1)
+
+    def rank_of(self, name):
+        """1-based rank of name without ranking everyone (one pass, no sort), or None."""
+        if name not in self.totals: return None
+        mins = self.totals[name][0]
+        ahead = 0
+        for other, (m, _) in self.totals.items():
+            if m > mins or (m == mins and other < name): ahead += 1
+        return ahead + 1
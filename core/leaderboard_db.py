@@ -0,0 +1,317 @@
+import time
+import bisect
+import sqlite3
+import threading
+from functools import lru_cache
+from datetime import date, datetime
+from . import config
+from . import api_client
+from .analytics import week_key
+from .leaderboard import parse_minutes
+from .utils import push_id_time, push_id_floor
+
+# Push ids for batched uploads are made on the client, so a slow client's
+# sessions can land slightly "in the past"; re-read this much before our cursor.
+# A fast client's land in the future, so the cursor never moves past our own clock.
+SYNC_OVERLAP_MS = 5 * 60 * 1000
+WINDOWS = ("day", "week", "month")
+
+def add_to_buckets(sums, name, date_str, minutes, task_count):
+    """Accumulates a session into {(bucket, username): [minutes, tasks]} for one batched write."""
+    for bucket in day_buckets(str(date_str)[:10]):
+        totals = sums.setdefault((bucket, name), [0, 0])
+        totals[0] += minutes
+        totals[1] += task_count
+
+def window_bucket(window, day):
+    """Rollup key holding a day's sessions for a window, e.g. "w:2024-W18"."""
+    if window == "day": return "d:" + day.isoformat()
+    if window == "week": return "w:" + week_key(day)
+    return "m:" + day.isoformat()[:7]
+
+@lru_cache(maxsize=4096)
+def day_buckets(day_str):
+    """Every window's rollup key for a "YYYY-MM-DD" day (cached: sessions share few days)."""
+    try: day = datetime.strptime(day_str, "%Y-%m-%d").date()
+    except ValueError: return ()
+    return tuple(window_bucket(w, day) for w in WINDOWS)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    key TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    date TEXT,
+    minutes INTEGER NOT NULL,
+    task_count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions(username, date);
+CREATE TABLE IF NOT EXISTS session_tasks (
+    key TEXT NOT NULL,
+    username TEXT NOT NULL,
+    task TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_session_tasks_user ON session_tasks(username, task);
+CREATE INDEX IF NOT EXISTS idx_session_tasks_key ON session_tasks(key);
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    minutes INTEGER NOT NULL,
+    tasks INTEGER NOT NULL
+);
+-- Rank order including the name tie-break, so paging never sorts (replaces the minutes-only indexes)
+DROP INDEX IF EXISTS idx_users_minutes;
+CREATE INDEX IF NOT EXISTS idx_users_rank ON users(minutes DESC, username);
+CREATE TABLE IF NOT EXISTS user_buckets (
+    bucket TEXT NOT NULL,
+    username TEXT NOT NULL,
+    minutes INTEGER NOT NULL,
+    tasks INTEGER NOT NULL,
+    PRIMARY KEY (bucket, username)
+);
+DROP INDEX IF EXISTS idx_buckets_minutes;
+CREATE INDEX IF NOT EXISTS idx_buckets_rank ON user_buckets(bucket, minutes DESC, username);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+class LeaderboardMirror:
+    """
+    Local SQLite copy of the sessions in leaderboard.json.
+    Sessions are append-only upstream, so syncing only inserts what is new, and
+    per-user totals are kept up to date on insert instead of being recomputed.
+    The same goes for per-user day/week/month rollups, so a windowed ranking
+    reads one bucket instead of filtering every session by date.
+    """
+    def __init__(self, path=None):
+        self.path = path or config.LEADERBOARD_DB
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.executescript(SCHEMA)
+            if self._db.execute("SELECT 1 FROM meta WHERE name = 'buckets'").fetchone() is None:
+                self._backfill_buckets()
+
+    def _backfill_buckets(self):
+        # Mirrors created before rollups existed: build them once from the sessions
+        self._db.execute("DELETE FROM user_buckets")
+        sums = {}
+        for name, date_str, minutes, task_count in self._db.execute(
+                "SELECT username, date, minutes, task_count FROM sessions"):
+            add_to_buckets(sums, name, date_str, minutes, task_count)
+        self._write_buckets(sums)
+        self._db.execute("INSERT OR REPLACE INTO meta VALUES ('buckets', '1')")
+
+    def _write_buckets(self, sums):
+        self._db.executemany(
+            "INSERT INTO user_buckets VALUES (?, ?, ?, ?) ON CONFLICT(bucket, username) DO UPDATE SET "
+            "minutes = minutes + excluded.minutes, tasks = tasks + excluded.tasks",
+            [(bucket, name, m, t) for (bucket, name), (m, t) in sums.items()])
+
+    def close(self):
+        with self._lock: self._db.close()
+
+    def last_key(self):
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE name = 'last_key'").fetchone()
+        return row[0] if row else None
+
+    def sync_cursor(self):
+        """startAt key for the next delta download (None = everything)."""
+        last_key = self.last_key()
+        if not last_key: return None
+        # Capped at now as well, for mirrors that stored a future key before apply() capped it
+        ms = min(push_id_time(last_key), int(time.time() * 1000))
+        return push_id_floor(max(0, ms - SYNC_OVERLAP_MS))
+
+    def sync(self, fetch=api_client.fetch_sessions):
+        """Downloads sessions newer than the last mirrored one. Returns the users that changed."""
+        return self.apply(fetch(self.sync_cursor()))
+
+    def apply(self, entries, advance_cursor=True):
+        """
+        Inserts {push_id: entry} sessions, skipping ones already mirrored. Returns the users that changed.
+        Pass advance_cursor=False for sessions that didn't come from a delta download (e.g. an import),
+        so the next sync still fetches everything upstream it hasn't seen.
+        """
+        touched, sums = set(), {}
+        with self._lock, self._db:
+            for key in sorted(entries):
+                entry = entries[key]
+                if not isinstance(entry, dict): continue
+                name = entry.get("username", "Unknown")
+                minutes = parse_minutes(entry)
+                tasks_done = entry.get("tasks_done", []) or []
+                task_count = entry.get("task_count", 0) or 0
+                cur = self._db.execute(
+                    "INSERT OR IGNORE INTO sessions VALUES (?, ?, ?, ?, ?)",
+                    (key, name, entry.get("date"), minutes, task_count))
+                if cur.rowcount == 0: continue
+                touched.add(name)
+                self._db.executemany(
+                    "INSERT INTO session_tasks VALUES (?, ?, ?)",
+                    [(key, name, str(t)) for t in tasks_done])
+                self._db.execute(
+                    "INSERT INTO users VALUES (?, ?, ?) ON CONFLICT(username) DO UPDATE SET "
+                    "minutes = minutes + excluded.minutes, tasks = tasks + excluded.tasks",
+                    (name, minutes, task_count))
+                add_to_buckets(sums, name, entry.get("date"), minutes, task_count)
+            self._write_buckets(sums)
+            if entries and advance_cursor:
+                # 🟢 FIX: one client with its clock ahead no longer makes every mirror skip sessions until then
+                cursor = min(max(entries), push_id_floor(int(time.time() * 1000)))
+                self._db.execute(
+                    "INSERT INTO meta VALUES ('last_key', ?) ON CONFLICT(name) DO UPDATE SET "
+                    "value = MAX(value, excluded.value)", (cursor,))
+        return touched
+
+    # --- QUERIES ---
+    def iter_sessions(self, start=None, end=None, batch=500):
+        """
+        Yields (key, username, date, minutes, task_count, [tasks]) in key order, for
+        sessions dated within [start, end] ("YYYY-MM-DD", inclusive, None = open).
+        Reads `batch` sessions per query, so memory stays flat and writers aren't blocked.
+        """
+        after = ""
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT key, username, date, minutes, task_count FROM sessions WHERE key > ? "
+                    "AND (? IS NULL OR substr(date, 1, 10) >= ?) AND (? IS NULL OR substr(date, 1, 10) <= ?) "
+                    "ORDER BY key LIMIT ?", (after, start, start, end, end, batch)).fetchall()
+                if not rows: return
+                tasks = {}
+                marks = ",".join("?" * len(rows))
+                for key, task in self._db.execute(
+                        f"SELECT key, task FROM session_tasks WHERE key IN ({marks}) ORDER BY rowid",
+                        [r[0] for r in rows]):
+                    tasks.setdefault(key, []).append(task)
+            for row in rows: yield row + (tasks.get(row[0], []),)
+            after = rows[-1][0]
+
+    def _board(self, window, day):
+        # (table, filter, params) holding the all-time or the window's totals
+        if window is None: return "users", "1", ()
+        return "user_buckets", "bucket = ?", (window_bucket(window, day or date.today()),)
+
+    def top(self, limit=-1, offset=0, window=None, day=None):
+        """[(username, minutes, tasks)] ordered by minutes, all-time or within a window, using the minutes index (-1 = all)."""
+        table, where, params = self._board(window, day)
+        with self._lock:
+            return self._db.execute(
+                f"SELECT username, minutes, tasks FROM {table} WHERE {where} ORDER BY minutes DESC, username "
+                "LIMIT ? OFFSET ?", params + (limit, offset)).fetchall()
+
+    def rank_of(self, username, window=None, day=None):
+        """1-based rank of username (ties broken by name), counted on the minutes index, or None."""
+        table, where, params = self._board(window, day)
+        with self._lock:
+            row = self._db.execute(f"SELECT minutes FROM {table} WHERE {where} AND username = ?",
+                                   params + (username,)).fetchone()
+            if row is None: return None
+            ahead = self._db.execute(
+                f"SELECT (SELECT COUNT(*) FROM {table} WHERE {where} AND minutes > ?) + "
+                f"(SELECT COUNT(*) FROM {table} WHERE {where} AND minutes = ? AND username < ?)",
+                params + (row[0],) + params + (row[0], username)).fetchone()[0]
+        return ahead + 1
+
+    def user_totals(self, username, window=None, day=None):
+        """(minutes, tasks) for one user, all-time or within a window, or (0, 0)."""
+        with self._lock:
+            if window is None:
+                row = self._db.execute(
+                    "SELECT minutes, tasks FROM users WHERE username = ?", (username,)).fetchone()
+            else:
+                row = self._db.execute(
+                    "SELECT minutes, tasks FROM user_buckets WHERE bucket = ? AND username = ?",
+                    (window_bucket(window, day or date.today()), username)).fetchone()
+        return row or (0, 0)
+
+    def all_totals(self):
+        """{username: (minutes, tasks)} for every user."""
+        with self._lock:
+            return {name: (mins, tasks) for name, mins, tasks in
+                    self._db.execute("SELECT username, minutes, tasks FROM users")}
+
+    def window_totals(self, window, day=None):
+        """{username: (minutes, tasks)} for the "day" | "week" | "month" containing day (default today)."""
+        with self._lock:
+            return {name: (mins, tasks) for name, mins, tasks in self._db.execute(
+                "SELECT username, minutes, tasks FROM user_buckets WHERE bucket = ?",
+                (window_bucket(window, day or date.today()),))}
+
+    def user_sessions(self, username):
+        """
+        Yields (minutes, [tasks], datetime) for one user's uploads, oldest first, the
+        way FocusStats records them: focus sessions with their tasks, plus tasks
+        finished outside a session with minutes None. The single-task uploads sent
+        along with a session (same minute, task in its list) are left out, as the
+        session already counts them.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, date, minutes FROM sessions WHERE username = ? ORDER BY date, key",
+                (username,)).fetchall()
+            tasks = {}
+            for key, task in self._db.execute(
+                    "SELECT key, task FROM session_tasks WHERE username = ? ORDER BY rowid", (username,)):
+                tasks.setdefault(key, []).append(task)
+        in_sessions = {}   # date -> tasks listed by sessions uploaded that minute
+        for key, date_str, minutes in rows:
+            if minutes > 0: in_sessions.setdefault(date_str, []).extend(tasks.get(key, []))
+        for key, date_str, minutes in rows:
+            try: when = datetime.strptime(date_str, "%Y-%m-%d %H:%M")
+            except (TypeError, ValueError): continue
+            done = tasks.get(key, [])
+            if minutes > 0: yield minutes, done, when
+            else:
+                listed = in_sessions.get(date_str, [])
+                alone = [t for t in done if t not in listed or listed.remove(t)]
+                if alone: yield None, alone, when
+
+    def user_history(self, username):
+        """[(task, times_done)] for one user, most repeated first."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT task, COUNT(*) AS n FROM session_tasks WHERE username = ? "
+                "GROUP BY task ORDER BY n DESC, task", (username,)).fetchall()
+
+class MirrorRanking:
+    """
+    Ranking read a page at a time from the mirror's SQL (all-time or one window),
+    so only the rows on screen are ever loaded. Same interface as leaderboard.Ranking;
+    update() moves one user within the loaded rows from the new totals it is given,
+    without querying, so a burst of live changes costs no SQL.
+    """
+    def __init__(self, mirror, window=None):
+        self.mirror = mirror
+        self.window = window
+        self.ranked = []   # [(name, minutes, tasks)] loaded so far, in rank order
+
+    def page(self, size):
+        rows = self.mirror.top(size, len(self.ranked), self.window)
+        self.ranked.extend(rows)
+        return rows
+
+    def has_more(self):
+        return bool(self.mirror.top(1, len(self.ranked), self.window))
+
+    def rank_of(self, name):
+        return self.mirror.rank_of(name, self.window)
+
+    def update(self, name, minutes, tasks):
+        """
+        Applies one user's new totals (which only grow) to the loaded rows.
+        Returns the (start, end) slice of `ranked` whose rows changed, or None.
+        """
+        keys = [(-m, n) for n, m, _ in self.ranked]
+        old_pos = next((i for i, row in enumerate(self.ranked) if row[0] == name), None)
+        if old_pos is None and (not keys or (-minutes, name) > keys[-1]): return None   # still below the loaded pages
+        if old_pos is not None: del keys[old_pos], self.ranked[old_pos]
+        new_pos = bisect.bisect_left(keys, (-minutes, name))
+        self.ranked.insert(new_pos, (name, minutes, tasks))
+        # A newcomer pushes the last loaded row back to the next page, so paging by offset stays exact
+        if old_pos is None:
+            self.ranked.pop()
+            return (new_pos, len(self.ranked))
+        return (min(old_pos, new_pos), max(old_pos, new_pos) + 1)
@@ -0,0 +1,102 @@
+# Leaderboard totals with single-flight refreshes and stale-while-revalidate (no UI)
+import time
+import threading
+from . import config
+from . import executor
+from .leaderboard import aggregate_entries
+from .utils import dump_json_file, load_json_file
+
+SNAPSHOT_FORMAT = 1   # bump when the snapshot layout changes; older files are ignored
+
+class LeaderboardService:
+    """
+    Serves per-user (minutes, tasks) totals from memory (or last run's snapshot at
+    startup) straight away, and revalidates in the background once they are older
+    than ttl seconds. Any number of refresh() calls share the one download in flight.
+    Subscribers get (version, totals) on the worker thread after each revalidation.
+
+    Every revalidation also leaves a snapshot (totals + the mirror cursor they
+    cover) for the next launch to paint from before any network or database work.
+    """
+    def __init__(self, mirror, ttl=None, snapshot_path=None):
+        self.mirror = mirror
+        self.ttl = config.LEADERBOARD_TTL if ttl is None else ttl
+        self.snapshot_path = snapshot_path or config.LEADERBOARD_SNAPSHOT
+        self._lock = threading.Lock()
+        self._totals = None
+        self._version = 0
+        self._fetched_at = None   # monotonic time of the last successful revalidation
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        with self._lock: self._subscribers.append(callback)
+
+    def cached(self):
+        """(version, totals) without touching the network, or None if we have nothing yet."""
+        with self._lock:
+            if self._totals is None:
+                # Left over from the last run: stale, but far better than a spinner
+                totals = self._load_snapshot()
+                if totals is None and self.mirror.last_key() is not None: totals = self.mirror.all_totals()
+                if totals is not None: self._totals, self._version = totals, 1
+            return (self._version, self._totals) if self._totals is not None else None
+
+    # --- SNAPSHOT ---
+    def _load_snapshot(self):
+        try: snap = load_json_file(self.snapshot_path)
+        except FileNotFoundError: return None
+        except (OSError, ValueError) as e:
+            print(f"LB Snapshot Error: {e}")
+            return None
+        if not isinstance(snap, dict) or snap.get("format") != SNAPSHOT_FORMAT: return None
+        last_key = self.mirror.last_key()
+        # The mirror moved on since (e.g. live mode): its totals are newer
+        if last_key and snap.get("cursor") and last_key > snap["cursor"]: return None
+        return {name: (mins, tasks) for name, mins, tasks in snap["totals"]}
+
+    def _save_snapshot(self, totals):
+        snap = {"format": SNAPSHOT_FORMAT, "cursor": self.mirror.last_key(),
+                "totals": [[name, mins, tasks] for name, (mins, tasks) in totals.items()]}
+        try: dump_json_file(self.snapshot_path, snap, compress=config.COMPRESS_TRANSFERS)
+        except OSError as e: print(f"LB Snapshot Error: {e}")
+
+    def is_fresh(self):
+        with self._lock:
+            return self._fetched_at is not None and time.monotonic() - self._fetched_at < self.ttl
+
+    def refresh(self, force=False):
+        """Starts a revalidation unless the data is fresh; returns its future, or None when fresh."""
+        if not force and self.is_fresh(): return None
+        return executor.submit("leaderboard", self._revalidate, key="revalidate")
+
+    def _revalidate(self):
+        if self.mirror.last_key() is None:
+            # Empty mirror: rank straight from the full download, publish,
+            # and only then fill the mirror for delta syncs
+            from . import api_client
+            entries = api_client.fetch_sessions()
+            stats = aggregate_entries(entries.values())
+            totals = {name: (s["minutes"], s["tasks"]) for name, s in stats.items()}
+            self._publish(totals)
+            self.mirror.apply(entries)
+            self._save_snapshot(totals)
+            # Again now that the mirror is filled, for views that read it (time windows)
+            return self._publish(totals)
+        # Pull only new sessions into the mirror; if offline, republish what we have
+        try: self.mirror.sync()
+        except Exception as e: print(f"LB Sync Error: {e}")
+        totals = self.mirror.all_totals()
+        result = self._publish(totals)
+        self._save_snapshot(totals)
+        return result
+
+    def _publish(self, totals):
+        with self._lock:
+            self._totals = totals
+            self._version += 1
+            self._fetched_at = time.monotonic()
+            result, subscribers = (self._version, totals), list(self._subscribers)
+        for callback in subscribers:
+            try: callback(*result)
+            except Exception as e: print(f"LB Subscriber Error: {e}")
+        return result
@@ -0,0 +1,133 @@
+"""
+Load generator for the leaderboard network paths.
+
+Starts a core.fake_rtdb server (or targets --url), simulates many users posting
+sessions, and reports latency/throughput for the same code the apps run:
+  save_session_to_web -> api_client.post_session
+  TaskManager.upload  -> TaskManager.upload
+  fetch_and_aggregate -> LeaderboardMirror.sync + MirrorRanking (cold and incremental)
+and the time and memory of in-memory aggregation, totals only (what rankings use)
+vs with every user's task history counted too (the apps read those from the mirror).
+
+    python -m core.loadtest --users 2000 --sessions 3 --workers 32
+"""
+import time
+import random
+import argparse
+import statistics
+import tracemalloc
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from . import config
+from . import api_client
+from .data_manager import TaskManager
+from .leaderboard import aggregate_entries
+from .leaderboard_db import LeaderboardMirror, MirrorRanking
+from .fake_rtdb import start_in_background
+
+TASK_WORDS = ["email", "report", "gym", "read", "study", "code", "review", "plan", "call", "clean"]
+
+def fake_session(username, rng):
+    # Mostly recurring tasks plus a long tail of one-offs, like real histories
+    tasks = rng.sample(TASK_WORDS, rng.randint(0, 3))
+    if rng.random() < 0.5: tasks.append(f"task-{rng.randrange(10**6)}")
+    return {
+        "username": username,
+        "date": datetime.now().strftime("%Y-%m-%d %H:%M"),
+        "duration": f"{rng.randint(5, 90)} min",
+        "tasks_done": tasks,
+        "task_count": len(tasks)
+    }
+
+def timed(fn, *args):
+    """Seconds taken by fn(*args), or None if it raised."""
+    start = time.perf_counter()
+    try: fn(*args)
+    except Exception: return None
+    return time.perf_counter() - start
+
+def report(name, results, wall):
+    latencies = [r for r in results if r is not None]
+    errors = len(results) - len(latencies)
+    if not latencies:
+        print(f"{name:<28} no successful samples ({errors} errors)")
+        return
+    ms = sorted(l * 1000 for l in latencies)
+    pick = lambda q: ms[min(len(ms) - 1, int(q * len(ms)))]
+    print(f"{name:<28} n={len(ms):<6} err={errors:<4} {len(ms) / wall:8.1f} ops/s  "
+          f"p50={pick(0.5):7.2f}ms p95={pick(0.95):7.2f}ms p99={pick(0.99):7.2f}ms "
+          f"max={ms[-1]:7.2f}ms mean={statistics.fmean(ms):7.2f}ms")
+
+def run_parallel(name, fn, jobs, workers):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        results = list(pool.map(lambda job: timed(fn, *job), jobs))
+    report(name, results, time.perf_counter() - start)
+
+def fetch_and_aggregate(mirror, username):
+    # Same work LeaderboardPage does off the UI thread
+    mirror.sync()
+    ranking = MirrorRanking(mirror)
+    ranking.page(20)
+    ranking.rank_of(username)
+
+def aggregation_memory(entries, histories):
+    tracemalloc.start()
+    start = time.perf_counter()
+    stats = aggregate_entries(entries, histories=histories)
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del stats
+    return elapsed, size
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Leaderboard load test")
+    parser.add_argument("--url", help="RTDB leaderboard URL (default: start a local fake_rtdb)")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--sessions", type=int, default=3, help="sessions posted per user")
+    parser.add_argument("--uploads", type=int, default=1, help="TaskManager.upload calls per user")
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--fetches", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.url:
+        config.FIREBASE_URL = args.url
+    else:
+        _, _, base = start_in_background()
+        config.FIREBASE_URL = base + "/leaderboard.json"
+    print(f"Target: {config.FIREBASE_URL}")
+    rng = random.Random(args.seed)
+    users = [f"user{i:05d}" for i in range(args.users)]
+
+    sessions = [(fake_session(u, rng),) for u in users for _ in range(args.sessions)]
+    rng.shuffle(sessions)
+    run_parallel("save_session_to_web", api_client.post_session, sessions, args.workers)
+
+    managers = {u: TaskManager(username=u) for u in users}
+    uploads = [(managers[u], rng.choice(TASK_WORDS)) for u in users for _ in range(args.uploads)]
+    run_parallel("TaskManager.upload", lambda m, task: m.upload(task), uploads, args.workers)
+
+    cold = []
+    start = time.perf_counter()
+    for _ in range(args.fetches):
+        mirror = LeaderboardMirror(":memory:")
+        cold.append(timed(fetch_and_aggregate, mirror, users[0]))
+    report("fetch_and_aggregate (cold)", cold, time.perf_counter() - start)
+
+    entries = list(api_client.fetch_sessions().values())
+    for label, histories in (("with history", True), ("totals only", False)):
+        elapsed, size = aggregation_memory(entries, histories)
+        print(f"{'aggregate (' + label + ')':<28} {len(entries)} entries in {elapsed * 1000:7.1f}ms, "
+              f"{size / 1024:9.1f} KiB held")
+
+    warm = []
+    start = time.perf_counter()
+    for _ in range(args.fetches):
+        for u in rng.sample(users, min(10, len(users))): api_client.post_session(fake_session(u, rng))
+        warm.append(timed(fetch_and_aggregate, mirror, users[0]))
+    report("fetch_and_aggregate (delta)", warm, time.perf_counter() - start)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# Weighted random picks over pending tasks, for the wheel (no UI, no network)
+import random
+import threading
+from collections import Counter
+from datetime import datetime
+
+MIN_OVERFLOW = 32   # changed items held outside the alias table before a rebuild (at least; √n for big tables)
+SKIP_WEIGHT = 0.5   # extra weight per time a task won a spin and was left undone
+
+def task_weight(text, count, skips):
+    """Weight of a pending task: one per open copy, boosted each time it was skipped."""
+    return count * (1 + SKIP_WEIGHT * skips)
+
+class WeightedSampler:
+    """
+    Weighted random choice in O(1) with Vose's alias table. Changes don't rebuild
+    the table: new weights wait in a short overflow list, and removed items stay
+    in the table as dead slots that a draw simply retries past. The table is only
+    rebuilt once the overflow fills up or half of its weight is dead.
+    """
+    def __init__(self, weights=(), seed=None):
+        self.rng = random.Random(seed)
+        # item -> weight, live items only (insertion order keeps seeded runs stable)
+        self.weights = {item: w for item, w in dict(weights).items() if w > 0}
+        self._slots = []         # table item per slot, dead ones included
+        self._slot_of = {}       # live item -> its slot
+        self._prob, self._alias = [], []
+        self._table_weight = 0.0 # weight of every slot, dead or alive
+        self._dead_weight = 0.0
+        self._extra = {}         # item -> weight, changed since the build
+        self._extra_weight = 0.0
+        self._build()
+
+    def __len__(self):
+        return len(self.weights)
+
+    def __contains__(self, item):
+        return item in self.weights
+
+    def set(self, item, weight):
+        """Adds item or changes its weight; a weight of 0 removes it."""
+        if weight <= 0: return self.remove(item)
+        self._drop(item)
+        self.weights[item] = weight
+        self._extra[item] = weight
+        self._extra_weight += weight
+        if len(self._extra) > self._max_extra or self._dead_weight * 2 > self._table_weight: self._build()
+
+    def remove(self, item):
+        if item not in self.weights: return
+        self._drop(item)
+        del self.weights[item]
+        if self._dead_weight * 2 > self._table_weight: self._build()
+
+    def _drop(self, item):
+        # Retires item's current entry, whether in the table or the overflow
+        slot = self._slot_of.pop(item, None)
+        if slot is not None: self._dead_weight += self.weights[item]
+        weight = self._extra.pop(item, None)
+        if weight is not None: self._extra_weight -= weight
+
+    def _build(self):
+        items = list(self.weights.items())
+        n, total = len(items), sum(w for _, w in items)
+        self._slots = [item for item, _ in items]
+        self._slot_of = {item: i for i, item in enumerate(self._slots)}
+        prob = [w * n / total for _, w in items]
+        alias = list(range(n))
+        small = [i for i, p in enumerate(prob) if p < 1]
+        large = [i for i, p in enumerate(prob) if p >= 1]
+        while small and large:
+            s, l = small.pop(), large[-1]
+            alias[s] = l
+            prob[l] -= 1 - prob[s]
+            if prob[l] < 1: small.append(large.pop())
+        for i in small + large: prob[i] = 1.0   # leftovers are 1 up to rounding
+        self._prob, self._alias = prob, alias
+        self._table_weight, self._dead_weight = float(total), 0.0
+        self._extra, self._extra_weight = {}, 0.0
+        # Rebuilding costs O(n), so bigger tables take more changes first to keep updates cheap
+        self._max_extra = max(MIN_OVERFLOW, int(n ** 0.5))
+
+    def draw(self):
+        """A random item, each with probability weight / total weight."""
+        if not self.weights: raise IndexError("draw from an empty sampler")
+        while True:
+            r = self.rng.random() * (self._table_weight + self._extra_weight)
+            if r < self._table_weight:
+                u = self.rng.random() * len(self._slots)
+                i = int(u)
+                if u - i >= self._prob[i]: i = self._alias[i]
+                item = self._slots[i]
+                if self._slot_of.get(item) == i: return item
+            else:
+                r -= self._table_weight
+                for item, weight in self._extra.items():
+                    r -= weight
+                    if r < 0: return item
+            # Landed on a dead slot (or past the end by rounding): draw again
+
+class TaskSampler:
+    """
+    Weighted spins over one day's pending tasks (today by default), kept current
+    from the manager's change events instead of reloading the store per spin.
+    Pass a seed for a reproducible sequence of spins.
+    """
+    def __init__(self, manager, seed=None, date_key=None, weight=task_weight):
+        self.manager = manager
+        self.date_key = date_key
+        self.weight = weight
+        self.sampler = WeightedSampler(seed=seed)
+        self.open = Counter()    # text -> pending copies
+        self.skips = Counter()   # text -> spins it won and was left undone
+        self.winner = None
+        self._lock = threading.Lock()
+        self._day = None
+        self._unsubscribe = manager.subscribe(self._on_event)
+        self._reload()
+
+    def _current_day(self):
+        return self.date_key or datetime.now().strftime("%Y-%m-%d")
+
+    def _reload(self):
+        # 🟢 FIX: read the store before taking our lock. The manager emits events (into
+        # _on_event) while holding its own lock, so the opposite order deadlocks.
+        day = self._current_day()
+        pending = self.manager.pending_tasks(day)
+        with self._lock:
+            self._day = day
+            self.open = Counter(pending)
+            rng, self.sampler = self.sampler.rng, WeightedSampler({t: self._weight(t) for t in self.open})
+            self.sampler.rng = rng   # same random stream, so seeded runs stay reproducible
+
+    def _weight(self, text):
+        return self.weight(text, self.open[text], self.skips[text]) if self.open[text] else 0
+
+    def _on_event(self, event):
+        with self._lock:
+            if event.day != self._day: return
+            self.open.update(event.added)
+            for text in event.completed:
+                if self.open[text]: self.open[text] -= 1
+                if not self.open[text]: self.skips.pop(text, None)
+            for text in set(event.added) | set(event.completed): self.sampler.set(text, self._weight(text))
+
+    def __len__(self):
+        if self._day != self._current_day(): self._reload()
+        with self._lock: return len(self.sampler)
+
+    def draw(self):
+        """A weighted random pending task (e.g. an animation frame), or None if there are none."""
+        with self._lock: return self.sampler.draw() if len(self.sampler) else None
+
+    def pick(self):
+        """Spins for real: the last winner counts as skipped if it is still pending."""
+        if self._day != self._current_day(): self._reload()
+        with self._lock:
+            if self.winner is not None and self.open[self.winner]:
+                self.skips[self.winner] += 1
+                self.sampler.set(self.winner, self._weight(self.winner))
+            self.winner = self.sampler.draw() if len(self.sampler) else None
+            return self.winner
+
+    def close(self):
+        self._unsubscribe()
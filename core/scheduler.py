@@ -0,0 +1,213 @@
+# Deadline scheduler for Pomodoro cycles and reminders (no UI, no network)
+import time
+import heapq
+import itertools
+import threading
+from collections import deque
+from datetime import datetime
+from . import config
+from .timer import FocusTimer, RUNNING
+
+FOCUS, BREAK, LONG_BREAK = "FOCUS", "BREAK", "LONG_BREAK"
+DEADLINE_SLACK = 0.05   # fire a hair late so the timer reads exactly zero
+
+class Job:
+    __slots__ = ("deadline", "fn", "args", "cancelled")
+
+    def __init__(self, deadline, fn, args):
+        self.deadline, self.fn, self.args = deadline, fn, args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+class Scheduler:
+    """
+    Runs callbacks at monotonic deadlines. Jobs sit in one min-heap served by a
+    single daemon thread that sleeps until the earliest deadline; adding an
+    earlier job wakes it to re-plan. Nothing polls, so an idle scheduler costs
+    no CPU. Callbacks run on that thread: UIs hand them to their own loop.
+    """
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._heap = []   # (deadline, seq, job)
+        self._seq = itertools.count()
+        self._cancelled = 0
+        self._wake = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+    def call_at(self, deadline, fn, *args):
+        """Runs fn(*args) at clock time deadline; returns a Job that can be cancelled."""
+        job = Job(deadline, fn, args)
+        with self._wake:
+            if self._stopped: raise RuntimeError("scheduler is stopped")
+            heapq.heappush(self._heap, (deadline, next(self._seq), job))
+            if self._heap[0][2] is job: self._wake.notify()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="Scheduler", daemon=True)
+                self._thread.start()
+        return job
+
+    def call_later(self, delay, fn, *args):
+        return self.call_at(self.clock() + delay, fn, *args)
+
+    def remind_at(self, when, fn, *args):
+        """Runs fn(*args) at wall-clock datetime when (converted once to a monotonic deadline)."""
+        return self.call_later(max(0, (when - datetime.now()).total_seconds()), fn, *args)
+
+    def cancel(self, job):
+        with self._wake:
+            if job.cancelled: return
+            job.cancel()
+            self._cancelled += 1
+            # Cancelled jobs are skipped when they surface; compact once they are most of the heap
+            if self._cancelled * 2 > len(self._heap):
+                self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+                heapq.heapify(self._heap)
+                self._cancelled = 0
+
+    def next_deadline(self):
+        with self._wake:
+            self._drop_cancelled()
+            return self._heap[0][0] if self._heap else None
+
+    def stop(self):
+        with self._wake:
+            self._stopped = True
+            self._heap.clear()
+            self._wake.notify()
+
+    def _drop_cancelled(self):
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+            self._cancelled -= 1
+
+    def _due(self):
+        """Blocks until the earliest job is due and pops it; None once stopped."""
+        with self._wake:
+            while not self._stopped:
+                self._drop_cancelled()
+                if not self._heap: self._wake.wait()
+                else:
+                    wait = self._heap[0][0] - self.clock()
+                    if wait <= 0: return heapq.heappop(self._heap)[2]
+                    self._wake.wait(wait)
+            return None
+
+    def _run(self):
+        while True:
+            job = self._due()
+            if job is None: return
+            try: job.fn(*job.args)
+            except Exception as e: print(f"Scheduler Error: {e}")
+
+_default = None
+_default_lock = threading.Lock()
+
+def default_scheduler():
+    """The process-wide scheduler, created on first use."""
+    global _default
+    with _default_lock:
+        if _default is None: _default = Scheduler()
+        return _default
+
+def pomodoro_phases(rounds=None, focus=None, short=None, long=None, long_every=None):
+    """[(kind, minutes)]: focus rounds with short breaks between, a long break every long_every rounds."""
+    rounds = rounds or config.POMODORO_ROUNDS
+    long_every = long_every or config.LONG_BREAK_EVERY
+    phases = []
+    for n in range(1, rounds + 1):
+        phases.append((FOCUS, focus or config.FOCUS_MINS))
+        if n == rounds: break
+        if n % long_every == 0: phases.append((LONG_BREAK, long or config.LONG_BREAK_MINS))
+        else: phases.append((BREAK, short or config.SHORT_BREAK_MINS))
+    return phases
+
+class CycleRunner:
+    """
+    Runs queued (kind, minutes) phases back to back on one FocusTimer. Each phase
+    ends on a scheduler deadline (plus an optional reminder remind_before seconds
+    earlier), which pausing cancels and resuming re-arms from the time left.
+    Callbacks go through dispatch, e.g. a UI dispatcher's post; by default they
+    run on the scheduler thread.
+    """
+    def __init__(self, scheduler=None, timer=None, on_start=None, on_end=None, on_remind=None,
+                 dispatch=None, remind_before=None):
+        self.scheduler = scheduler or default_scheduler()
+        self.timer = timer or FocusTimer()
+        self.on_start, self.on_end, self.on_remind = on_start, on_end, on_remind
+        self.dispatch = dispatch or (lambda fn, *args: fn(*args))
+        self.remind_before = config.REMIND_BEFORE_SECS if remind_before is None else remind_before
+        self.queue = deque()
+        self.kind = None   # phase in progress (running or paused)
+        self._jobs = []
+        self._gen = 0      # bumped on every disarm, so a deadline already in flight is ignored
+        self._lock = threading.RLock()
+
+    def start(self, phases):
+        """Drops whatever is running and starts the given phases."""
+        with self._lock:
+            self.stop()
+            self.queue.extend(phases)
+            self._next()
+
+    def adopt(self, kind=FOCUS):
+        """Takes over a timer restored from a checkpoint as the current phase."""
+        with self._lock:
+            self.kind = kind
+            if self.timer.state == RUNNING: self._arm()
+
+    def pause(self):
+        with self._lock:
+            self.timer.pause()
+            self._disarm()
+
+    def resume(self):
+        with self._lock:
+            self.timer.resume()
+            if self.kind: self._arm()
+
+    def end(self):
+        """Ends the current phase now (early or on time) and starts the next queued one."""
+        with self._lock:
+            if self.kind is None: return
+            self._disarm()
+            kind, minutes = self.kind, self.timer.finish()
+            self.kind = None
+            if self.on_end: self.on_end(kind, minutes)
+            self._next()
+
+    def stop(self):
+        with self._lock:
+            self._disarm()
+            self.queue.clear()
+            self.kind = None
+            self.timer.cancel()
+
+    def _next(self):
+        if not self.queue: return
+        self.kind, minutes = self.queue.popleft()
+        self.timer.start(minutes)
+        self._arm()
+        if self.on_start: self.on_start(self.kind, minutes)
+
+    def _arm(self):
+        self._disarm()
+        gen, left = self._gen, self.timer.planned_mins * 60 - self.timer.elapsed()
+        self._jobs = [self.scheduler.call_later(left + DEADLINE_SLACK, self.dispatch, self._deadline, gen)]
+        if self.on_remind and left > self.remind_before > 0:
+            self._jobs.append(self.scheduler.call_later(left - self.remind_before, self.dispatch, self._remind, gen))
+
+    def _disarm(self):
+        self._gen += 1
+        for job in self._jobs: self.scheduler.cancel(job)
+        self._jobs = []
+
+    def _deadline(self, gen):
+        with self._lock:
+            if gen == self._gen and self.timer.state == RUNNING: self.end()
+
+    def _remind(self, gen):
+        with self._lock:
+            if gen == self._gen and self.timer.state == RUNNING: self.on_remind(self.kind, self.timer.remaining())
@@ -0,0 +1,206 @@
+# Search and type-ahead over every task ever written (no UI, no network)
+import re
+import threading
+from collections import Counter
+from bisect import bisect_left, insort
+from heapq import nlargest
+from . import config
+from .utils import dump_json_file, load_json_file
+
+INDEX_FORMAT = 1    # bump when the saved layout changes; older files are rebuilt
+TOP_SUGGESTIONS = 8 # suggestions kept at each trie node
+MAX_PREFIX = 32     # trie depth; longer prefixes filter the deepest node's suggestions
+_WORD = re.compile(r"\w+")
+
+def normalize(text):
+    return " ".join(text.lower().split())
+
+def words(text):
+    return _WORD.findall(text.lower())
+
+class TaskSearch:
+    """
+    Inverted index (word -> tasks) and prefix trie over every task text in the
+    store, ranked by how often each text was written. Trie nodes keep their own
+    top suggestions, so type-ahead is one walk down the typed prefix whatever the
+    history size; a prefix matches the start of any word in a task.
+
+    Kept current from TaskManager events and saved next to the task store with
+    the file version it covers. It is only rebuilt (by streaming the store) when
+    the store was changed while no index was listening, e.g. by an import.
+    """
+    def __init__(self, path=None, tasks_path=None, top=TOP_SUGGESTIONS):
+        self.path = path or config.SEARCH_INDEX_FILE
+        self.tasks_path = tasks_path or config.TASKS_FILE
+        self.top = top
+        self._lock = threading.Lock()
+        self._reset()
+        self.version = None
+        self.seq = 0           # manager change counter the index covers; older events are already counted
+        self.dirty = False
+        self.manager = None
+        self._unsubscribe = None
+        self._backlog = None   # events delivered while attach() loads, replayed once it is done
+
+    def _reset(self):
+        self.texts = []      # id -> task text
+        self.ids = {}        # task text -> id
+        self.counts = []     # id -> times written
+        self.postings = {}   # word -> set of ids
+        self.words = []      # sorted postings keys, for partial words
+        self.trie = {}       # char -> child node; "" -> [ids, most written first]
+
+    # --- UPDATES ---
+    def add(self, text, times=1):
+        """Counts text as written `times` more times."""
+        with self._lock:
+            self._add(text, times)
+            self.dirty = True
+
+    def _add(self, text, times):
+        tid = self.ids.get(text)
+        if tid is None:
+            tid = self.ids[text] = len(self.texts)
+            self.texts.append(text)
+            self.counts.append(0)
+            for w in set(words(text)):
+                if w not in self.postings:
+                    self.postings[w] = set()
+                    insort(self.words, w)
+                self.postings[w].add(tid)
+        self.counts[tid] += times
+        key = normalize(text)
+        for m in _WORD.finditer(key):
+            node = self.trie
+            for ch in key[m.start():m.start() + MAX_PREFIX]:
+                node = node.setdefault(ch, {})
+                self._bump(node, tid)
+
+    def _bump(self, node, tid):
+        # Counts only grow, so a text that isn't in a node's list only enters when it overtakes the last one
+        top, count = node.setdefault("", []), self.counts[tid]
+        if tid in top: top.remove(tid)
+        elif len(top) >= self.top and self.counts[top[-1]] >= count: return
+        i = 0
+        while i < len(top) and self.counts[top[i]] > count: i += 1
+        top.insert(i, tid)
+        del top[self.top:]
+
+    def _on_event(self, event):
+        # 🟢 FIX: tasks created already done (logged, or finished without being listed) are new writes too
+        if not event.added and not event.created: return
+        with self._lock:
+            if self._backlog is not None: return self._backlog.append(event)
+            self._apply(event)
+
+    def _apply(self, event):
+        # 🟢 FIX: events can arrive after a load or rebuild already counted their write
+        if event.seq <= self.seq: return
+        for text in list(event.added) + list(event.created): self._add(text, 1)
+        self.dirty = True
+
+    # --- QUERIES ---
+    def suggest(self, prefix, limit=TOP_SUGGESTIONS):
+        """Most written tasks with a word starting with prefix (e.g. "em b" -> "Email Bob")."""
+        key = normalize(prefix)
+        if not key: return []
+        with self._lock:
+            node = self.trie
+            for ch in key[:MAX_PREFIX]:
+                node = node.get(ch)
+                if node is None: return []
+            found = [self.texts[tid] for tid in node.get("", ())]
+        if len(key) > MAX_PREFIX: found = [t for t in found if key in normalize(t)]
+        return found[:limit]
+
+    def search(self, query, limit=20):
+        """Tasks containing every word of query, the last one possibly partial, most written first."""
+        terms = words(query)
+        if not terms: return []
+        *whole, last = terms
+        with self._lock:
+            i = j = bisect_left(self.words, last)
+            while j < len(self.words) and self.words[j].startswith(last): j += 1
+            partial = [self.postings[w] for w in self.words[i:j]]
+            if whole:
+                sets = sorted((self.postings.get(w, set()) for w in whole), key=len)
+                found = {tid for tid in sets[0].intersection(*sets[1:]) if any(tid in p for p in partial)}
+            else:
+                found = set().union(*partial)
+            best = nlargest(limit, found, key=self.counts.__getitem__)
+            return [(self.texts[tid], self.counts[tid]) for tid in best]
+
+    def count(self, text):
+        with self._lock:
+            tid = self.ids.get(text)
+            return 0 if tid is None else self.counts[tid]
+
+    # --- PERSISTENCE ---
+    def rebuild(self):
+        """
+        Re-indexes the whole store: the attached manager's contents, labelled with
+        the version they are, or else the tasks file streamed one day at a time.
+        """
+        # Count first so each distinct text walks the trie once, with its final count
+        count = lambda days: Counter(t["text"] for _, tasks in days for t in tasks)
+        if self.manager: counts, version, seq = self.manager.snapshot(lambda data: count(data.items()))
+        else:
+            from .transfer import iter_days   # deferred: only needed when the saved index is stale
+            counts, version, seq = count(iter_days(self.tasks_path)), None, 0
+        with self._lock:
+            self._reset()
+            for text, n in counts.most_common(): self._add(text, n)
+            self.version, self.seq, self.dirty = version, seq, True
+
+    def load(self, version, seq=0):
+        """Loads the saved index if it covers the store at `version` (change `seq`); returns whether it did."""
+        try: saved = load_json_file(self.path)
+        except FileNotFoundError: return False
+        except (OSError, ValueError) as e:
+            print(f"Search Index Error: {e}")
+            return False
+        if not isinstance(saved, dict) or saved.get("format") != INDEX_FORMAT: return False
+        if version is None or saved.get("version") != list(version): return False
+        with self._lock:
+            self.texts, self.counts, self.trie = saved["texts"], saved["counts"], saved["trie"]
+            self.ids = {text: tid for tid, text in enumerate(self.texts)}
+            self.postings = {w: set(ids) for w, ids in saved["postings"].items()}
+            self.words = sorted(self.postings)
+            self.version, self.seq, self.dirty = version, seq, False
+        return True
+
+    def save(self):
+        # Catch up with the store first (this may deliver events), then save what covers it
+        version = self.manager.version() if self.manager else None
+        with self._lock:
+            # A new file version alone (e.g. tasks only marked done) still needs saving
+            if version is not None and version != self.version: self.version, self.dirty = version, True
+            if not self.dirty or self.version is None: return
+            saved = {"format": INDEX_FORMAT, "version": list(self.version), "texts": self.texts,
+                     "counts": self.counts, "trie": self.trie,
+                     "postings": {w: sorted(ids) for w, ids in self.postings.items()}}
+            try:
+                dump_json_file(self.path, saved, compress=config.COMPRESS_TRANSFERS)
+                self.dirty = False
+            except OSError as e: print(f"Search Index Error: {e}")
+
+    def attach(self, manager):
+        """Follows manager's changes, then loads (or rebuilds) the index for its store."""
+        # 🟢 FIX: subscribe first, so a task written while loading is held back rather than missed
+        with self._lock: self._backlog = []
+        self.manager = manager
+        self._unsubscribe = manager.subscribe(self._on_event)
+        if not self.load(*manager.stamp()): self.rebuild()
+        with self._lock:
+            # Only the writes newer than what was loaded or rebuilt
+            for event in self._backlog: self._apply(event)
+            self._backlog = None
+        self.save()
+        return self
+
+    def close(self):
+        """Stops following the store and saves what was added since loading."""
+        if self._unsubscribe: self._unsubscribe()
+        self._unsubscribe = None
+        self.save()
+        self.manager = None
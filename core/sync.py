@@ -0,0 +1,383 @@
+"""
+Delta sync of the task store between devices (e.g. the Desktop and Mobile apps).
+
+Every day of the store carries a version vector ({device: edits}) and a local
+sequence number. A peer only gets the days whose sequence moved past its cursor
+and whose vector it hasn't already got from us, so a round costs what changed
+rather than the size of the store. Incoming days replace ours when their vector
+dominates, are ignored when ours does, and are merged when both sides edited the
+day concurrently; the merge runs in a fixed order, so every device ends up with
+the same list.
+
+One device serves (python -m core.sync serve, or FOCUS_SYNC_PORT in the apps),
+the others sync against it (python -m core.sync sync URL, or FOCUS_SYNC_URL).
+The server only listens on loopback unless every device shares FOCUS_SYNC_TOKEN.
+"""
+import gzip
+import json
+import uuid
+import hmac
+import hashlib
+import ipaddress
+import argparse
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from . import config
+from . import executor
+from .data_manager import merge_day
+from .scheduler import default_scheduler
+from .utils import dump_json_file, load_json_file
+
+SYNC_FORMAT = 1
+GZIP_MIN_BYTES = 1024
+TOKEN_HEADER = "X-Sync-Token"
+
+def day_hash(tasks):
+    return hashlib.sha1(json.dumps(tasks, sort_keys=True, separators=(",", ":")).encode()).hexdigest()[:16]
+
+def dominates(a, b):
+    """True if version vector a includes every edit b does."""
+    return all(a.get(device, 0) >= n for device, n in b.items())
+
+def join(a, b):
+    return {device: max(a.get(device, 0), b.get(device, 0)) for device in sorted(set(a) | set(b))}
+
+def merge_concurrent(a, b):
+    """Merges two concurrent versions of a day; the result doesn't depend on which side runs it."""
+    first, second = sorted((a, b), key=lambda tasks: json.dumps(tasks, sort_keys=True))
+    return merge_day([], first, second)
+
+class SyncReplica:
+    """
+    This device's side of task sync: the version of every day plus, per peer,
+    how far each side has seen the other. Local edits (from any process) are
+    noticed through the manager's change events and versioned lazily, just
+    before the next exchange.
+    """
+    def __init__(self, manager, state_path=None):
+        self.manager = manager
+        self.path = state_path or config.SYNC_STATE_FILE
+        self._lock = threading.RLock()
+        self.device = uuid.uuid4().hex[:12]
+        self.seq = 0
+        self.days = OrderedDict()   # day -> {"vv", "hash", "seq"}, in seq order
+        self.peers = {}             # peer -> {"sent": our seq, "cursor": their seq, "known": {day: vv}}
+        self._dirty = set()         # days edited locally since they were last versioned
+        self._changed = False       # state differs from the saved file
+        self._saved_version = None  # store version the saved file covers
+        self._receiving = threading.local()   # set on a thread writing a peer's days to the store
+        # Events arrive with the manager's lock held, so they only ever take this one
+        self._dirty_lock = threading.Lock()
+        self._unsubscribe = manager.subscribe(self._on_event)
+        if not self._load(): self._dirty.update(manager.days())   # edited while nobody listened
+
+    # --- STATE ---
+    def _load(self):
+        """Restores the saved state; False if there is none or the store changed since it was saved."""
+        try: saved = load_json_file(self.path)
+        except FileNotFoundError: return False
+        except (OSError, ValueError) as e:
+            print(f"Sync State Error: {e}")
+            return False
+        if not isinstance(saved, dict) or saved.get("format") != SYNC_FORMAT: return False
+        self.device, self.seq, self.peers = saved["device"], saved["seq"], saved["peers"]
+        self.days = OrderedDict((day, {"vv": vv, "hash": h, "seq": seq}) for day, vv, h, seq in saved["days"])
+        self._saved_version = saved.get("version")
+        return self._saved_version == list(self.manager.version() or ())
+
+    def save(self):
+        with self._lock:
+            self.refresh()
+            version = list(self.manager.version() or ())
+            # 🟢 FIX: rounds and requests that changed nothing leave the file alone
+            if not self._changed and version == self._saved_version: return
+            state = {"format": SYNC_FORMAT, "device": self.device, "seq": self.seq,
+                     "version": version, "peers": self.peers,
+                     "days": [[day, e["vv"], e["hash"], e["seq"]] for day, e in self.days.items()]}
+            try: dump_json_file(self.path, state, compress=config.COMPRESS_TRANSFERS)
+            except OSError as e: return print(f"Sync State Error: {e}")
+            self._changed, self._saved_version = False, version
+
+    def close(self):
+        self._unsubscribe()
+        self.save()
+
+    def _peer(self, peer):
+        if peer not in self.peers: self._changed = True
+        return self.peers.setdefault(peer, {"sent": 0, "cursor": 0, "known": {}})
+
+    def _put(self, state, key, value):
+        # Peer bookkeeping that only marks the state changed when the value is new
+        if state.get(key) != value: state[key], self._changed = value, True
+
+    def receiving(self):
+        """True on the thread writing a peer's days to the store, i.e. for events sync itself caused."""
+        return getattr(self._receiving, "active", False)
+
+    # --- VERSIONS ---
+    def _on_event(self, event):
+        with self._dirty_lock: self._dirty.add(event.day)
+
+    def _dirty_days(self):
+        with self._dirty_lock: return list(self._dirty)
+
+    def _set_version(self, day, vv, tasks):
+        self.seq += 1
+        self._changed = True
+        self.days.pop(day, None)
+        self.days[day] = {"vv": vv, "hash": day_hash(tasks), "seq": self.seq}
+
+    def _version_local(self, data, days):
+        # Days whose contents no longer match their version were edited here: count one more local edit
+        for day in days:
+            tasks, entry = data.get(day, []), self.days.get(day)
+            if entry is None and not tasks: continue
+            if entry is None or entry["hash"] != day_hash(tasks):
+                vv = dict(entry["vv"]) if entry else {}
+                vv[self.device] = vv.get(self.device, 0) + 1
+                self._set_version(day, vv, tasks)
+            with self._dirty_lock: self._dirty.discard(day)
+
+    def refresh(self):
+        """Versions the local edits noticed since the last exchange."""
+        with self._lock:
+            days = self._dirty_days()
+            if days: self._version_local(self.manager.days(days), days)
+
+    # --- EXCHANGE ---
+    def changes_for(self, peer, cursor):
+        """(our seq, [[day, vv, tasks]]) for days changed after cursor that peer hasn't got from us."""
+        with self._lock:
+            self.refresh()
+            known = self._peer(peer)["known"]
+            days = []
+            for day in reversed(self.days):
+                entry = self.days[day]
+                if entry["seq"] <= cursor: break
+                if known.get(day) != entry["vv"]: days.append(day)
+            tasks = self.manager.days(days)
+            self._version_local(tasks, days)   # in case the store moved on since refresh()
+            return self.seq, [[day, self.days[day]["vv"], tasks[day]] for day in reversed(days)]
+
+    def receive(self, peer, incoming):
+        """Applies [[day, vv, tasks]] sent by peer; returns how many days of our store changed."""
+        with self._lock:
+            known = self._peer(peer)["known"]
+
+            def apply(data):
+                self._version_local(data, [day for day, _, _ in incoming] + self._dirty_days())
+                changed = {}
+                for day, vv, tasks in incoming:
+                    self._put(known, day, vv)
+                    entry = self.days.get(day)
+                    mine = entry["vv"] if entry else {}
+                    if dominates(mine, vv): continue
+                    if dominates(vv, mine): merged, merged_vv = tasks, vv
+                    # Concurrent: the joined vector is newer than both, so it wins everywhere
+                    else: merged, merged_vv = merge_concurrent(data.get(day, []), tasks), join(mine, vv)
+                    self._set_version(day, merged_vv, merged)
+                    if merged != data.get(day, []): changed[day] = merged
+                return changed
+
+            self._receiving.active = True
+            try: changed = self.manager.update_days(apply)
+            finally: self._receiving.active = False
+            with self._dirty_lock: self._dirty.difference_update(changed)   # our own write, already versioned
+            return len(changed)
+
+    def sync(self, transport):
+        """One round against a peer: push our changes, then pull theirs. Returns (days sent, days changed here)."""
+        with self._lock:
+            state = self._peer(transport.name)
+            seq, days = self.changes_for(transport.name, state["sent"])
+        if days: transport.push(self.device, days)
+        with self._lock:
+            for day, vv, _ in days: self._put(state["known"], day, vv)
+            self._put(state, "sent", seq)
+        cursor, theirs = transport.pull(self.device, state["cursor"])
+        changed = self.receive(transport.name, theirs)
+        with self._lock: self._put(state, "cursor", cursor)
+        self.save()
+        return len(days), changed
+
+# --- TRANSPORTS ---
+class LocalTransport:
+    """Syncs with a replica in the same process (tests, or two stores on one machine)."""
+    def __init__(self, replica):
+        self.replica = replica
+        self.name = replica.device
+
+    def push(self, device, days):
+        self.replica.receive(device, days)
+
+    def pull(self, device, cursor):
+        return self.replica.changes_for(device, cursor)
+
+class HttpTransport:
+    """Syncs with a SyncServer over HTTP, gzipping large bodies both ways."""
+    def __init__(self, url, timeout=15, token=None):
+        self.url = url.rstrip("/")
+        self.name = self.url
+        self.timeout = timeout
+        self.token = config.SYNC_TOKEN if token is None else token
+
+    def _post(self, path, body):
+        import requests   # deferred like the leaderboard client: only needed once we sync
+        raw = json.dumps(body).encode()
+        headers = {"Content-Type": "application/json", "Accept-Encoding": "gzip" if config.COMPRESS_TRANSFERS else "identity"}
+        if config.COMPRESS_TRANSFERS and len(raw) >= GZIP_MIN_BYTES:
+            raw, headers["Content-Encoding"] = gzip.compress(raw, 6), "gzip"
+        if self.token: headers[TOKEN_HEADER] = self.token
+        resp = requests.post(self.url + path, data=raw, headers=headers, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    def push(self, device, days):
+        self._post("/push", {"device": device, "days": days})
+
+    def pull(self, device, cursor):
+        reply = self._post("/pull", {"device": device, "cursor": cursor})
+        return reply["cursor"], reply["days"]
+
+class Handler(BaseHTTPRequestHandler):
+    replica = None   # set on the bound subclass
+    token = ""       # shared secret every request must carry, if set
+
+    def log_message(self, *args): pass
+
+    def do_POST(self):
+        if self.token and not hmac.compare_digest(self.headers.get(TOKEN_HEADER, "").encode(), self.token.encode()):
+            return self._send({"error": "bad sync token"}, 401)
+        raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            if self.headers.get("Content-Encoding") == "gzip": raw = gzip.decompress(raw)
+            body = json.loads(raw)
+            if self.path == "/push":
+                self.replica.receive(body["device"], body["days"])
+                reply = {"ok": True}
+            elif self.path == "/pull":
+                cursor, days = self.replica.changes_for(body["device"], body.get("cursor", 0))
+                reply = {"cursor": cursor, "days": days}
+            else: return self._send({"error": "not found"}, 404)
+            self.replica.save()
+        except (OSError, ValueError, KeyError, TypeError) as e: return self._send({"error": str(e)}, 400)
+        self._send(reply)
+
+    def _send(self, value, status=200):
+        body = json.dumps(value).encode()
+        gzipped = len(body) >= GZIP_MIN_BYTES and "gzip" in self.headers.get("Accept-Encoding", "")
+        if gzipped: body = gzip.compress(body, 6)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if gzipped: self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def is_loopback(host):
+    if host == "localhost": return True
+    try: return ipaddress.ip_address(host).is_loopback
+    except ValueError: return False
+
+def make_server(replica, host="127.0.0.1", port=0, token=None):
+    """
+    HTTP server for replica; port 0 picks a free port (see server.server_address).
+    With a token, push and pull need it in the X-Sync-Token header. Binding to
+    anything but loopback without one raises ValueError: the store would be
+    readable and writable by the whole network.
+    """
+    token = config.SYNC_TOKEN if token is None else token
+    if not token and not is_loopback(host):
+        raise ValueError(f"refusing to serve on {host} without a sync token (set FOCUS_SYNC_TOKEN)")
+    return ThreadingHTTPServer((host, port), type("BoundHandler", (Handler,), {"replica": replica, "token": token}))
+
+class SyncService:
+    """
+    What the apps run: serves the store when port is set, and syncs with url
+    every interval seconds (sooner after a local edit) when url is set. Rounds
+    are timed by the shared scheduler and run on the background executor.
+    """
+    def __init__(self, manager, url=None, port=None, interval=None, host=None):
+        self.replica = SyncReplica(manager)
+        self.url = url if url is not None else config.SYNC_URL
+        self.port = port if port is not None else config.SYNC_PORT
+        self.interval = interval or config.SYNC_INTERVAL
+        self.host = host or config.SYNC_HOST
+        self.server = None
+        self._job = None
+        self._lock = threading.Lock()
+        self._transport = HttpTransport(self.url) if self.url else None
+        self._unsubscribe = None
+
+    def start(self):
+        if self.port:
+            try:
+                self.server = make_server(self.replica, self.host, self.port)
+                threading.Thread(target=self.server.serve_forever, name="SyncServer", daemon=True).start()
+            except (OSError, ValueError) as e: print(f"Sync Error: {e}")
+        if self._transport:
+            self._unsubscribe = self.replica.manager.subscribe(self._on_event)
+            self._plan(0)
+        return self
+
+    def _on_event(self, event):
+        # 🟢 FIX: days a round just received are not local edits; rescheduling for them would loop
+        if not self.replica.receiving(): self._plan(config.SYNC_DEBOUNCE)
+
+    def _plan(self, delay):
+        # Keeps one pending round, at the earliest time asked for
+        with self._lock:
+            deadline = default_scheduler().clock() + delay
+            if self._job and not self._job.cancelled and self._job.deadline <= deadline: return
+            if self._job: default_scheduler().cancel(self._job)
+            self._job = default_scheduler().call_at(deadline, self._start_round)
+
+    def _start_round(self):
+        # Scheduler thread: hand the network work to the executor
+        executor.submit("sync", self._round, key="round")
+
+    def _round(self):
+        with self._lock: self._job = None
+        try: self.replica.sync(self._transport)
+        except Exception as e: print(f"Sync Error: {e}")
+        self._plan(self.interval)
+
+    def stop(self):
+        if self._unsubscribe: self._unsubscribe()
+        with self._lock:
+            if self._job: default_scheduler().cancel(self._job)
+            self._job = None
+        if self.server: self.server.shutdown()
+        self.replica.close()
+
+def _main():
+    from .data_manager import TaskManager
+    parser = argparse.ArgumentParser(prog="python -m core.sync", description="Sync the task store between devices")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("serve", help="let other devices sync with this store")
+    p.add_argument("--host", default=config.SYNC_HOST, help="other devices need FOCUS_SYNC_TOKEN unless this is loopback")
+    p.add_argument("--port", type=int, default=config.SYNC_PORT or 8766)
+    p = sub.add_parser("sync", help="one round against a serving device")
+    p.add_argument("url", nargs="?", default=config.SYNC_URL)
+    args = parser.parse_args()
+
+    manager = TaskManager()
+    replica = SyncReplica(manager)
+    try:
+        if args.command == "serve":
+            try: server = make_server(replica, args.host, args.port)
+            except ValueError as e: parser.error(str(e))
+            print(f"Serving task sync on http://{args.host}:{args.port}")
+            try: server.serve_forever()
+            except KeyboardInterrupt: pass
+        else:
+            if not args.url: parser.error("no URL given and FOCUS_SYNC_URL is not set")
+            sent, changed = replica.sync(HttpTransport(args.url))
+            print(f"Sent {sent} day(s), {changed} day(s) updated here")
+    finally:
+        replica.close()
+        manager.close()
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,128 @@
+# Focus timer engine shared by the apps and the CLI (no UI, no network)
+import os
+import json
+import time
+from datetime import datetime
+from . import config
+from .utils import atomic_write
+
+IDLE, RUNNING, PAUSED, FINISHED = "IDLE", "RUNNING", "PAUSED", "FINISHED"
+
+class FocusTimer:
+    """
+    Countdown computed from the clock instead of counted down by ticks, so a late
+    or skipped UI update never loses time. The UI only polls remaining().
+    """
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.state = IDLE
+        self.planned_mins = 0
+        self.started_at = None   # clock time the current running stretch began
+        self.banked = 0.0        # seconds run before the current stretch (pauses)
+
+    def start(self, minutes):
+        self.state = RUNNING
+        self.planned_mins = minutes
+        self.started_at = self.clock()
+        self.banked = 0.0
+
+    def pause(self):
+        if self.state != RUNNING: return
+        self.banked = self.elapsed()
+        self.started_at = None
+        self.state = PAUSED
+
+    def resume(self):
+        if self.state != PAUSED: return
+        self.started_at = self.clock()
+        self.state = RUNNING
+
+    def cancel(self):
+        self.state = IDLE
+        self.started_at = None
+        self.banked = 0.0
+
+    def elapsed(self):
+        """Seconds focused so far, capped at the planned length."""
+        running = self.clock() - self.started_at if self.started_at is not None else 0
+        return min(self.banked + running, self.planned_mins * 60)
+
+    def remaining(self):
+        return max(0, self.planned_mins * 60 - int(self.elapsed()))
+
+    def is_done(self):
+        """True once a running countdown has reached zero."""
+        return self.state == RUNNING and self.remaining() == 0
+
+    def finish(self):
+        """Ends the session; returns the minutes to log (the full length if it ran out)."""
+        minutes = self.planned_mins if self.remaining() == 0 else max(1, int(self.elapsed()) // 60)
+        self.state = FINISHED
+        self.banked, self.started_at = self.elapsed(), None
+        return minutes
+
+    # --- CHECKPOINTS ---
+    def to_dict(self):
+        return {"state": self.state, "planned_mins": self.planned_mins,
+                "started_at": self.started_at, "banked": self.banked}
+
+    def restore(self, saved, saved_at, credit_closed_time=True):
+        """
+        Resumes from to_dict() output written at clock time saved_at. A session that
+        was running keeps running from its deadline, so time spent closed counts;
+        without credit_closed_time it comes back paused where it was last seen.
+        """
+        self.state = saved["state"]
+        self.planned_mins = saved["planned_mins"]
+        self.started_at = saved["started_at"]
+        self.banked = saved["banked"]
+        if self.state == RUNNING and not credit_closed_time:
+            self.banked = min(self.banked + max(0, saved_at - self.started_at), self.planned_mins * 60)
+            self.started_at = None
+            self.state = PAUSED
+
+class TimerCheckpoint:
+    """
+    Small file holding the current session (timer + chosen goals), rewritten
+    atomically on every state change, so a crash or close never loses the session.
+    """
+    def __init__(self, path=None, credit_closed_time=None):
+        self.path = path or config.TIMER_STATE_FILE
+        self.credit_closed_time = config.CREDIT_CLOSED_TIME if credit_closed_time is None else credit_closed_time
+
+    def save(self, timer, goals=()):
+        if timer.state not in (RUNNING, PAUSED): return self.clear()
+        state = dict(timer.to_dict(), goals=sorted(goals), saved_at=timer.clock())
+        try: atomic_write(self.path, json.dumps(state))
+        except OSError as e: print(f"Timer Save Error: {e}")
+
+    def clear(self):
+        try: os.remove(self.path)
+        except FileNotFoundError: pass
+        except OSError as e: print(f"Timer Save Error: {e}")
+
+    def load(self, timer):
+        """Restores an unfinished session into timer; returns its goals, or None if there is none."""
+        try:
+            with open(self.path, "r") as f: saved = json.load(f)
+            if saved.get("state") not in (RUNNING, PAUSED): return None
+            timer.restore(saved, saved.get("saved_at", timer.clock()), self.credit_closed_time)
+            return list(saved.get("goals", []))
+        except FileNotFoundError: return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Timer Load Error: {e}")
+            return None
+
+def format_clock(seconds):
+    mins, secs = divmod(int(seconds), 60)
+    return f"{mins:02d}:{secs:02d}"
+
+def session_entry(username, duration_mins, tasks_list, when=None):
+    """Leaderboard entry for a finished focus session."""
+    return {
+        "username": username,
+        "date": (when or datetime.now()).strftime("%Y-%m-%d %H:%M"),
+        "duration": f"{duration_mins} min",
+        "tasks_done": tasks_list,
+        "task_count": len(tasks_list)
+    }
@@ -0,0 +1,232 @@
+"""
+Streaming export/import of the task store and the mirrored leaderboard sessions.
+
+Everything is a generator of flat row dicts, read and written one day (tasks) or
+one batch (sessions) at a time, so moving years of history never loads it whole.
+
+  python -m core.transfer export tasks --format csv --from 2024-01-01 -o tasks.csv
+  python -m core.transfer import tasks tasks.csv
+  python -m core.transfer export sessions --format ndjson -o sessions.ndjson
+"""
+import csv
+import sys
+import json
+import argparse
+from datetime import datetime
+from itertools import islice
+from contextlib import nullcontext
+from . import config
+from .data_manager import merge_day
+from .utils import file_lock, atomic_writer
+
+TASK_FIELDS = ["date", "text", "done"]
+SESSION_FIELDS = ["key", "username", "date", "minutes", "task_count", "tasks_done"]
+CHUNK_CHARS = 64 * 1024
+IMPORT_BATCH = 1000
+
+# --- READING THE TASK STORE ---
+def iter_json_object(f, chunk_chars=CHUNK_CHARS):
+    """
+    Yields the (key, value) pairs of a top-level JSON object one at a time,
+    decoding from a sliding buffer instead of parsing the whole file.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_chars)
+        if not chunk: eof = True
+        buf, pos = buf[pos:] + chunk, 0
+
+    def skip_ws():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n": pos += 1
+            if pos < len(buf) or eof: return
+            fill()
+
+    def decode():
+        # A value cut off by the buffer end fails (or, for a bare number, ends early): read more
+        nonlocal pos
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+                if end < len(buf) or eof:
+                    pos = end
+                    return value
+            except ValueError:
+                if eof: raise
+            fill()
+
+    def expect(chars):
+        nonlocal pos
+        skip_ws()
+        if pos >= len(buf) or buf[pos] not in chars: raise ValueError(f"expected {chars!r} at offset {pos}")
+        pos += 1
+        return buf[pos - 1]
+
+    skip_ws()
+    if buf[pos:pos + 1] == "[":
+        # Legacy flat list: it belonged to the day it was last saved on
+        yield datetime.now().strftime("%Y-%m-%d"), decode()
+        return
+    expect("{")
+    skip_ws()
+    if buf[pos:pos + 1] == "}": return
+    while True:
+        skip_ws()
+        key = decode()
+        expect(":")
+        skip_ws()
+        yield key, decode()
+        if expect(",}") == "}": return
+
+def iter_days(path=None, start=None, end=None):
+    """(day, tasks) from the task store for days within [start, end] ("YYYY-MM-DD", inclusive)."""
+    try: f = open(path or config.TASKS_FILE, "r")
+    except FileNotFoundError: return
+    with f:
+        for day, tasks in iter_json_object(f):
+            if start and day < start or end and day > end: continue
+            yield day, tasks
+
+def iter_task_rows(path=None, start=None, end=None):
+    for day, tasks in iter_days(path, start, end):
+        for t in tasks:
+            yield {"date": day, "text": t["text"], "done": bool(t.get("done", False))}
+
+def iter_session_rows(mirror, start=None, end=None):
+    for key, name, date, minutes, task_count, tasks in mirror.iter_sessions(start, end):
+        yield {"key": key, "username": name, "date": date, "minutes": minutes,
+               "task_count": task_count, "tasks_done": tasks}
+
+# --- FORMATS ---
+def write_ndjson(rows, out):
+    n = 0
+    for row in rows:
+        out.write(json.dumps(row) + "\n")
+        n += 1
+    return n
+
+def read_ndjson(f):
+    for line in f:
+        if line.strip(): yield json.loads(line)
+
+def write_csv(rows, out, fields):
+    writer = csv.DictWriter(out, fieldnames=fields)
+    writer.writeheader()
+    n = 0
+    for row in rows:
+        # Lists (tasks_done) go into a single cell as JSON
+        writer.writerow({k: json.dumps(v) if isinstance(v, list) else v for k, v in row.items()})
+        n += 1
+    return n
+
+def read_csv(f):
+    for row in csv.DictReader(f):
+        if "done" in row: row["done"] = row["done"].strip().lower() in ("true", "1", "yes")
+        for field in ("minutes", "task_count"):
+            if row.get(field): row[field] = int(row[field])
+        if row.get("tasks_done"): row["tasks_done"] = json.loads(row["tasks_done"])
+        yield row
+
+def read_rows(f, fmt):
+    return read_csv(f) if fmt == "csv" else read_ndjson(f)
+
+def write_rows(rows, out, fmt, fields):
+    return write_csv(rows, out, fields) if fmt == "csv" else write_ndjson(rows, out)
+
+# --- IMPORTING ---
+def import_tasks(rows, path=None, batch=IMPORT_BATCH):
+    """
+    Merges task rows into the task store, about `batch` rows at a time: each batch
+    is merged into a streaming rewrite of the store, under the same lock and atomic
+    replace the TaskManager uses, so running apps pick the change up. Batches end
+    between days, so a day's rows should come together (exports write them so).
+    Re-importing the same rows is a no-op; a task done on either side stays done.
+    Returns the number of rows read.
+    """
+    path = path or config.TASKS_FILE
+    incoming, held, count = {}, 0, 0
+    for row in rows:
+        if held >= batch and row["date"] not in incoming:
+            _merge_days(path, incoming)
+            incoming, held = {}, 0
+        incoming.setdefault(row["date"], []).append({"text": row["text"], "done": bool(row.get("done", False))})
+        held += 1
+        count += 1
+    if incoming: _merge_days(path, incoming)
+    return count
+
+def _merge_days(path, incoming):
+    # One locked, streamed rewrite of the store with {day: tasks} merged in
+    with file_lock(path + ".lock"), atomic_writer(path) as out:
+        out.write("{")
+        first = True
+
+        def put(day, tasks):
+            nonlocal first
+            out.write(("\n" if first else ",\n") + f"    {json.dumps(day)}: {json.dumps(tasks)}")
+            first = False
+
+        for day, tasks in iter_days(path):
+            put(day, merge_day([], incoming.pop(day), tasks) if day in incoming else tasks)
+        for day in sorted(incoming): put(day, merge_day([], incoming[day], []))
+        out.write("\n}")
+
+def import_sessions(rows, mirror, batch=IMPORT_BATCH):
+    """
+    Adds session rows to the leaderboard mirror in batches; known keys are skipped. Returns users touched.
+    The sync cursor is left alone, so imported sessions never hide older ones still upstream.
+    """
+    rows, touched = iter(rows), set()
+    while True:
+        chunk = list(islice(rows, batch))
+        if not chunk: return touched
+        touched |= mirror.apply({r["key"]: {
+            "username": r["username"], "date": r.get("date"),
+            "duration": f"{r.get('minutes', 0)} min",
+            "tasks_done": r.get("tasks_done") or [],
+            "task_count": r.get("task_count", 0),
+        } for r in chunk}, advance_cursor=False)
+
+def _main():
+    parser = argparse.ArgumentParser(description="Stream task/session history in or out")
+    parser.add_argument("action", choices=["export", "import"])
+    parser.add_argument("kind", choices=["tasks", "sessions"])
+    parser.add_argument("file", nargs="?", help="input file for import (default stdin)")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="default: from the file extension, else ndjson")
+    parser.add_argument("--from", dest="start", help="first day, YYYY-MM-DD")
+    parser.add_argument("--to", dest="end", help="last day, YYYY-MM-DD")
+    parser.add_argument("-o", "--output", help="export target (default stdout)")
+    args = parser.parse_args()
+
+    named = args.output if args.action == "export" else args.file
+    fmt = args.format or ("csv" if named and named.endswith(".csv") else "ndjson")
+    mirror = None
+    if args.kind == "sessions":
+        from .leaderboard_db import LeaderboardMirror
+        mirror = LeaderboardMirror()
+
+    try:
+        if args.action == "export":
+            if args.kind == "tasks": rows, fields = iter_task_rows(start=args.start, end=args.end), TASK_FIELDS
+            else: rows, fields = iter_session_rows(mirror, args.start, args.end), SESSION_FIELDS
+            out = open(args.output, "w", newline="") if args.output else sys.stdout
+            with out if args.output else nullcontext():
+                n = write_rows(rows, out, fmt, fields)
+            print(f"Exported {n} {args.kind}", file=sys.stderr)
+        else:
+            f = open(args.file, "r", newline="") if args.file else sys.stdin
+            with f:
+                rows = read_rows(f, fmt)
+                if args.start or args.end:
+                    rows = (r for r in rows if not (args.start and r["date"][:10] < args.start or args.end and r["date"][:10] > args.end))
+                if args.kind == "tasks": print(f"Imported {import_tasks(rows)} tasks", file=sys.stderr)
+                else: print(f"Imported sessions for {len(import_sessions(rows, mirror))} users", file=sys.stderr)
+    finally:
+        if mirror: mirror.close()
+
+if __name__ == "__main__":
+    _main()
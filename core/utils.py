@@ -0,0 +1,221 @@
+import os
+import sys
+import time
+import gzip
+import json
+import random
+import select
+import struct
+import tempfile
+import threading
+from contextlib import contextmanager
+
+PUSH_CHARS = "-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz"
+_umask_lock = threading.Lock()
+
+class PushIds:
+    """Generates ids that sort by creation time, like Firebase's push()."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_rand = [0] * 12
+
+    def next(self):
+        with self._lock:
+            ms = int(time.time() * 1000)
+            if ms == self._last_ms:
+                # Same millisecond: bump the random part so ids stay ordered
+                i = 11
+                while i >= 0 and self._last_rand[i] == 63:
+                    self._last_rand[i] = 0
+                    i -= 1
+                self._last_rand[i] += 1
+            else:
+                self._last_ms = ms
+                self._last_rand = [random.randrange(64) for _ in range(12)]
+            return push_id_floor(ms)[:8] + "".join(PUSH_CHARS[r] for r in self._last_rand)
+
+def push_id_time(key):
+    """Milliseconds timestamp encoded in the first 8 chars of a push id."""
+    ms = 0
+    for c in key[:8]: ms = ms * 64 + PUSH_CHARS.index(c)
+    return ms
+
+def push_id_floor(ms):
+    """Smallest possible push id created at `ms`, usable as a startAt bound."""
+    stamp = []
+    for _ in range(8):
+        stamp.append(PUSH_CHARS[ms % 64])
+        ms //= 64
+    return "".join(reversed(stamp)) + PUSH_CHARS[0] * 12
+
+@contextmanager
+def file_lock(path):
+    """
+    Exclusive advisory lock held on a sidecar file (e.g. user_tasks.json.lock).
+    Works across processes and across threads that open their own handle.
+    """
+    f = open(path, "a+")
+    try:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            while True:
+                # LK_LOCK gives up after ~10s of retries, so keep asking
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError: time.sleep(0.05)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try: yield
+        finally:
+            if os.name == "nt":
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    finally:
+        f.close()
+
+def _current_umask():
+    """The process umask, without changing it where the OS reports it (Linux /proc)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Umask:"): return int(line.split()[1], 8)
+    except (OSError, ValueError, IndexError): pass
+    # Elsewhere it can only be read by setting it; the lock keeps our own writers from racing
+    with _umask_lock:
+        mask = os.umask(0o022)
+        os.umask(mask)
+        return mask
+
+@contextmanager
+def atomic_writer(path, mode="w", **open_kwargs):
+    """
+    Yields a file opened next to path; on a clean exit it is fsynced and renamed
+    over path, on an exception it is discarded. For output streamed in pieces.
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix="." + os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        # 🟢 FIX: mkstemp files are 0600; keep the replaced file's mode, or the umask's for a new one
+        try: file_mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError: file_mode = 0o666 & ~_current_umask()
+        os.chmod(tmp_path, file_mode)
+        with os.fdopen(fd, mode, **open_kwargs) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        for attempt in range(10):
+            # Windows refuses to replace a file another process has open; retry briefly
+            try:
+                os.replace(tmp_path, path)
+                return
+            except PermissionError:
+                if attempt == 9: raise
+                time.sleep(0.02)
+    except BaseException:
+        try: os.remove(tmp_path)
+        except OSError: pass
+        raise
+
+def atomic_write(path, text):
+    """Writes text (str or bytes) to a temp file next to path, fsyncs it, then renames it over path."""
+    with atomic_writer(path, "wb" if isinstance(text, bytes) else "w") as f: f.write(text)
+
+def dump_json_file(path, data, compress=True):
+    """Atomically writes data as JSON, gzipped when compress is set."""
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    if compress: raw = gzip.compress(raw, 6)
+    atomic_write(path, raw)
+
+def load_json_file(path):
+    """Reads a file written by dump_json_file, compressed or not."""
+    with open(path, "rb") as f: raw = f.read()
+    if raw[:2] == b"\x1f\x8b": raw = gzip.decompress(raw)
+    return json.loads(raw)
+
+class FileWatcher:
+    """
+    Calls on_change() from a background thread whenever path is written or replaced.
+    Uses inotify on Linux (watching the folder, because atomic saves swap the inode)
+    and falls back to cheap stat polling everywhere else.
+    """
+    def __init__(self, path, on_change, poll_interval=0.5):
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._wake_r, self._wake_w = None, None
+        self._pipe_lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread: return
+        self._wake_r, self._wake_w = os.pipe()   # lets stop() interrupt a blocking select
+        self._thread = threading.Thread(target=self._run, name="FileWatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        with self._pipe_lock:
+            if self._wake_w is not None: os.write(self._wake_w, b"x")
+
+    def _run(self):
+        try: fd = self._inotify_fd()
+        except (OSError, AttributeError): fd = None
+        try:
+            if fd is None: self._run_polling()
+            else: self._run_inotify(fd)
+        finally:
+            with self._pipe_lock:
+                for f in (fd, self._wake_r, self._wake_w):
+                    if f is not None: os.close(f)
+                self._wake_r = self._wake_w = None
+
+    def _inotify_fd(self):
+        if not sys.platform.startswith("linux"): return None
+        import ctypes, ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0: return None
+        # IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+        mask = 0x008 | 0x080 | 0x100 | 0x200
+        if libc.inotify_add_watch(fd, os.path.dirname(self.path).encode(), mask) < 0:
+            os.close(fd)
+            return None
+        return fd
+
+    def _run_inotify(self, fd):
+        name = os.path.basename(self.path).encode()
+        while not self._stop.is_set():
+            ready, _, _ = select.select([fd, self._wake_r], [], [])
+            if fd not in ready: continue
+            try: buf = os.read(fd, 65536)
+            except BlockingIOError: continue
+            changed, offset = False, 0
+            while offset < len(buf):
+                _, _, _, length = struct.unpack_from("iIII", buf, offset)
+                if buf[offset + 16:offset + 16 + length].rstrip(b"\0") == name: changed = True
+                offset += 16 + length
+            if changed: self._notify()
+
+    def _run_polling(self):
+        def stamp():
+            try:
+                st = os.stat(self.path)
+                return (st.st_ino, st.st_mtime_ns, st.st_size)
+            except OSError: return None
+        last = stamp()
+        while not self._stop.wait(self.poll_interval):
+            current = stamp()
+            if current != last:
+                last = current
+                self._notify()
+
+    def _notify(self):
+        try: self.on_change()
+        except Exception as e: print(f"Watcher Error: {e}")
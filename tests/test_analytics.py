@@ -0,0 +1,25 @@
+from datetime import datetime
+from core.analytics import FocusStats
+
+def test_seed_fills_only_an_empty_history(tmp_path):
+    path = str(tmp_path / "stats.json")
+    stats = FocusStats(path)
+    past = [(25, ["Read"], datetime(2024, 1, 1, 9)), (30, [], datetime(2024, 1, 2, 9))]
+    assert stats.seed(past)
+    assert stats.totals() == (55, 1, 2) and stats.best_streak() == 2
+    assert not stats.seed(past)
+    assert FocusStats(path).totals() == (55, 1, 2)
+
+def test_seed_skips_recorded_history(tmp_path):
+    stats = FocusStats(str(tmp_path / "stats.json"))
+    stats.record_session(10, ["Run"])
+    assert not stats.seed([(25, ["Read"], datetime(2024, 1, 1, 9))])
+    assert stats.totals() == (10, 1, 1)
+
+def test_tasks_outside_sessions_match_a_seeded_history(tmp_path):
+    local = FocusStats(str(tmp_path / "local.json"))
+    local.record_session(25, ["Read"], datetime(2024, 1, 1, 9))
+    local.record_tasks(["Run"], datetime(2024, 1, 3, 9))
+    seeded = FocusStats(str(tmp_path / "seeded.json"))
+    assert seeded.seed([(25, ["Read"], datetime(2024, 1, 1, 9)), (None, ["Run"], datetime(2024, 1, 3, 9))])
+    assert seeded.data == local.data and seeded.totals() == (25, 2, 1) and seeded.best_streak() == 1
@@ -0,0 +1,44 @@
+import gzip
+import json
+import pytest
+pytest.importorskip("requests")
+from core import api_client, config
+
+class Response:
+    def __init__(self, status_code): self.status_code = status_code
+
+class Session:
+    """Records PATCH bodies; answers gzipped ones with `gzip_status`."""
+    def __init__(self, gzip_status):
+        self.gzip_status, self.bodies = gzip_status, []
+
+    def patch(self, url, data, headers, timeout):
+        gzipped = headers.get("Content-Encoding") == "gzip"
+        self.bodies.append(json.loads(gzip.decompress(data) if gzipped else data))
+        return Response(self.gzip_status if gzipped else 200)
+
+def entries(n=40):
+    return [{"username": "me", "duration": "25 min", "tasks_done": [f"task {i}" * 5]} for i in range(n)]
+
+@pytest.fixture
+def session(monkeypatch):
+    monkeypatch.setattr(config, "COMPRESS_TRANSFERS", True)
+    monkeypatch.setattr(api_client, "_gzip_rejected", False)
+    def use(gzip_status):
+        http = Session(gzip_status)
+        monkeypatch.setattr(api_client, "_http", lambda: http)
+        return http
+    return use
+
+def test_rejected_gzip_falls_back_to_plain_json_for_the_run(session):
+    http = session(415)
+    assert api_client.post_sessions(entries()).status_code == 200
+    assert len(http.bodies) == 2 and http.bodies[0] == http.bodies[1]   # retried as plain JSON
+    api_client.post_sessions(entries())
+    assert len(http.bodies) == 3   # no more gzip attempts
+
+def test_accepted_gzip_is_sent_once(session):
+    http = session(200)
+    api_client.post_sessions(entries())
+    api_client.post_sessions(entries())
+    assert len(http.bodies) == 2 and not api_client._gzip_rejected
@@ -0,0 +1,33 @@
+from core import config
+from core.data_manager import DayIndex, TaskManager
+
+DAY = "2024-01-01"
+
+def make(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "TASKS_FILE", str(tmp_path / "tasks.json"))
+    return TaskManager()
+
+def test_day_index_takes_the_oldest_open_duplicate():
+    index = DayIndex([{"text": "Read", "done": False}, {"text": "Run", "done": True}, {"text": "Read", "done": False}])
+    assert list(index.pending) == [0, 2] and index.done_count == 1
+    assert index.take("Read") == 0 and index.take("Read") == 2 and index.take("Read") is None
+    assert list(index.pending) == [] and index.done_count == 3
+
+def test_pending_and_progress_follow_every_write(tmp_path, monkeypatch):
+    manager = make(tmp_path, monkeypatch)
+    manager.bulk([("add", "Read", DAY), ("add", "Run", DAY), ("add", "Read", DAY)])
+    manager.mark_done("Read", DAY, upload=False)
+    manager.mark_done("Call", DAY, upload=False)   # not listed: added already done
+    assert manager.pending_tasks(DAY) == ["Run", "Read"] and manager.progress(DAY) == (2, 4)
+    assert TaskManager().progress(DAY) == (2, 4)    # a fresh cache indexes the saved file the same way
+    assert manager.pending_tasks("2024-01-02") == [] and manager.progress("2024-01-02") == (0, 0)
+
+def test_load_data_hands_out_a_copy(tmp_path, monkeypatch):
+    manager = make(tmp_path, monkeypatch)
+    manager.add_task("Read", DAY)
+    version = manager.version()
+    data = manager.load_data()
+    data[DAY][0]["done"] = True
+    data[DAY].append({"text": "Run", "done": False})
+    assert manager.pending_tasks(DAY) == ["Read"] and manager.progress(DAY) == (0, 1)
+    assert manager.version() == version
@@ -0,0 +1,49 @@
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Desktop"))
+from dispatcher import UIDispatcher
+
+class FakeRoot:
+    """Stands in for Tk: queued callbacks run when the test says so."""
+    def __init__(self, in_mainloop=True):
+        self.queue, self.handlers, self.in_mainloop = [], {}, in_mainloop
+
+    def bind(self, event, fn, add=None): self.handlers[event] = fn
+    def after(self, ms, fn):
+        self.queue.append(fn)
+        return len(self.queue)
+    def after_cancel(self, job): pass
+    def event_generate(self, event, when=None):
+        if not self.in_mainloop: raise RuntimeError("main thread is not in main loop")
+        self.queue.append(lambda: self.handlers[event](None))
+
+    def run(self):
+        while self.queue: self.queue.pop(0)()
+
+def test_posts_before_mainloop_run_on_first_drain():
+    root, out = FakeRoot(in_mainloop=False), []
+    dispatcher = UIDispatcher(root)
+    dispatcher.post(out.append, 1)
+    root.run()
+    assert out == [1] and not root.queue
+
+def test_failed_wakeup_does_not_stick():
+    root, out = FakeRoot(), []
+    dispatcher = UIDispatcher(root)
+    root.run()
+    root.in_mainloop = False
+    dispatcher.post(out.append, 1)   # wake-up fails
+    root.in_mainloop = True
+    dispatcher.post(out.append, 2)
+    root.run()
+    assert out == [1, 2]
+
+def test_idle_dispatcher_stops_and_coalesces():
+    root, out = FakeRoot(), []
+    dispatcher = UIDispatcher(root)
+    root.run()
+    dispatcher.post(out.append, 1, key="k")
+    dispatcher.post(out.append, 2, key="k")
+    assert len(root.queue) == 1
+    root.run()
+    assert out == [2] and not root.queue
@@ -0,0 +1,46 @@
+import threading
+import pytest
+from core.executor import BackgroundExecutor
+
+@pytest.fixture
+def pool():
+    pool = BackgroundExecutor(max_workers=4, limits={"io": 2})
+    yield pool
+    pool.shutdown(timeout=5)
+
+def test_category_limit_caps_concurrency(pool):
+    lock, release = threading.Lock(), threading.Event()
+    running = peak = 0
+
+    def task():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        release.wait(5)
+        with lock: running -= 1
+
+    futures = [pool.submit("io", task) for _ in range(6)]
+    other = pool.submit("cpu", lambda: "free")   # other categories still get a worker
+    assert other.result(5) == "free"
+    release.set()
+    for f in futures: f.result(5)
+    assert peak == 2
+
+def test_same_key_shares_one_run(pool):
+    release, calls = threading.Event(), []
+    first = pool.submit("io", lambda: (calls.append(1), release.wait(5)), key="refresh")
+    assert pool.submit("io", calls.append, 2, key="refresh") is first
+    release.set()
+    first.result(5)
+    pool.submit("io", calls.append, 3, key="refresh").result(5)   # finished keys run again
+    assert calls == [1, 3]
+
+def test_shutdown_cancels_queued_and_refuses_new(pool):
+    release = threading.Event()
+    running = [pool.submit("io", release.wait, 5) for _ in range(2)]
+    queued = pool.submit("io", lambda: "never")
+    threading.Timer(0.1, release.set).start()
+    pool.shutdown(timeout=5)
+    assert queued.cancelled() and all(f.result() for f in running)
+    with pytest.raises(RuntimeError): pool.submit("io", lambda: None)
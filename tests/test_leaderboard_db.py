@@ -0,0 +1,54 @@
+import time
+import pytest
+pytest.importorskip("requests")   # the mirror's default fetcher is the HTTP client
+from core.leaderboard import Ranking
+from core.leaderboard_db import LeaderboardMirror, MirrorRanking
+from core.utils import push_id_floor, push_id_time
+
+def session(name, minutes):
+    return {"username": name, "date": "2024-01-01 10:00", "duration": f"{minutes} min", "task_count": 1}
+
+@pytest.fixture
+def mirror(tmp_path):
+    mirror = LeaderboardMirror(str(tmp_path / "leaderboard.db"))
+    yield mirror
+    mirror.close()
+
+def test_cursor_never_passes_now(mirror):
+    now = int(time.time() * 1000)
+    future = push_id_floor(now + 3600 * 1000)[:8] + "abcdefghijkl"   # pushed by a client an hour fast
+    mirror.apply({future: session("fast", 10)})
+    assert push_id_time(mirror.last_key()) <= int(time.time() * 1000)
+    assert push_id_time(mirror.sync_cursor()) < now
+
+def test_sql_pages_match_in_memory_ranking(mirror):
+    mirror.apply({f"-K{i:04d}": session(f"u{i % 37}", i % 11) for i in range(500)})
+    memory, sql = Ranking(mirror.all_totals()), MirrorRanking(mirror)
+    assert memory.page(10) + memory.page(10) == sql.page(10) + sql.page(10)
+    assert all(memory.rank_of(f"u{i}") == sql.rank_of(f"u{i}") for i in range(37))
+    assert sql.rank_of("nobody") is None
+
+def test_live_updates_keep_loaded_pages_exact(mirror):
+    mirror.apply({f"-A{i:04d}": session(f"u{i % 50}", 1 + i % 7) for i in range(400)})
+    ranking = MirrorRanking(mirror)
+    ranking.page(10)
+    for k, name in enumerate(["u3", "u49", "newbie", "u3", "u0"]):
+        mirror.apply({f"-B{k:04d}": session(name, 40)})
+        ranking.update(name, *mirror.user_totals(name))
+        assert ranking.ranked == mirror.top(10)
+    assert ranking.page(10) == mirror.top(10, 10)
+
+def test_paging_reads_the_rank_index_without_sorting(mirror):
+    for table, where, params in (("users", "1", ()), ("user_buckets", "bucket = ?", ("2024-01-01",))):
+        plan = " ".join(row[-1] for row in mirror._db.execute(
+            f"EXPLAIN QUERY PLAN SELECT username, minutes, tasks FROM {table} WHERE {where} "
+            "ORDER BY minutes DESC, username LIMIT 20 OFFSET 0", params))
+        assert "TEMP B-TREE" not in plan
+
+def test_user_sessions_keep_task_only_uploads(mirror):
+    entry = lambda date, minutes, tasks: {"username": "me", "date": date, "duration": f"{minutes} min",
+                                          "tasks_done": tasks, "task_count": len(tasks)}
+    mirror.apply({"-C0": entry("2024-01-01 10:00", 0, ["Read"]),          # sent along with the session
+                  "-C1": entry("2024-01-01 10:00", 25, ["Read"]),
+                  "-C2": entry("2024-01-02 09:00", 0, ["Run"])})          # `python -m core done`
+    assert [(m, t) for m, t, _ in mirror.user_sessions("me")] == [(25, ["Read"]), (None, ["Run"])]
@@ -0,0 +1,51 @@
+import threading
+from core.leaderboard_service import LeaderboardService, SNAPSHOT_FORMAT
+from core.utils import dump_json_file
+
+class Mirror:
+    """Stands in for LeaderboardMirror: a filled mirror whose sync() can be held open."""
+    def __init__(self, cursor="-K2", totals=None):
+        self.cursor, self.totals = cursor, totals or {"ann": (50, 2)}
+        self.syncs, self.release = 0, threading.Event()
+
+    def last_key(self): return self.cursor
+    def all_totals(self): return dict(self.totals)
+
+    def sync(self):
+        self.syncs += 1
+        self.release.wait(5)
+
+def service(tmp_path, mirror, ttl=60):
+    return LeaderboardService(mirror, ttl=ttl, snapshot_path=str(tmp_path / "snapshot.json"))
+
+def test_refreshes_share_one_download(tmp_path):
+    mirror = Mirror()
+    svc, published = service(tmp_path, mirror), []
+    svc.subscribe(lambda version, totals: published.append(version))
+    futures = {svc.refresh() for _ in range(5)}
+    assert len(futures) == 1
+    mirror.release.set()
+    assert futures.pop().result(5) == (1, {"ann": (50, 2)})
+    assert mirror.syncs == 1 and published == [1]
+    assert svc.refresh() is None and svc.is_fresh()   # fresh until the ttl passes
+    assert svc.refresh(force=True).result(5)[0] == 2 and mirror.syncs == 2
+
+def test_nothing_cached_without_snapshot_or_mirror(tmp_path):
+    assert service(tmp_path, Mirror(cursor=None)).cached() is None
+
+def test_snapshot_paints_before_any_download(tmp_path):
+    mirror = Mirror(totals={"bob": (10, 1)})
+    mirror.release.set()
+    service(tmp_path, mirror).refresh().result(5)
+    # Next launch: the last run's totals come from the snapshot, not the mirror
+    assert service(tmp_path, Mirror(totals={})).cached() == (1, {"bob": (10, 1)})
+
+def test_snapshot_of_another_format_or_older_cursor_is_ignored(tmp_path):
+    path = str(tmp_path / "snapshot.json")
+    dump_json_file(path, {"format": SNAPSHOT_FORMAT + 1, "cursor": "-K2", "totals": [["old", 1, 1]]})
+    assert service(tmp_path, Mirror()).cached() == (1, {"ann": (50, 2)})   # falls back to the mirror
+    dump_json_file(path, {"format": SNAPSHOT_FORMAT, "cursor": "-K1", "totals": [["old", 1, 1]]})
+    assert service(tmp_path, Mirror()).cached() == (1, {"ann": (50, 2)})   # the mirror moved on since
+    dump_json_file(path, {"format": SNAPSHOT_FORMAT, "cursor": "-K2", "totals": [["old", 1, 1]]})
+    assert service(tmp_path, Mirror()).cached() == (1, {"old": (1, 1)})
+    assert service(tmp_path, Mirror(cursor=None)).cached() == (1, {"old": (1, 1)})
@@ -0,0 +1,50 @@
+import json
+import os
+import threading
+from collections import Counter
+from core import config
+from core.data_manager import TaskManager
+from core.sampler import TaskSampler, WeightedSampler
+
+DAY = "2024-01-01"
+
+def write_store(path, tasks):
+    with open(path, "w") as f: json.dump({DAY: tasks}, f)
+
+def finishes(fn, timeout=5):
+    t = threading.Thread(target=fn, daemon=True)
+    t.start()
+    t.join(timeout)
+    return not t.is_alive()
+
+def test_weighted_sampler_distribution():
+    sampler = WeightedSampler({"a": 1, "b": 3}, seed=1)
+    counts = Counter(sampler.draw() for _ in range(20000))
+    assert abs(counts["b"] / 20000 - 0.75) < 0.02
+
+def test_reload_after_foreign_write_does_not_deadlock(tmp_path, monkeypatch):
+    path = str(tmp_path / "tasks.json")
+    monkeypatch.setattr(config, "TASKS_FILE", path)
+    write_store(path, [{"text": "A", "done": False}])
+    manager = TaskManager()
+    sampler = TaskSampler(manager, seed=1, date_key=DAY)
+    # Another process rewrites the file: reading pending tasks reloads it and emits an event
+    write_store(path, [{"text": "A", "done": False}, {"text": "B", "done": False}])
+    os.utime(path, ns=(1, 1))
+    assert finishes(sampler._reload)   # a deadlock leaves both locks held, so no cleanup on failure
+    assert len(sampler) == 2
+    sampler.close()
+    manager.close()
+
+def test_reload_races_manager_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "TASKS_FILE", str(tmp_path / "tasks.json"))
+    manager = TaskManager()
+    sampler = TaskSampler(manager, seed=1, date_key=DAY)
+    add = lambda data: {DAY: data.get(DAY, []) + [{"text": "T", "done": False}]}
+    writer = threading.Thread(target=lambda: [manager.update_days(add) for _ in range(200)], daemon=True)
+    writer.start()
+    assert finishes(lambda: [sampler._reload() for _ in range(200)], timeout=20)
+    writer.join(20)
+    assert not writer.is_alive()
+    sampler.close()
+    manager.close()
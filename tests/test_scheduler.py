@@ -0,0 +1,69 @@
+import heapq
+import itertools
+import threading
+from core.scheduler import CycleRunner, Job, Scheduler, pomodoro_phases, FOCUS, BREAK, LONG_BREAK
+from core.timer import FocusTimer
+
+class ManualScheduler:
+    """Scheduler stand-in on a fake clock: advance() runs what falls due, in deadline order."""
+    def __init__(self):
+        self.now, self._heap, self._seq = 0.0, [], itertools.count()
+
+    def clock(self): return self.now
+
+    def call_later(self, delay, fn, *args):
+        job = Job(self.now + delay, fn, args)
+        heapq.heappush(self._heap, (job.deadline, next(self._seq), job))
+        return job
+
+    def cancel(self, job): job.cancel()
+
+    def advance(self, seconds):
+        end = self.now + seconds
+        while self._heap and self._heap[0][0] <= end:
+            deadline, _, job = heapq.heappop(self._heap)
+            self.now = deadline
+            if not job.cancelled: job.fn(*job.args)
+        self.now = end
+
+def test_jobs_run_in_deadline_order():
+    scheduler, ran, done = Scheduler(), [], threading.Event()
+    now = scheduler.clock()
+    scheduler.call_at(now + 0.3, lambda: (ran.append("last"), done.set()))
+    scheduler.call_at(now + 0.2, ran.append, "second")
+    dropped = scheduler.call_at(now + 0.15, ran.append, "cancelled")
+    scheduler.call_at(now + 0.1, ran.append, "first")   # earlier than the planned wake-up
+    scheduler.cancel(dropped)
+    assert scheduler.next_deadline() == now + 0.1
+    assert done.wait(5)
+    assert ran == ["first", "second", "last"] and scheduler.next_deadline() is None
+    scheduler.stop()
+
+def test_cycle_runs_phases_and_reminders_in_order():
+    scheduler, log = ManualScheduler(), []
+    cycle = CycleRunner(scheduler, FocusTimer(scheduler.clock), remind_before=30,
+                        on_start=lambda kind, mins: log.append(("start", kind)),
+                        on_end=lambda kind, mins: log.append(("end", kind, mins)),
+                        on_remind=lambda kind, left: log.append(("remind", kind, left)))
+    cycle.start([(FOCUS, 2), (BREAK, 1)])
+    scheduler.advance(300)
+    assert log == [("start", FOCUS), ("remind", FOCUS, 30), ("end", FOCUS, 2),
+                   ("start", BREAK), ("remind", BREAK, 30), ("end", BREAK, 1)]
+    assert cycle.kind is None
+
+def test_pausing_moves_the_deadline():
+    scheduler, ended = ManualScheduler(), []
+    cycle = CycleRunner(scheduler, FocusTimer(scheduler.clock), remind_before=0,
+                        on_end=lambda kind, mins: ended.append(scheduler.now))
+    cycle.start([(FOCUS, 1)])
+    scheduler.advance(20)
+    cycle.pause()
+    scheduler.advance(600)
+    assert ended == []
+    cycle.resume()
+    scheduler.advance(60)
+    assert len(ended) == 1 and 660 <= ended[0] <= 661   # the 40s left, counted from the resume
+
+def test_pomodoro_phases_alternate_with_long_breaks():
+    kinds = [kind for kind, _ in pomodoro_phases(rounds=5, long_every=2)]
+    assert kinds == [FOCUS, BREAK, FOCUS, LONG_BREAK, FOCUS, BREAK, FOCUS, LONG_BREAK, FOCUS]
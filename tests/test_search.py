@@ -0,0 +1,46 @@
+from core import config
+from core.data_manager import TaskManager
+from core.search import TaskSearch
+
+DAY = "2024-01-01"
+
+def make(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "TASKS_FILE", str(tmp_path / "tasks.json"))
+    return TaskManager(), TaskSearch(path=str(tmp_path / "index.json.gz"), tasks_path=config.TASKS_FILE)
+
+def test_tasks_created_done_are_indexed(tmp_path, monkeypatch):
+    manager, search = make(tmp_path, monkeypatch)
+    search.attach(manager)
+    manager.add_task("Email Bob", DAY, done=True)
+    manager.mark_done("Call Ann", DAY, upload=False)
+    manager.bulk([("done", "Write report", DAY)])
+    manager.add_task("Pay rent", DAY)
+    manager.mark_done("Pay rent", DAY, upload=False)   # already indexed when added
+    assert [search.count(t) for t in ("Email Bob", "Call Ann", "Write report", "Pay rent")] == [1, 1, 1, 1]
+    assert search.suggest("ca") == ["Call Ann"]
+    search.close()
+    manager.close()
+
+def test_saved_index_matches_rebuild(tmp_path, monkeypatch):
+    manager, search = make(tmp_path, monkeypatch)
+    search.attach(manager)
+    manager.bulk([("add", "Read", DAY), ("done", "Read", DAY), ("done", "Run", DAY)])
+    search.close()
+    fresh = TaskSearch(path=str(tmp_path / "other.json.gz"), tasks_path=config.TASKS_FILE).attach(manager)
+    assert fresh.search("r") == search.search("r") == [("Read", 1), ("Run", 1)]
+    fresh.close()
+    manager.close()
+
+def test_events_already_counted_by_attach_are_skipped(tmp_path, monkeypatch):
+    manager, search = make(tmp_path, monkeypatch)
+    manager.add_task("Read", DAY)
+    late = []
+    manager._emit = lambda events, seq: late.append((events, seq))   # hold the write's event back
+    manager.add_task("Run", DAY)
+    del manager._emit
+    search.attach(manager)                     # rebuilds from contents that already hold "Run"
+    for events, seq in late: manager._emit(events, seq)
+    manager.add_task("Run", DAY)
+    assert (search.count("Read"), search.count("Run")) == (1, 2)
+    search.close()
+    manager.close()
@@ -0,0 +1,58 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+import pytest
+from core import config
+from core.data_manager import TaskManager
+from core.sync import SyncReplica, TOKEN_HEADER, make_server
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "TASKS_FILE", str(tmp_path / "tasks.json"))
+    manager = TaskManager()
+    replica = SyncReplica(manager, state_path=str(tmp_path / "sync_state.json"))
+    yield replica
+    replica.close()
+    manager.close()
+
+def post(server, path, headers=None):
+    host, port = server.server_address[:2]
+    body = json.dumps({"device": "peer", "days": {}, "cursor": 0}).encode()
+    req = urllib.request.Request(f"http://{host}:{port}{path}", data=body, headers=headers or {}, method="POST")
+    try:
+        with urllib.request.urlopen(req, timeout=5) as resp: return resp.status
+    except urllib.error.HTTPError as e: return e.code
+
+def test_refuses_network_bind_without_token(replica):
+    with pytest.raises(ValueError): make_server(replica, "0.0.0.0", 0, token="")
+
+def test_token_required_on_push_and_pull(replica):
+    server = make_server(replica, "127.0.0.1", 0, token="secret")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        for path in ("/push", "/pull"):
+            assert post(server, path) == 401
+            assert post(server, path, {TOKEN_HEADER: "wrong"}) == 401
+            assert post(server, path, {TOKEN_HEADER: "secret"}) == 200
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_idle_exchanges_leave_the_state_file_alone(monkeypatch, replica):
+    from core import sync
+    own = []
+    replica.manager.subscribe(lambda event: own.append(replica.receiving()))
+    days = [["2024-01-01", {"peer": 1}, [{"text": "Read", "done": False}]]]
+    assert replica.receive("peer", days) == 1 and own == [True]
+    replica.save()
+    writes = []
+    monkeypatch.setattr(sync, "dump_json_file", lambda *args, **kwargs: writes.append(args[0]))
+    for _ in range(2):
+        assert replica.receive("peer", days) == 0
+        replica.changes_for("peer", replica.seq)
+        replica.save()
+    assert writes == []
+    replica.manager.add_task("Run", "2024-01-01")
+    replica.save()
+    assert len(writes) == 1 and own[-1] is False
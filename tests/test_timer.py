@@ -0,0 +1,53 @@
+from core.timer import FocusTimer, TimerCheckpoint, RUNNING, PAUSED
+
+class Clock:
+    def __init__(self, now=1000.0): self.now = now
+    def __call__(self): return self.now
+
+def checkpointed(tmp_path, credit):
+    """A 25-minute session saved 5 minutes in, then the app closed for 10 minutes."""
+    clock = Clock()
+    timer = FocusTimer(clock)
+    timer.start(25)
+    clock.now += 300
+    checkpoint = TimerCheckpoint(str(tmp_path / "timer.json"), credit_closed_time=credit)
+    checkpoint.save(timer, {"Read", "Email"})
+    clock.now += 600
+    restored = FocusTimer(clock)
+    return checkpoint.load(restored), restored
+
+def test_restore_credits_time_spent_closed(tmp_path):
+    goals, timer = checkpointed(tmp_path, True)
+    assert goals == ["Email", "Read"]
+    assert timer.state == RUNNING and timer.elapsed() == 900
+
+def test_restore_without_credit_comes_back_paused(tmp_path):
+    goals, timer = checkpointed(tmp_path, False)
+    assert goals == ["Email", "Read"]
+    assert timer.state == PAUSED and timer.elapsed() == 300
+    timer.clock.now += 60
+    timer.resume()
+    timer.clock.now += 60
+    assert timer.elapsed() == 360
+
+def test_paused_session_restores_as_saved(tmp_path):
+    clock = Clock()
+    timer = FocusTimer(clock)
+    timer.start(25)
+    clock.now += 120
+    timer.pause()
+    checkpoint = TimerCheckpoint(str(tmp_path / "timer.json"))
+    checkpoint.save(timer)
+    clock.now += 3600
+    restored = FocusTimer(clock)
+    assert checkpoint.load(restored) == [] and restored.state == PAUSED and restored.elapsed() == 120
+
+def test_finished_or_missing_session_restores_nothing(tmp_path):
+    checkpoint = TimerCheckpoint(str(tmp_path / "timer.json"))
+    assert checkpoint.load(FocusTimer()) is None
+    timer = FocusTimer()
+    timer.start(25)
+    checkpoint.save(timer)
+    timer.finish()
+    checkpoint.save(timer)   # a finished session clears the file
+    assert checkpoint.load(FocusTimer()) is None
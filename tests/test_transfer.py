@@ -0,0 +1,19 @@
+import json
+from core.transfer import import_tasks, iter_task_rows
+
+def rows(day, *texts):
+    return [{"date": day, "text": t, "done": False} for t in texts]
+
+def test_import_in_batches_matches_one_pass(tmp_path):
+    data = rows("2024-01-02", "A", "A", "B") + rows("2024-01-01", "C") + rows("2024-01-03", "D", "E")
+    one, batched = str(tmp_path / "one.json"), str(tmp_path / "batched.json")
+    assert import_tasks(data, one) == import_tasks(data, batched, batch=1) == 6
+    with open(one) as a, open(batched) as b: assert json.load(a) == json.load(b)
+    assert list(iter_task_rows(batched)) == data
+
+def test_reimport_is_a_noop(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    data = rows("2024-01-01", "A", "A") + rows("2024-01-02", "B")
+    import_tasks(data, path, batch=2)
+    import_tasks(data, path, batch=2)
+    assert list(iter_task_rows(path)) == data
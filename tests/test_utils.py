@@ -0,0 +1,88 @@
+import json
+import os
+import sys
+import stat
+import threading
+import subprocess
+import multiprocessing
+from core import config
+from core.data_manager import TaskManager
+from core.utils import FileWatcher, atomic_write
+
+DAY = "2024-01-01"
+WRITERS, TASKS_EACH = 4, 25
+
+def writer(path, n):
+    config.TASKS_FILE = path
+    manager = TaskManager()
+    for i in range(TASKS_EACH):
+        manager.add_task(f"w{n}-{i}", DAY)
+        if i % 5 == 4: manager.mark_done(f"w{n}-{i - 2}", DAY, upload=False)
+
+def test_atomic_write_keeps_mode(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    atomic_write(path, "{}")
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o666 & ~umask
+    os.chmod(path, 0o640)
+    atomic_write(path, "[]")
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+
+def test_concurrent_processes_lose_nothing(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=writer, args=(path, n)) for n in range(WRITERS)]
+    for p in procs: p.start()
+    for p in procs: p.join(60)
+    assert all(p.exitcode == 0 for p in procs)
+    with open(path) as f: tasks = json.load(f)[DAY]
+    texts = sorted(t["text"] for t in tasks)
+    assert texts == sorted(f"w{n}-{i}" for n in range(WRITERS) for i in range(TASKS_EACH))
+    done = {t["text"] for t in tasks if t["done"]}
+    assert done == {f"w{n}-{i - 2}" for n in range(WRITERS) for i in range(4, TASKS_EACH, 5)}
+
+def test_import_leaves_the_umask_alone():
+    code = "import os; os.umask(0o077); import core.utils; print(oct(os.umask(0)))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "0o77"
+
+def notified(path, polling, monkeypatch):
+    """Whether a watcher reports atomic saves of path (rewritten until it does, as it starts asynchronously)."""
+    changed = threading.Event()
+    watcher = FileWatcher(path, changed.set, poll_interval=0.05)
+    if polling: monkeypatch.setattr(watcher, "_inotify_fd", lambda: None)
+    watcher.start()
+    try:
+        for i in range(50):
+            atomic_write(path, json.dumps([i]))
+            if changed.wait(0.1): return True
+        return False
+    finally: watcher.stop()
+
+def test_watcher_reports_atomic_saves(tmp_path, monkeypatch):
+    assert notified(str(tmp_path / "tasks.json"), False, monkeypatch)
+    assert notified(str(tmp_path / "other.json"), True, monkeypatch)
+
+def test_watcher_ignores_other_files(tmp_path):
+    changed = threading.Event()
+    watcher = FileWatcher(str(tmp_path / "tasks.json"), changed.set, poll_interval=0.05)
+    watcher.start()
+    try:
+        for i in range(5): atomic_write(str(tmp_path / "stats.json"), json.dumps([i]))
+        assert not changed.wait(0.3)
+    finally: watcher.stop()
+
+def test_foreign_writes_reach_subscribers(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "TASKS_FILE", str(tmp_path / "tasks.json"))
+    mine, events = TaskManager(), []
+    arrived = threading.Event()
+    mine.subscribe(lambda event: (events.append(event), arrived.set()))
+    try:
+        other = TaskManager()   # another writer, e.g. the Mobile app
+        for i in range(50):   # the watcher starts asynchronously, so write until it reports
+            other.add_task(f"t{i}", DAY)
+            if arrived.wait(0.1): break
+        assert events and events[0].day == DAY and events[0].added == [f"t{i}" for i in range(len(events[0].added))]
+        assert mine.pending_tasks(DAY) == other.pending_tasks(DAY)
+    finally: mine.close()